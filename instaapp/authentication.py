@@ -1,4 +1,7 @@
 import logging
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework.authentication import BaseAuthentication
@@ -28,4 +31,33 @@ class TempTokenAuthentication(BaseAuthentication):
             user = User.objects.get(id=access_token['user_id'])
             return (user, token)
         except (InvalidToken, TokenError, User.DoesNotExist) as e:
-            raise exceptions.AuthenticationFailed(str(e))
\ No newline at end of file
+            raise exceptions.AuthenticationFailed(str(e))
+
+# 웹소켓 연결 시 한 번만 JWT 로 사용자 확인 (?token=<access> 또는 Authorization 헤더)
+class JWTAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        token = self.get_token(scope)
+        if token:
+            user = await get_user_from_token(token)
+            if user is not None:
+                scope = dict(scope, user=user)
+        return await super().__call__(scope, receive, send)
+
+    def get_token(self, scope):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        if token:
+            return token[0]
+        for name, value in scope.get('headers', []):
+            if name == b'authorization':
+                parts = value.decode().split()
+                if len(parts) == 2 and parts[0].lower() == 'bearer':
+                    return parts[1]
+        return None
+
+@database_sync_to_async
+def get_user_from_token(token):
+    try:
+        access_token = AccessToken(token)
+        return User.objects.get(id=access_token['user_id'], is_active=True)
+    except (InvalidToken, TokenError, KeyError, User.DoesNotExist):
+        return None
@@ -1,13 +1,27 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from instaapp.models.chatroom import ChatRoom, Message
-from instaapp.models.user import CustomUser
-from instaapp.serializers import MessageSerializer
+from django.conf import settings
+from instaapp.services.chat_services import broadcast_message, compact_message, get_participant_ids, resolve_receiver_id
+from instaapp.services.message_buffer import message_buffer
 from channels.db import database_sync_to_async
 
+# 사용자 단위 소켓 하나에서 구독할 수 있는 채팅방 수
+CHAT_MAX_SUBSCRIPTIONS = getattr(settings, 'CHAT_MAX_SUBSCRIPTIONS', 200)
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.chatroom_id = self.scope['url_route']['kwargs']['chatroom_id']
+        # 사용자와 채팅방 참여자는 연결 시 한 번만 확인하고 연결이 끝날 때까지 재사용
+        self.user = self.scope.get('user')
+        if self.user is None or not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.chatroom_id = int(self.scope['url_route']['kwargs']['chatroom_id'])
+        self.participant_ids = await self.get_participant_ids(self.chatroom_id, self.user)
+        if self.participant_ids is None:
+            await self.close()
+            return
+
         self.chatroom_group_name = f'chat_{self.chatroom_id}'
 
         # Join room group
@@ -20,31 +34,25 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         # Leave room group
-        await self.channel_layer.group_discard(
-            self.chatroom_group_name,
-            self.channel_name
-        )
+        if hasattr(self, 'chatroom_group_name'):
+            await self.channel_layer.group_discard(
+                self.chatroom_group_name,
+                self.channel_name
+            )
 
     async def receive(self, text_data):
         data = json.loads(text_data)
-        message = data['message']
-        sender_id = data['sender_id']
-        receiver_id = data['receiver_id']
-
-        sender = await self.get_user(sender_id)
-        receiver = await self.get_user(receiver_id)
-        chatroom = await self.get_chatroom(self.chatroom_id)
+        message = data.get('message')
+        if not message:
+            return
 
-        message_instance = await self.create_message(chatroom, sender, receiver, message)
-        serialized_message = MessageSerializer(message_instance).data
+        receiver_id = resolve_receiver_id(self.participant_ids, self.user.id, data.get('receiver_id'))
+        if receiver_id is None:
+            return
 
-        await self.channel_layer.group_send(
-            self.chatroom_group_name,
-            {
-                'type': 'chat_message',
-                'message': serialized_message
-            }
-        )
+        # 저장은 버퍼에 맡기고 바로 전송 (id 대신 client_id 로 식별)
+        message_instance = await message_buffer.add(self.chatroom_id, self.user.id, receiver_id, message)
+        await broadcast_message(self.channel_layer, compact_message(message_instance), self.participant_ids)
 
     async def chat_message(self, event):
         message = event['message']
@@ -54,13 +62,108 @@ class ChatConsumer(AsyncWebsocketConsumer):
         }))
 
     @database_sync_to_async
-    def get_user(self, user_id):
-        return CustomUser.objects.get(id=user_id)
+    def get_participant_ids(self, chatroom_id, user):
+        return get_participant_ids(chatroom_id, user)
 
-    @database_sync_to_async
-    def get_chatroom(self, chatroom_id):
-        return ChatRoom.objects.get(id=chatroom_id)
+# 사용자별 소켓 하나로 알림(미디어 처리 결과 등)과 구독한 모든 채팅방의 메시지를 주고받음
+class NotificationConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
+        self.user = self.scope.get('user')
+        if self.user is None or not self.user.is_authenticated:
+            await self.close()
+            return
+
+        # 구독 중인 채팅방 id -> 참여자 id 집합
+        self.subscriptions = {}
+        self.user_group_name = f'user_{self.user.id}'
+        await self.channel_layer.group_add(
+            self.user_group_name,
+            self.channel_name
+        )
+
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'user_group_name'):
+            await self.channel_layer.group_discard(
+                self.user_group_name,
+                self.channel_name
+            )
+
+    async def media_status(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'media_status',
+            'kind': event['kind'],
+            'id': event['id'],
+            'status': event['status'],
+            'error': event['error'],
+        }))
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        try:
+            chatroom_id = int(data.get('chatroom_id'))
+        except (TypeError, ValueError):
+            await self.send_error('chatroom_id is required')
+            return
+
+        action = data.get('type')
+        if action == 'subscribe':
+            await self.subscribe(chatroom_id)
+        elif action == 'unsubscribe':
+            self.subscriptions.pop(chatroom_id, None)
+            await self.send(text_data=json.dumps({'type': 'unsubscribed', 'chatroom_id': chatroom_id}))
+        elif action == 'message':
+            await self.send_chat_message(chatroom_id, data)
+        else:
+            await self.send_error('Unknown type')
+
+    async def subscribe(self, chatroom_id):
+        if chatroom_id not in self.subscriptions:
+            if len(self.subscriptions) >= CHAT_MAX_SUBSCRIPTIONS:
+                await self.send_error('Too many subscriptions', chatroom_id)
+                return
+            participant_ids = await self.get_participant_ids(chatroom_id, self.user)
+            if participant_ids is None:
+                await self.send_error('Chatroom not found', chatroom_id)
+                return
+            self.subscriptions[chatroom_id] = participant_ids
+        await self.send(text_data=json.dumps({'type': 'subscribed', 'chatroom_id': chatroom_id}))
+
+    async def send_chat_message(self, chatroom_id, data):
+        participant_ids = self.subscriptions.get(chatroom_id)
+        if participant_ids is None:
+            await self.send_error('Not subscribed', chatroom_id)
+            return
+        message = data.get('message')
+        if not message:
+            return
+        receiver_id = resolve_receiver_id(participant_ids, self.user.id, data.get('receiver_id'))
+        if receiver_id is None:
+            await self.send_error('Receiver not found', chatroom_id)
+            return
+
+        message_instance = await message_buffer.add(chatroom_id, self.user.id, receiver_id, message)
+        await broadcast_message(self.channel_layer, compact_message(message_instance), participant_ids)
+
+    async def chat_message(self, event):
+        # 참여 중인 모든 채팅방의 메시지가 user_{id} 그룹으로 오지만 구독한 채팅방만 전달
+        message = event['message']
+        if message['chatroom'] not in self.subscriptions:
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'chat_message',
+            'message': message,
+        }))
+
+    async def send_error(self, error, chatroom_id=None):
+        await self.send(text_data=json.dumps({'type': 'error', 'error': error, 'chatroom_id': chatroom_id}))
 
     @database_sync_to_async
-    def create_message(self, chatroom, sender, receiver, content):
-        return Message.objects.create(chatroom=chatroom, sender=sender, receiver=receiver, content=content)
\ No newline at end of file
+    def get_participant_ids(self, chatroom_id, user):
+        return get_participant_ids(chatroom_id, user)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from instaapp.models.post import Image
+from instaapp.models.user import CustomUser
+from instaapp.media.images import generate_image_variants
+from instaapp.media.pipeline import process_profile_picture
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/WebP variants for images and profile pictures uploaded before variants existed.'
+
+    def handle(self, *args, **options):
+        images = 0
+        for image in Image.objects.filter(variants={}).iterator(chunk_size=500):
+            if not image.file.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            try:
+                image.variants = generate_image_variants(image.file)
+            except Exception as e:
+                self.stderr.write(f'Image {image.id}: {e}')
+                continue
+            image.save(update_fields=['variants'])
+            images += 1
+        self.stdout.write(f'Image: {images} processed')
+
+        users = 0
+        user_ids = CustomUser.objects.filter(profile_picture_variants={}).exclude(profile_picture='').exclude(profile_picture__isnull=True).values_list('id', flat=True)
+        for user_id in list(user_ids):
+            try:
+                process_profile_picture(user_id)
+            except Exception as e:
+                self.stderr.write(f'CustomUser {user_id}: {e}')
+                continue
+            users += 1
+        self.stdout.write(f'CustomUser: {users} processed')
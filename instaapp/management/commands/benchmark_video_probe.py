@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import imageio_ffmpeg
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from instaapp.media.probe import probe_duration
+from instaapp.models.validators import get_video_duration_with_moviepy
+
+# 샘플 파일: (이름, 길이(초), ffmpeg 출력 옵션)
+SAMPLES = [
+    ('faststart.mp4', 15, ['-c:v', 'libx264', '-preset', 'ultrafast', '-movflags', '+faststart']),
+    ('moov_at_end.mp4', 60, ['-c:v', 'libx264', '-preset', 'ultrafast']),
+    ('long_reel.mp4', 90, ['-c:v', 'libx264', '-preset', 'ultrafast']),
+    ('program_stream.mpg', 30, ['-c:v', 'mpeg2video', '-f', 'vob']),
+]
+
+class Command(BaseCommand):
+    help = 'Compare the container-header duration probe against the moviepy path used by validate_video_length.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='Video files to measure. Generates sample files with ffmpeg when omitted.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        tmp_dir = None
+        files = options['files']
+        if not files:
+            tmp_dir = tempfile.mkdtemp(prefix='probe-bench-')
+            files = self.generate_samples(tmp_dir)
+
+        try:
+            self.stdout.write(f'{"file":<24}{"size":>10}{"probe":>12}{"moviepy":>12}{"speedup":>10}  duration (probe / moviepy)')
+            for path in files:
+                probe_time, probe_result = self.measure(path, options['repeat'], lambda f: probe_duration(f.chunks()))
+                moviepy_time, moviepy_result = self.measure(path, options['repeat'], get_video_duration_with_moviepy)
+                speedup = moviepy_time / probe_time if probe_time else float('inf')
+                self.stdout.write(
+                    f'{os.path.basename(path):<24}{os.path.getsize(path) // 1024:>8}KB'
+                    f'{probe_time * 1000:>10.2f}ms{moviepy_time * 1000:>10.2f}ms{speedup:>9.1f}x'
+                    f'  {self.format_duration(probe_result)} / {self.format_duration(moviepy_result)}'
+                )
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def measure(self, path, repeat, func):
+        best = None
+        result = None
+        for _ in range(repeat):
+            with open(path, 'rb') as fp:
+                started = time.perf_counter()
+                try:
+                    result = func(File(fp))
+                except Exception as e:
+                    result = e
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def format_duration(self, value):
+        if isinstance(value, (int, float)):
+            return f'{value:.2f}s'
+        return 'n/a' if value is None else 'error'
+
+    def generate_samples(self, tmp_dir):
+        ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+        paths = []
+        for name, seconds, output_args in SAMPLES:
+            path = os.path.join(tmp_dir, name)
+            subprocess.run(
+                [ffmpeg, '-v', 'error', '-f', 'lavfi', '-i', f'testsrc=duration={seconds}:size=640x360:rate=30', *output_args, path],
+                check=True,
+            )
+            paths.append(path)
+        return paths
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from instaapp.services.trending_services import compact_tag_usage
+
+class Command(BaseCommand):
+    help = 'Delete TagUsageBucket rows older than the hourly and daily retention periods.'
+
+    def handle(self, *args, **options):
+        hourly, daily = compact_tag_usage()
+        self.stdout.write(f'TagUsageBucket: {hourly} hourly and {daily} daily buckets deleted')
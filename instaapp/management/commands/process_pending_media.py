@@ -0,0 +1,18 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from instaapp.media.pipeline import MEDIA_PROCESSING_TIMEOUT, sweep_stale_media
+
+class Command(BaseCommand):
+    help = 'Process posts and reels whose media is still pending or stuck processing (e.g. after a worker restart).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=int(MEDIA_PROCESSING_TIMEOUT.total_seconds() // 60),
+            help='Only pick up uploads whose status has not changed for this many minutes.',
+        )
+
+    def handle(self, *args, **options):
+        # 명령 안에서는 큐 대신 바로 처리해 끝날 때까지 기다림
+        swept = sweep_stale_media(timedelta(minutes=options['older_than']), dispatch=lambda process, pk: process(pk))
+        for model_name, (processed, failed) in swept.items():
+            self.stdout.write(f'{model_name}: {processed} processed, {failed} failed')
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from instaapp.services.upload_services import purge_expired_direct_uploads, purge_expired_upload_sessions
+
+class Command(BaseCommand):
+    help = 'Delete resumable upload sessions (and their partial files) that have not been touched within UPLOAD_SESSION_TTL, and direct uploads past DIRECT_UPLOAD_REGISTER_TTL.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'UploadSession: {purge_expired_upload_sessions()} purged')
+        self.stdout.write(f'DirectUpload: {purge_expired_direct_uploads()} purged')
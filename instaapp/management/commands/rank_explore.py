@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from instaapp.services.explore_services import rebuild_explore_index, trim_explore_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the explore index from recent posts and reels (run periodically, e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trim-only', action='store_true', help='Only drop entries older than EXPLORE_WINDOW_DAYS or beyond EXPLORE_INDEX_SIZE.')
+
+    def handle(self, *args, **options):
+        if options['trim_only']:
+            removed = trim_explore_index()
+            self.stdout.write(f'Explore index trimmed by {removed} entries')
+            return
+        total = rebuild_explore_index()
+        self.stdout.write(f'Explore index rebuilt with {total} entries')
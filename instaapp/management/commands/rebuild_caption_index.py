@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from instaapp.search.captions import CAPTION_MODELS, rebuild_caption_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the caption search index for posts and reels in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(CAPTION_MODELS), help='Only rebuild this kind.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--missing-only', action='store_true', help='Only index documents that are not indexed yet.')
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(CAPTION_MODELS)
+        for kind in kinds:
+            indexed = rebuild_caption_index(kind, options['chunk_size'], options['missing_only'])
+            self.stdout.write(f'{kind}: {indexed} documents indexed')
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from instaapp.models.chatroom import ChatRoom
+from instaapp.models.inbox import InboxEntry
+from instaapp.services.inbox_services import create_inbox_entries, rebuild_inbox_entry
+
+class Command(BaseCommand):
+    help = 'Create missing InboxEntry rows and recompute last message and unread counts from Message.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--missing-only', action='store_true', help='Only build entries that do not exist yet.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        created = 0
+        while True:
+            chatrooms = list(ChatRoom.objects.filter(pk__gt=last_pk).order_by('pk').prefetch_related('participants')[:chunk_size])
+            if not chatrooms:
+                break
+            last_pk = chatrooms[-1].pk
+
+            existing = set(InboxEntry.objects.filter(chatroom__in=chatrooms).values_list('chatroom_id', 'user_id'))
+            for chatroom in chatrooms:
+                participant_ids = [user.id for user in chatroom.participants.all()]
+                missing = [user_id for user_id in participant_ids if (chatroom.id, user_id) not in existing]
+                if not missing:
+                    continue
+                create_inbox_entries(chatroom, participant_ids)
+                for entry in InboxEntry.objects.filter(chatroom=chatroom, user_id__in=missing):
+                    rebuild_inbox_entry(entry)
+                created += len(missing)
+        self.stdout.write(f'InboxEntry: {created} created')
+
+        if not options['missing_only']:
+            rebuilt = 0
+            for entry in InboxEntry.objects.order_by('pk').iterator(chunk_size=chunk_size):
+                rebuild_inbox_entry(entry)
+                rebuilt += 1
+            self.stdout.write(f'InboxEntry: {rebuilt} rebuilt')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from instaapp.models.follow import Follow
+from instaapp.models.timeline import TimelineEntry
+from instaapp.services.timeline_services import rebuild_timeline
+
+class Command(BaseCommand):
+    help = 'Fill TimelineEntry rows from the recent posts of every followed account.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--missing-only', action='store_true', help='Only build timelines for users that have no entries yet.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        rebuilt = 0
+        pushed = 0
+        while True:
+            user_ids = list(
+                Follow.objects.filter(follower_id__gt=last_pk)
+                .order_by('follower_id').values_list('follower_id', flat=True).distinct()[:chunk_size]
+            )
+            if not user_ids:
+                break
+            last_pk = user_ids[-1]
+
+            if options['missing_only']:
+                existing = set(TimelineEntry.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True).distinct())
+                user_ids = [user_id for user_id in user_ids if user_id not in existing]
+            for user_id in user_ids:
+                pushed += rebuild_timeline(user_id)
+                rebuilt += 1
+        self.stdout.write(f'TimelineEntry: {rebuilt} timelines rebuilt, {pushed} posts pushed')
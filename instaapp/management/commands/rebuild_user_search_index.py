@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from instaapp.models.user import CustomUser
+from instaapp.search.users import index_user
+
+class Command(BaseCommand):
+    help = 'Rebuild UserSearchToken rows from username, name and bio.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true', help='Only index users that have no tokens yet.')
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.only('id', 'username', 'name', 'bio').order_by('pk')
+        if options['missing_only']:
+            users = users.filter(search_tokens__isnull=True)
+        indexed = 0
+        for user in users.iterator(chunk_size=500):
+            index_user(user)
+            indexed += 1
+        self.stdout.write(f'UserSearchToken: {indexed} users indexed')
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from instaapp.models.post import Post
+from instaapp.models.reels import Reels
+from instaapp.models.like import Like
+from instaapp.models.mark import Mark
+from instaapp.models.comment import Comment
+
+COUNTERS = (
+    ('like_count', Like),
+    ('comment_count', Comment),
+    ('mark_count', Mark),
+)
+
+class Command(BaseCommand):
+    help = 'Rebuild Post/Reels like_count, comment_count and mark_count values that have drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        for model, field_name in ((Post, 'post'), (Reels, 'reels')):
+            fixed = self.reconcile(model, field_name, options['chunk_size'], options['dry_run'])
+            self.stdout.write(f'{model.__name__}: {fixed} rows fixed')
+
+    def reconcile(self, model, field_name, chunk_size, dry_run):
+        fixed = 0
+        last_pk = 0
+        counter_fields = [counter for counter, _ in COUNTERS]
+        while True:
+            # pk 범위 단위로 읽기만 하므로 테이블 잠금이 없음
+            rows = list(
+                model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', *counter_fields)[:chunk_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            ids = [row[0] for row in rows]
+
+            actual = {}
+            for counter, source in COUNTERS:
+                counts = source.objects.filter(**{f'{field_name}__in': ids}).values(field_name).annotate(total=Count('id'))
+                actual[counter] = {row[field_name]: row['total'] for row in counts}
+
+            drifted = [
+                row[0] for row in rows
+                if any(row[i + 1] != actual[counter].get(row[0], 0) for i, counter in enumerate(counter_fields))
+            ]
+            if drifted and not dry_run:
+                # 보정 시점의 실제 값으로 갱신 (그 사이 들어온 좋아요/댓글도 반영됨)
+                model.objects.filter(pk__in=drifted).update(**{
+                    counter: self.count_subquery(source, field_name) for counter, source in COUNTERS
+                })
+            fixed += len(drifted)
+        return fixed
+
+    def count_subquery(self, source, field_name):
+        counts = source.objects.filter(**{field_name: OuterRef('pk')}).order_by().values(field_name).annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from instaapp.models.user import CustomUser
+from instaapp.models.follow import Follow
+
+class Command(BaseCommand):
+    help = 'Rebuild CustomUser.follower_count values that have drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        fixed = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                CustomUser.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'follower_count')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            counts = Follow.objects.filter(followed__in=[pk for pk, _ in rows]).values('followed').annotate(total=Count('id'))
+            actual = {row['followed']: row['total'] for row in counts}
+            drifted = [pk for pk, stored in rows if stored != actual.get(pk, 0)]
+            if drifted and not options['dry_run']:
+                followers = Follow.objects.filter(followed=OuterRef('pk')).order_by().values('followed').annotate(total=Count('id')).values('total')
+                CustomUser.objects.filter(pk__in=drifted).update(
+                    follower_count=Coalesce(Subquery(followers, output_field=IntegerField()), Value(0))
+                )
+            fixed += len(drifted)
+        self.stdout.write(f'CustomUser: {fixed} rows fixed')
@@ -0,0 +1,44 @@
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from instaapp.models.post import Post
+from instaapp.models.reels import Reels
+from instaapp.models.tag import Tag
+from instaapp.services.tag_services import refresh_tag_indexes
+
+class Command(BaseCommand):
+    help = 'Rebuild Tag.post_count values (posts + reels) that have drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        fixed = 0
+        last_pk = 0
+        while True:
+            rows = list(Tag.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'post_count')[:chunk_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            tag_ids = [pk for pk, _ in rows]
+            actual = Counter()
+            for through in (Post.tags.through, Reels.tags.through):
+                counts = through.objects.filter(tag_id__in=tag_ids).values('tag_id').annotate(total=Count('id'))
+                actual.update({row['tag_id']: row['total'] for row in counts})
+            drifted = [pk for pk, stored in rows if stored != actual[pk]]
+            if drifted and not options['dry_run']:
+                # 갱신 시점에 다시 세서 그 사이의 F() 증감을 덮어쓰지 않음
+                Tag.objects.filter(pk__in=drifted).update(post_count=sum(
+                    Coalesce(Subquery(
+                        through.objects.filter(tag_id=OuterRef('pk')).order_by().values('tag_id').annotate(total=Count('id')).values('total'),
+                        output_field=IntegerField(),
+                    ), Value(0))
+                    for through in (Post.tags.through, Reels.tags.through)
+                ))
+                refresh_tag_indexes(drifted)
+            fixed += len(drifted)
+        self.stdout.write(f'Tag: {fixed} rows fixed')
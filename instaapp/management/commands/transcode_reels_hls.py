@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from instaapp.models.media import MediaStatus
+from instaapp.models.reels import Video
+from instaapp.media.pipeline import transcode_video
+
+class Command(BaseCommand):
+    help = 'Transcode reels videos that do not have HLS renditions yet.'
+
+    def handle(self, *args, **options):
+        done = 0
+        failed = 0
+        videos = Video.objects.filter(hls_playlist='', reels__status=MediaStatus.READY)
+        for video in videos.iterator(chunk_size=100):
+            try:
+                transcode_video(video)
+            except Exception as e:
+                self.stderr.write(f'Video {video.id}: {e}')
+                failed += 1
+                continue
+            done += 1
+        self.stdout.write(f'Video: {done} transcoded, {failed} failed')
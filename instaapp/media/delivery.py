@@ -0,0 +1,111 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse
+
+# nginx internal location 접두사 (설정하면 X-Accel-Redirect 로 전송을 프록시에 넘김)
+MEDIA_ACCEL_REDIRECT_PREFIX = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None)
+# Apache mod_xsendfile / lighttpd 사용 시 X-Sendfile 로 넘김
+MEDIA_SENDFILE = getattr(settings, 'MEDIA_SENDFILE', False)
+MEDIA_CACHE_MAX_AGE = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60)
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MEDIA_STREAM_CHUNK_SIZE = 64 * 1024
+# 내용 해시나 한 번만 쓰이는 uuid 가 들어간 경로 (같은 이름으로 다른 내용이 올 수 없음)
+IMMUTABLE_NAME_PATTERN = re.compile(r'(^|/)[0-9a-f]{32}')
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+mimetypes.add_type('video/mp2t', '.ts')
+mimetypes.add_type('image/webp', '.webp')
+
+def parse_range(header, size):
+    # 단일 구간만 지원, 해석할 수 없으면 None (전체 전송), 범위를 벗어나면 False
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+def iter_file(path, start, length):
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        while length > 0:
+            chunk = fp.read(min(MEDIA_STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def get_cache_control(name, private=False):
+    if private:
+        return 'private, no-cache'
+    if IMMUTABLE_NAME_PATTERN.search(name):
+        return f'public, max-age={MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={MEDIA_CACHE_MAX_AGE}'
+
+def serve_media(request, name, private=False):
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        # 원격 스토리지는 저장소 URL 로 보냄
+        return HttpResponseRedirect(default_storage.url(name))
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('Media not found')
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': get_cache_control(name, private),
+        'Accept-Ranges': 'bytes',
+    }
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    elif MEDIA_ACCEL_REDIRECT_PREFIX:
+        # 권한 확인만 하고 실제 전송(Range 포함)은 nginx 가 처리
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(name)
+    elif MEDIA_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        response = stream_file(request, path, stat.st_size, etag, content_type)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+def stream_file(request, path, size, etag, content_type):
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = parse_range(range_header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        response = StreamingHttpResponse(iter_file(path, 0, size), content_type=content_type)
+        response['Content-Length'] = str(size)
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(iter_file(path, start, end - start + 1), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
@@ -0,0 +1,120 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import uuid
+import imageio_ffmpeg
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+# (짧은 변 픽셀, 영상 비트레이트, 오디오 비트레이트) - 원본보다 큰 화질은 만들지 않음
+HLS_RENDITIONS = getattr(settings, 'HLS_RENDITIONS', ((360, '800k', '96k'), (540, '1500k', '128k'), (720, '2800k', '128k')))
+# 세그먼트가 짧을수록 첫 화면이 빨리 뜨고 넘긴 릴스에서 버려지는 양이 적음
+HLS_SEGMENT_SECONDS = getattr(settings, 'HLS_SEGMENT_SECONDS', 2)
+HLS_TRANSCODE_TIMEOUT = getattr(settings, 'HLS_TRANSCODE_TIMEOUT', 15 * 60)
+HLS_DIR = 'hls'
+HLS_MASTER_PLAYLIST = 'master.m3u8'
+
+VIDEO_SIZE_PATTERN = re.compile(r'Stream #.*?Video:.*?, (\d{2,5})x(\d{2,5})')
+ROTATION_PATTERN = re.compile(r'rotat(?:e|ion)\s*:\s*(-?\d+)')
+
+def inspect_streams(ffmpeg, path):
+    # ffmpeg -i 의 스트림 정보에서 해상도와 오디오 유무를 읽음
+    result = subprocess.run([ffmpeg, '-hide_banner', '-i', path], capture_output=True, text=True, errors='replace')
+    match = VIDEO_SIZE_PATTERN.search(result.stderr)
+    if match is None:
+        raise ValueError('No video stream found.')
+    width, height = int(match.group(1)), int(match.group(2))
+    rotation = ROTATION_PATTERN.search(result.stderr)
+    if rotation and abs(int(rotation.group(1))) % 180 == 90:
+        width, height = height, width
+    has_audio = re.search(r'Stream #.*?Audio:', result.stderr) is not None
+    return width, height, has_audio
+
+def build_command(ffmpeg, source, output_dir, width, height, has_audio):
+    short_side = min(width, height)
+    renditions = [rendition for rendition in HLS_RENDITIONS if rendition[0] <= short_side] or [HLS_RENDITIONS[0]]
+
+    filters = [f'[0:v]split={len(renditions)}' + ''.join(f'[s{i}]' for i in range(len(renditions)))]
+    for i, (size, _, _) in enumerate(renditions):
+        size = min(size, short_side) - min(size, short_side) % 2
+        scale = f'scale=-2:{size}' if width >= height else f'scale={size}:-2'
+        filters.append(f'[s{i}]{scale}[v{i}]')
+
+    command = [ffmpeg, '-v', 'error', '-y', '-i', source, '-filter_complex', ';'.join(filters)]
+    stream_map = []
+    for i, (_, video_bitrate, audio_bitrate) in enumerate(renditions):
+        bitrate = int(video_bitrate.rstrip('k'))
+        command += [
+            '-map', f'[v{i}]', f'-c:v:{i}', 'libx264', f'-b:v:{i}', video_bitrate,
+            f'-maxrate:v:{i}', f'{bitrate * 107 // 100}k', f'-bufsize:v:{i}', f'{bitrate * 3 // 2}k',
+        ]
+        if has_audio:
+            command += ['-map', 'a:0', f'-c:a:{i}', 'aac', f'-b:a:{i}', audio_bitrate, '-ac', '2']
+            stream_map.append(f'v:{i},a:{i}')
+        else:
+            stream_map.append(f'v:{i}')
+
+    command += [
+        '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p', '-sc_threshold', '0',
+        # 모든 세그먼트가 키프레임으로 시작하도록 고정
+        '-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})',
+        '-f', 'hls', '-hls_time', str(HLS_SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', os.path.join(output_dir, 'v%v', 'seg_%03d.ts'),
+        '-master_pl_name', HLS_MASTER_PLAYLIST,
+        '-var_stream_map', ' '.join(stream_map),
+        os.path.join(output_dir, 'v%v', 'index.m3u8'),
+    ]
+    return command
+
+def transcode_hls(field_file):
+    # 원본 영상을 여러 화질의 HLS 로 변환해 저장하고 마스터 플레이리스트 경로를 반환
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    work_dir = tempfile.mkdtemp(prefix='hls-')
+    try:
+        try:
+            source = field_file.path
+        except NotImplementedError:
+            # 로컬 경로가 없는 스토리지는 임시 파일로 내려받음
+            source = os.path.join(work_dir, 'source' + os.path.splitext(field_file.name)[1])
+            field_file.open('rb')
+            try:
+                with open(source, 'wb') as fp:
+                    for chunk in field_file.chunks():
+                        fp.write(chunk)
+            finally:
+                field_file.close()
+
+        width, height, has_audio = inspect_streams(ffmpeg, source)
+        output_dir = os.path.join(work_dir, 'out')
+        os.makedirs(output_dir)
+        command = build_command(ffmpeg, source, output_dir, width, height, has_audio)
+        result = subprocess.run(command, capture_output=True, text=True, errors='replace', timeout=HLS_TRANSCODE_TIMEOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f'ffmpeg exited with {result.returncode}: {result.stderr[-500:]}')
+
+        # 플레이리스트가 상대 경로로 세그먼트를 가리키므로 겹치지 않는(다시 쓰이지 않는) 디렉터리에 그대로 저장
+        target_dir = f'{HLS_DIR}/{uuid.uuid4().hex}'
+        for root, _, files in os.walk(output_dir):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                relative = os.path.relpath(path, output_dir).replace(os.sep, '/')
+                with open(path, 'rb') as fp:
+                    default_storage.save(f'{target_dir}/{relative}', File(fp))
+        return f'{target_dir}/{HLS_MASTER_PLAYLIST}'
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def delete_hls(master_playlist):
+    if not master_playlist:
+        return
+    directory = os.path.dirname(master_playlist)
+    sub_dirs, files = default_storage.listdir(directory)
+    for sub_dir in sub_dirs:
+        for file_name in default_storage.listdir(f'{directory}/{sub_dir}')[1]:
+            default_storage.delete(f'{directory}/{sub_dir}/{file_name}')
+    for file_name in files:
+        default_storage.delete(f'{directory}/{file_name}')
@@ -0,0 +1,73 @@
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# 생성할 썸네일 가로 폭 (원본보다 작은 것만 생성하고 원본 폭은 항상 포함)
+IMAGE_VARIANT_WIDTHS = getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1080))
+IMAGE_VARIANT_FORMATS = (('jpeg', 'jpg', 82), ('webp', 'webp', 80))
+IMAGE_VARIANT_DIR = 'variants'
+
+_executor = None
+
+def get_executor():
+    # 리사이즈/인코딩은 CPU 작업이라 GIL 을 피해 별도 프로세스에서 수행
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=getattr(settings, 'IMAGE_PROCESS_WORKERS', 2))
+    return _executor
+
+def render_variants(data, widths):
+    from PIL import Image as PILImage, ImageOps
+
+    with PILImage.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'RGBA'):
+            source = source.convert('RGBA' if 'transparency' in source.info else 'RGB')
+        original_width, original_height = source.size
+        targets = sorted({width for width in widths if width < original_width} | {original_width})
+
+        rendered = []
+        for width in targets:
+            height = max(1, round(original_height * width / original_width))
+            resized = source if width == original_width else source.resize((width, height), PILImage.LANCZOS)
+            for format_name, extension, quality in IMAGE_VARIANT_FORMATS:
+                image = resized.convert('RGB') if format_name == 'jpeg' and resized.mode != 'RGB' else resized
+                buffer = io.BytesIO()
+                image.save(buffer, format=format_name.upper(), quality=quality, optimize=format_name == 'jpeg')
+                rendered.append((width, format_name, extension, buffer.getvalue()))
+        return rendered
+
+def generate_image_variants(field_file):
+    # 원본 파일로부터 폭별 JPEG/WebP 파생 이미지를 만들고 {형식: {폭: 저장 경로}} 로 반환
+    field_file.open('rb')
+    try:
+        data = field_file.read()
+    finally:
+        field_file.close()
+
+    rendered = get_executor().submit(render_variants, data, IMAGE_VARIANT_WIDTHS).result()
+    # 원본 내용 해시로 이름을 지어 내용이 바뀌지 않는 파일로 오래 캐시할 수 있게 함
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    variants = {}
+    for width, format_name, extension, content in rendered:
+        name = default_storage.save(f'{IMAGE_VARIANT_DIR}/{digest}_{width}.{extension}', ContentFile(content))
+        variants.setdefault(format_name, {})[str(width)] = name
+    return variants
+
+def delete_image_variants(variants):
+    for names in (variants or {}).values():
+        for name in names.values():
+            default_storage.delete(name)
+
+def build_srcset(variants, request=None):
+    srcset = {}
+    for format_name, names in (variants or {}).items():
+        urls = {}
+        for width, name in names.items():
+            url = default_storage.url(name)
+            urls[width] = request.build_absolute_uri(url) if request is not None else url
+        srcset[format_name] = urls
+    return srcset
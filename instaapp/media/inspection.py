@@ -0,0 +1,46 @@
+import hashlib
+import magic
+from instaapp.media.probe import ChunkReader, probe_duration
+
+# MIME 판별에 쓰는 앞부분 크기 (libmagic 은 대부분 앞 수 KB 만 봄)
+MIME_SNIFF_SIZE = 8192
+VIDEO_MIME_PREFIX = 'video/'
+
+class UploadInfo:
+    def __init__(self, mime_type, size, sha256, duration=None):
+        self.mime_type = mime_type
+        self.size = size
+        self.sha256 = sha256
+        self.duration = duration
+
+class HashingChunks:
+    # 청크를 흘려보내면서 크기와 sha256 을 계산
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.hasher.update(chunk)
+            self.size += len(chunk)
+            yield chunk
+
+def inspect_upload(value):
+    # 파일을 청크 단위로 한 번만 읽어 MIME 타입, 해시, 영상 길이를 구함 (결과는 파일 객체에 보관)
+    info = getattr(value, '_upload_info', None)
+    if info is not None:
+        return info
+
+    hashing = HashingChunks(value.chunks())
+    reader = ChunkReader(hashing)
+    mime_type = magic.from_buffer(reader.peek(MIME_SNIFF_SIZE), mime=True)
+    duration = probe_duration(reader) if mime_type.startswith(VIDEO_MIME_PREFIX) else None
+    # 길이를 읽은 뒤 남은 부분은 해시 계산을 위해 흘려보냄
+    for _ in reader:
+        pass
+    value.seek(0)
+
+    info = UploadInfo(mime_type, hashing.size, hashing.hasher.hexdigest(), duration)
+    value._upload_info = info
+    return info
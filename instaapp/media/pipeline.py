@@ -0,0 +1,207 @@
+import asyncio
+import logging
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.utils import timezone
+from instaapp.media.hls import delete_hls, transcode_hls
+from instaapp.media.images import delete_image_variants, generate_image_variants
+from instaapp.media.inspection import inspect_upload
+from instaapp.models.blob import MediaBlob
+from instaapp.models.media import MediaStatus
+from instaapp.models.post import Post
+from instaapp.media.queue import enqueue
+from instaapp.models.reels import Reels, Video
+from instaapp.models.user import CustomUser
+from instaapp.models.validators import (
+    FEED_MAX_VIDEO_LENGTH, FEED_MIME_TYPES, REELS_MAX_VIDEO_LENGTH, REELS_MIME_TYPES,
+    validate_feed_file_type, validate_feed_video_length,
+    validate_reels_file_type, validate_reels_video_length,
+)
+from instaapp.services.blob_services import check_blob, register_blob
+from instaapp.services.explore_services import refresh_explore_entry
+from instaapp.services.tag_services import record_published_tags
+from instaapp.services.timeline_services import fan_out_post
+
+logger = logging.getLogger(__name__)
+
+# 이 시간 동안 상태가 바뀌지 않은 대기/처리 중 항목은 프로세스가 재시작되며 작업이 사라진 것으로 보고 다시 큐에 넣음
+MEDIA_PROCESSING_TIMEOUT = timedelta(minutes=getattr(settings, 'MEDIA_PROCESSING_TIMEOUT_MINUTES', 10))
+# 이만큼 시도해도 끝나지 않으면 (처리 중 프로세스가 계속 죽는 파일 등) 실패 처리
+MEDIA_PROCESSING_MAX_ATTEMPTS = getattr(settings, 'MEDIA_PROCESSING_MAX_ATTEMPTS', 3)
+MEDIA_SWEEP_INTERVAL = getattr(settings, 'MEDIA_SWEEP_INTERVAL', 5 * 60)
+UNFINISHED = [MediaStatus.PENDING, MediaStatus.PROCESSING]
+
+# 피드 이미지/영상 한 건 처리
+def process_image(image):
+    if image.blob_id is not None:
+        # 이미 처리된 내용이면 파일을 다시 읽지 않고 저장된 결과를 재사용
+        check_blob(image.blob, FEED_MIME_TYPES, FEED_MAX_VIDEO_LENGTH)
+        image.variants = image.blob.variants
+        image.save(update_fields=['variants'])
+        return
+
+    image.file.open('rb')
+    try:
+        mime_type = validate_feed_file_type(image.file)
+        if mime_type.startswith('video/'):
+            validate_feed_video_length(image.file)
+        info = inspect_upload(image.file)
+    finally:
+        image.file.close()
+
+    variants = generate_image_variants(image.file) if mime_type.startswith('image/') else {}
+    blob, created = register_blob(image, info, variants=variants)
+    if not created:
+        delete_image_variants(variants)
+        variants = blob.variants
+    image.variants = variants
+    image.save(update_fields=['variants'])
+
+# 릴스 영상 한 건 처리
+def process_video(video):
+    if video.blob_id is not None:
+        check_blob(video.blob, REELS_MIME_TYPES, REELS_MAX_VIDEO_LENGTH)
+        return
+
+    video.file.open('rb')
+    try:
+        validate_reels_file_type(video.file)
+        validate_reels_video_length(video.file)
+        info = inspect_upload(video.file)
+    finally:
+        video.file.close()
+
+    register_blob(video, info)
+
+# 프로필 사진 파생 이미지 생성
+def process_profile_picture(user_id):
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is None or not user.profile_picture:
+        return
+    previous = user.profile_picture_variants
+    variants = generate_image_variants(user.profile_picture)
+    # 그 사이 사진이 다시 바뀌었으면 반영하지 않음
+    updated = CustomUser.objects.filter(pk=user_id, profile_picture=user.profile_picture.name).update(profile_picture_variants=variants)
+    delete_image_variants(previous if updated else variants)
+
+def publish_post(post):
+    fan_out_post(post)
+    refresh_explore_entry(post)
+
+def publish_new_post(post_id):
+    # 파일 없는 게시물: 팔로워 수만큼 타임라인에 넣는 작업은 요청 스레드가 아닌 큐에서
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is not None:
+        publish_post(post)
+
+def publish_reels(reels):
+    refresh_explore_entry(reels)
+    enqueue(transcode_reels_videos, reels.id)
+
+def publish_new_reels(reels_id):
+    reels = Reels.objects.filter(pk=reels_id).first()
+    if reels is not None:
+        publish_reels(reels)
+
+# 릴스 영상 HLS 변환 (공개 후 별도 작업으로 실행)
+def transcode_reels_videos(reels_id):
+    for video in Video.objects.select_related('blob').filter(reels_id=reels_id, hls_playlist=''):
+        transcode_video(video)
+
+def transcode_video(video):
+    # 같은 내용의 영상이 이미 변환됐으면 그 결과를 공유
+    blob = video.blob
+    playlist = blob.hls_playlist if blob is not None else ''
+    if not playlist:
+        playlist = transcode_hls(video.file)
+        # 동시에 변환된 경우 먼저 저장된 것을 남김
+        if blob is not None and not MediaBlob.objects.filter(pk=blob.pk, hls_playlist='').update(hls_playlist=playlist):
+            delete_hls(playlist)
+            blob.refresh_from_db(fields=['hls_playlist'])
+            playlist = blob.hls_playlist
+    if not Video.objects.filter(pk=video.pk, hls_playlist='').update(hls_playlist=playlist) and blob is None:
+        delete_hls(playlist)
+
+def process_post_media(post_id):
+    post = Post.objects.select_related('author').filter(pk=post_id).first()
+    if post is not None:
+        _process(post, post.images.select_related('blob'), process_image, publish_post)
+
+def process_reels_media(reels_id):
+    reels = Reels.objects.select_related('author').filter(pk=reels_id).first()
+    if reels is not None:
+        _process(reels, reels.videos.select_related('blob'), process_video, publish_reels)
+
+def _process(obj, items, process_item, publish):
+    # 이미 끝난 항목(다시 큐에 들어온 것 등)은 건너뜀
+    claimed = type(obj).objects.filter(pk=obj.pk, status__in=UNFINISHED).update(
+        status=MediaStatus.PROCESSING, status_updated_at=timezone.now(), processing_attempts=F('processing_attempts') + 1,
+    )
+    if not claimed:
+        return
+    try:
+        for item in items:
+            process_item(item)
+    except ValidationError as e:
+        _finish(obj, MediaStatus.FAILED, '; '.join(e.messages))
+    except Exception:
+        logger.exception(f"Processing media for {type(obj).__name__} {obj.pk} failed")
+        _finish(obj, MediaStatus.FAILED, 'Unable to process media file.')
+    else:
+        _finish(obj, MediaStatus.READY)
+        record_published_tags(obj)
+        publish(obj)
+    notify_media_status(obj)
+
+def _finish(obj, status, error=''):
+    obj.status = status
+    obj.processing_error = error[:255]
+    obj.status_updated_at = timezone.now()
+    obj.save(update_fields=['status', 'processing_error', 'status_updated_at'])
+
+def sweep_stale_media(older_than=MEDIA_PROCESSING_TIMEOUT, dispatch=enqueue):
+    # 작업 큐가 프로세스 안에 있어 재시작하면 대기/처리 중이던 작업이 사라지므로 주기적으로 다시 넣음
+    now = timezone.now()
+    swept = {}
+    for model, process in ((Post, process_post_media), (Reels, process_reels_media)):
+        stale = model.objects.filter(status__in=UNFINISHED, status_updated_at__lt=now - older_than)
+        failed = 0
+        for obj in stale.filter(processing_attempts__gte=MEDIA_PROCESSING_MAX_ATTEMPTS):
+            _finish(obj, MediaStatus.FAILED, 'Media processing did not finish.')
+            notify_media_status(obj)
+            failed += 1
+
+        requeued = 0
+        for pk, status_updated_at in stale.filter(processing_attempts__lt=MEDIA_PROCESSING_MAX_ATTEMPTS).values_list('pk', 'status_updated_at'):
+            # 동시에 도는 다른 sweeper 와 겹치지 않도록 상태를 먼저 바꾼 쪽만 큐에 넣음
+            if model.objects.filter(pk=pk, status_updated_at=status_updated_at).update(status=MediaStatus.PENDING, status_updated_at=now):
+                dispatch(process, pk)
+                requeued += 1
+        swept[model.__name__] = (requeued, failed)
+    return swept
+
+async def run_media_sweeper():
+    # ASGI lifespan 에서 시작, 서버가 떠 있는 동안 MEDIA_SWEEP_INTERVAL 마다 실행
+    while True:
+        enqueue(sweep_stale_media)
+        await asyncio.sleep(MEDIA_SWEEP_INTERVAL)
+
+def notify_media_status(obj):
+    # 작성자의 user_{id} 그룹으로 처리 결과 전송
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(f'user_{obj.author_id}', {
+            'type': 'media.status',
+            'kind': 'post' if isinstance(obj, Post) else 'reels',
+            'id': obj.pk,
+            'status': obj.status,
+            'error': obj.processing_error,
+        })
+    except Exception:
+        logger.exception(f"Sending media status for {type(obj).__name__} {obj.pk} failed")
@@ -0,0 +1,199 @@
+import struct
+
+# moov 박스가 이보다 크면 파싱하지 않고 기존 방식으로 처리
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+# MPEG-PS 마지막 pack header 를 찾기 위해 보관하는 끝부분 크기
+MPEG_TAIL_SIZE = 256 * 1024
+MPEG_PACK_START = b'\x00\x00\x01\xba'
+MPEG_CLOCK_RATE = 90000
+MP4_TOP_LEVEL_BOXES = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pdin', b'styp'}
+
+# 청크 단위로 들어오는 업로드를 필요한 만큼만 읽음 (건너뛴 부분은 메모리에 남기지 않음)
+class ChunkReader:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+
+    def _fill(self, size):
+        if len(self.buffer) >= size:
+            return True
+        parts = [self.buffer]
+        total = len(self.buffer)
+        while total < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            parts.append(chunk)
+            total += len(chunk)
+        self.buffer = b''.join(parts)
+        return total >= size
+
+    def peek(self, size):
+        self._fill(size)
+        return self.buffer[:size]
+
+    def read(self, size):
+        self._fill(size)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def skip(self, size):
+        while size > len(self.buffer):
+            size -= len(self.buffer)
+            self.buffer = next(self.chunks, None)
+            if self.buffer is None:
+                self.buffer = b''
+                return False
+        self.buffer = self.buffer[size:]
+        return True
+
+    def __iter__(self):
+        if self.buffer:
+            yield self.buffer
+            self.buffer = b''
+        yield from self.chunks
+
+def probe_duration(chunks):
+    # 컨테이너 헤더에서 재생 시간(초)을 읽음, 해석할 수 없으면 None
+    reader = ChunkReader(chunks)
+    head = reader.peek(12)
+    if len(head) >= 8 and head[4:8] in MP4_TOP_LEVEL_BOXES:
+        return probe_mp4_duration(reader)
+    if head.startswith(MPEG_PACK_START):
+        return probe_mpeg_ps_duration(reader)
+    return None
+
+def probe_mp4_duration(reader):
+    while True:
+        header = reader.read(8)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            large_size = reader.read(8)
+            if len(large_size) < 8:
+                return None
+            size = struct.unpack('>Q', large_size)[0]
+            header_size = 16
+        elif size == 0:
+            # 파일 끝까지 이어지는 박스 (moov 가 아니면 더 읽을 것이 없음)
+            if box_type != b'moov':
+                return None
+            return parse_moov(reader.read(MAX_MOOV_SIZE))
+        if size < header_size:
+            return None
+
+        body_size = size - header_size
+        if box_type == b'moov':
+            if body_size > MAX_MOOV_SIZE:
+                return None
+            body = reader.read(body_size)
+            if len(body) < body_size:
+                return None
+            return parse_moov(body)
+        if not reader.skip(body_size):
+            return None
+
+def iter_boxes(data):
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > len(data):
+                return
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header_size or offset + size > len(data):
+            return
+        yield box_type, data[offset + header_size:offset + size]
+        offset += size
+
+def parse_moov(moov):
+    timescale = None
+    duration = None
+    fragment_duration = None
+    for box_type, body in iter_boxes(moov):
+        if box_type == b'mvhd':
+            timescale, duration = parse_mvhd(body)
+        elif box_type == b'mvex':
+            for child_type, child in iter_boxes(body):
+                if child_type == b'mehd':
+                    fragment_duration = parse_mehd(child)
+    if not timescale:
+        return None
+    # fragmented MP4 는 mvhd 대신 mehd 에 전체 길이가 있음
+    if not duration and fragment_duration:
+        duration = fragment_duration
+    if not duration:
+        return None
+    return duration / timescale
+
+def parse_mvhd(body):
+    if not body:
+        return None, None
+    version = body[0]
+    if version == 1 and len(body) >= 32:
+        timescale, duration = struct.unpack_from('>IQ', body, 20)
+        unknown = 0xFFFFFFFFFFFFFFFF
+    elif version == 0 and len(body) >= 20:
+        timescale, duration = struct.unpack_from('>II', body, 12)
+        unknown = 0xFFFFFFFF
+    else:
+        return None, None
+    if duration == unknown:
+        duration = None
+    return timescale, duration
+
+def parse_mehd(body):
+    if not body:
+        return None
+    if body[0] == 1 and len(body) >= 12:
+        return struct.unpack_from('>Q', body, 4)[0]
+    if len(body) >= 8:
+        return struct.unpack_from('>I', body, 4)[0]
+    return None
+
+def probe_mpeg_ps_duration(reader):
+    # 첫 pack header 와 마지막 pack header 의 SCR 차이
+    first_scr = None
+    tail = b''
+    for chunk in reader:
+        if first_scr is None:
+            tail += chunk
+            first_scr = find_scr(tail, last=False)
+        else:
+            tail += chunk
+        if len(tail) > MPEG_TAIL_SIZE:
+            tail = tail[-MPEG_TAIL_SIZE:]
+    last_scr = find_scr(tail, last=True)
+    if first_scr is None or last_scr is None or last_scr <= first_scr:
+        return None
+    return (last_scr - first_scr) / MPEG_CLOCK_RATE
+
+def find_scr(data, last=False):
+    position = data.rfind(MPEG_PACK_START) if last else data.find(MPEG_PACK_START)
+    while position != -1:
+        scr = parse_scr(data[position + 4:position + 10])
+        if scr is not None:
+            return scr
+        position = data.rfind(MPEG_PACK_START, 0, position) if last else data.find(MPEG_PACK_START, position + 1)
+    return None
+
+def parse_scr(header):
+    if len(header) < 6:
+        return None
+    b0, b1, b2, b3, b4 = header[:5]
+    if b0 >> 6 == 0b01:
+        # MPEG-2 pack header
+        return (
+            ((b0 >> 3) & 0x07) << 30 | (b0 & 0x03) << 28 | b1 << 20 |
+            ((b2 >> 3) & 0x1F) << 15 | (b2 & 0x03) << 13 | b3 << 5 | (b4 >> 3)
+        )
+    if b0 >> 4 == 0b0010:
+        # MPEG-1 pack header
+        return ((b0 >> 1) & 0x07) << 30 | b1 << 22 | (b2 >> 1) << 15 | b3 << 7 | (b4 >> 1)
+    return None
@@ -0,0 +1,50 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# 외부 서비스 없이 프로세스 안에서 도는 작업 큐
+class LocalQueueBackend:
+    def __init__(self, max_workers=None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or getattr(settings, 'MEDIA_QUEUE_WORKERS', 2),
+            thread_name_prefix='media-worker',
+        )
+
+    def enqueue(self, func, *args):
+        return self.executor.submit(self.run, func, *args)
+
+    def run(self, func, *args):
+        close_old_connections()
+        try:
+            return func(*args)
+        except Exception:
+            logger.exception(f"Media job {func.__name__}{args} failed")
+        finally:
+            close_old_connections()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+# 요청 안에서 바로 실행 (테스트, 관리 명령용)
+class ImmediateQueueBackend:
+    def enqueue(self, func, *args):
+        return func(*args)
+
+    def shutdown(self, wait=True):
+        pass
+
+_queue = None
+
+def get_queue():
+    global _queue
+    if _queue is None:
+        backend = getattr(settings, 'MEDIA_QUEUE_BACKEND', 'instaapp.media.queue.LocalQueueBackend')
+        _queue = import_string(backend)()
+    return _queue
+
+def enqueue(func, *args):
+    return get_queue().enqueue(func, *args)
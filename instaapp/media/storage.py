@@ -0,0 +1,82 @@
+import hashlib
+import hmac
+import os
+import re
+import time
+import uuid
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+MEDIA_UPLOAD_URL_TTL = getattr(settings, 'MEDIA_UPLOAD_URL_TTL', 15 * 60)
+MEDIA_DOWNLOAD_URL_TTL = getattr(settings, 'MEDIA_DOWNLOAD_URL_TTL', 60 * 60)
+MEDIA_DIRECT_UPLOAD_MAX_SIZE = getattr(settings, 'MEDIA_DIRECT_UPLOAD_MAX_SIZE', 1024 * 1024 * 1024)
+# 업로드 대상 디렉터리 (모델의 upload_to 와 같음)
+UPLOAD_PREFIXES = {'post': 'posts', 'reels': 'reels'}
+EXTENSION_PATTERN = re.compile(r'^\.[a-z0-9]{1,8}$')
+
+def make_upload_key(kind, file_name):
+    # 추측할 수 없는 새 경로를 발급 (기존 파일을 덮어쓰지 않도록)
+    extension = os.path.splitext(file_name or '')[1].lower()
+    if not EXTENSION_PATTERN.match(extension):
+        extension = ''
+    return f'{UPLOAD_PREFIXES[kind]}/{uuid.uuid4().hex}{extension}'
+
+# 클라이언트가 Django 를 거치지 않고 저장소에 직접 올리고 받도록 서명 URL 을 발급하는 백엔드의 기본형
+class SignedURLBackend:
+    def presign_upload(self, name, content_type, max_size, request=None):
+        # 발급한 URL 로는 한 번만 쓸 수 있어야 함 (객체 스토리지라면 If-None-Match: * 같은 조건부 쓰기로 덮어쓰기를 막음)
+        raise NotImplementedError
+
+    def presign_download(self, name, request=None):
+        raise NotImplementedError
+
+    def stat(self, name):
+        # 업로드된 객체 크기, 없으면 None
+        raise NotImplementedError
+
+# 객체 스토리지 대신 default_storage(로컬 파일시스템)에 읽고 쓰는 서명 URL 서버 (개발/테스트용)
+class LocalSignedURLBackend(SignedURLBackend):
+    def __init__(self):
+        self.key = settings.SECRET_KEY.encode()
+
+    def sign(self, method, name, expires, max_size=''):
+        message = f'{method}\n{name}\n{expires}\n{max_size}'.encode()
+        return hmac.new(self.key, message, hashlib.sha256).hexdigest()
+
+    def verify(self, method, name, expires, signature, max_size=''):
+        try:
+            if int(expires) < time.time():
+                return False
+        except (TypeError, ValueError):
+            return False
+        return hmac.compare_digest(self.sign(method, name, expires, max_size), signature or '')
+
+    def build_url(self, method, name, ttl, request=None, **params):
+        expires = int(time.time()) + ttl
+        query = {'expires': expires, **params, 'signature': self.sign(method, name, expires, *params.values())}
+        url = reverse('signed-media', kwargs={'name': name}) + '?' + urlencode(query)
+        return (request.build_absolute_uri(url) if request is not None else url), expires
+
+    def presign_upload(self, name, content_type, max_size, request=None):
+        url, expires = self.build_url('PUT', name, MEDIA_UPLOAD_URL_TTL, request, max_size=max_size)
+        return {'method': 'PUT', 'url': url, 'headers': {'Content-Type': content_type}, 'expires': expires}
+
+    def presign_download(self, name, request=None):
+        return self.build_url('GET', name, MEDIA_DOWNLOAD_URL_TTL, request)[0]
+
+    def stat(self, name):
+        if not default_storage.exists(name):
+            return None
+        return default_storage.size(name)
+
+_backend = None
+
+def get_signed_url_backend():
+    global _backend
+    if _backend is None:
+        backend = getattr(settings, 'MEDIA_SIGNED_URL_BACKEND', 'instaapp.media.storage.LocalSignedURLBackend')
+        _backend = import_string(backend)()
+    return _backend
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExploreEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('post', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='explore_entry', to='instaapp.post')),
+                ('reels', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='explore_entry', to='instaapp.reels')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', '-id'], name='explore_score_idx')],
+            },
+        ),
+    ]
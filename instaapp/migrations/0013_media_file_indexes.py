@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:21
+
+import instaapp.models.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0012_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='image',
+            name='file',
+            field=models.FileField(db_index=True, upload_to='posts/', validators=[instaapp.models.validators.validate_feed_file_type]),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='file',
+            field=models.FileField(db_index=True, upload_to='reels/', validators=[instaapp.models.validators.validate_reels_file_type, instaapp.models.validators.validate_reels_video_length]),
+        ),
+    ]
@@ -0,0 +1,36 @@
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fill_client_ids(apps, schema_editor):
+    Message = apps.get_model('instaapp', 'Message')
+    for message in Message.objects.filter(client_id__isnull=True).only('id').iterator(chunk_size=1000):
+        Message.objects.filter(pk=message.pk).update(client_id=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0013_media_file_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='client_id',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_client_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='message',
+            name='client_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:27
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_direct_keys(apps, schema_editor):
+    # 1:1 채팅방(참여자 두 명)과 자기 자신과의 채팅방(참여자 한 명)에 chat_services.make_direct_key 와 같은 형식의 키를 채움
+    # 같은 쌍이 여러 개면 가장 먼저 만든 방만
+    ChatRoom = apps.get_model('instaapp', 'ChatRoom')
+    participants = defaultdict(set)
+    for chatroom_id, user_id in ChatRoom.participants.through.objects.values_list('chatroom_id', 'customuser_id').iterator(chunk_size=5000):
+        participants[chatroom_id].add(user_id)
+
+    used = set()
+    for chatroom_id in sorted(participants):
+        user_ids = participants[chatroom_id]
+        if len(user_ids) == 1:
+            low = high = next(iter(user_ids))
+        elif len(user_ids) == 2:
+            low, high = sorted(user_ids)
+        else:
+            continue
+        direct_key = f'{low}:{high}'
+        if direct_key in used:
+            continue
+        used.add(direct_key)
+        ChatRoom.objects.filter(pk=chatroom_id).update(direct_key=direct_key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0015_inbox_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='direct_key',
+            field=models.CharField(blank=True, editable=False, max_length=41, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_direct_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:34
+
+import unicodedata
+
+from django.db import migrations, models
+
+# instaapp.search.normalize.normalize_tag_name 의 이 시점 사본 (앱 코드가 바뀌어도 마이그레이션 결과가 같도록)
+JONGSEONG = 'ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+COMPOUND_JONGSEONG = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+}
+JONGSEONG_TO_CHOSEONG = {
+    0x11A8 + i: unicodedata.normalize('NFKC', COMPOUND_JONGSEONG.get(letter, letter))
+    for i, letter in enumerate(JONGSEONG)
+}
+NORMALIZED_TAG_MAX_LENGTH = 150
+
+
+def normalize_tag_name(name):
+    folded = unicodedata.normalize('NFKC', name.strip().lstrip('#')).casefold()
+    return unicodedata.normalize('NFD', folded).translate(JONGSEONG_TO_CHOSEONG)[:NORMALIZED_TAG_MAX_LENGTH]
+
+
+def fill_normalized_names(apps, schema_editor):
+    Tag = apps.get_model('instaapp', 'Tag')
+    for tag in Tag.objects.only('id', 'name').iterator(chunk_size=1000):
+        Tag.objects.filter(pk=tag.pk).update(normalized_name=normalize_tag_name(tag.name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0016_chatroom_direct_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='normalized_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_normalized_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0018_user_search_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaptionSearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=5)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('token', models.CharField(max_length=32)),
+                ('term_frequency', models.PositiveSmallIntegerField()),
+                ('doc_length', models.PositiveSmallIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'token', '-created_at'], name='caption_token_recent_idx')],
+                'unique_together': {('kind', 'object_id', 'token')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CaptionSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=5)),
+                ('token', models.CharField(max_length=32)),
+                ('doc_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('kind', 'token')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0019_caption_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagUsageBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_buckets', to='instaapp.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'bucket_start'], name='tag_usage_bucket_idx')],
+                'unique_together': {('tag', 'granularity', 'bucket_start')},
+            },
+        ),
+    ]
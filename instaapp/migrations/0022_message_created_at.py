@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_timestamp(apps, schema_editor):
+    # 기존 메시지는 이미 저장돼 있으므로 보낸 시각을 저장 시각으로 씀
+    Message = apps.get_model('instaapp', 'Message')
+    Message.objects.update(created_at=models.F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0021_direct_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_timestamp, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chatroom', 'created_at', 'id'], name='message_room_created_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    # 기존 행은 만든 시각을 마지막 상태 변경 시각으로 씀
+    for model_name in ('Post', 'Reels'):
+        model = apps.get_model('instaapp', model_name)
+        model.objects.update(status_updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instaapp', '0022_message_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='processing_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='status_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='reels',
+            name='processing_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reels',
+            name='status_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'status_updated_at'], name='post_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reels',
+            index=models.Index(fields=['status', 'status_updated_at'], name='reels_status_updated_idx'),
+        ),
+    ]
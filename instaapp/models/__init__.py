@@ -6,4 +6,11 @@ from .tag import Tag
 from .like import Like
 from .mark import Mark
 from .comment import Comment
-from .chatroom import ChatRoom, Message
\ No newline at end of file
+from .chatroom import ChatRoom, Message
+from .timeline import TimelineEntry
+from .explore import ExploreEntry
+from .blob import MediaBlob
+from .upload import UploadSession, DirectUpload
+from .inbox import InboxEntry
+from .search import UserSearchToken, CaptionSearchPosting, CaptionSearchTerm
+from .trending import TagUsageBucket
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.db import models
+
+# 내용(sha256) 기준으로 한 번만 저장되는 업로드 원본과 파생 파일 (Image/Video 가 공유)
+class MediaBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='blobs/', max_length=255)
+    mime_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    duration = models.FloatField(null=True, blank=True)
+    variants = models.JSONField(default=dict, blank=True)
+    hls_playlist = models.CharField(max_length=255, blank=True, default='')
+    # 이 파일을 가리키는 Image/Video 수 (0 이 되면 파일과 함께 삭제)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
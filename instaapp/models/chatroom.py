@@ -1,9 +1,13 @@
+import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class ChatRoom(models.Model):
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='chatrooms')
     created_at = models.DateTimeField(auto_now_add=True)
+    # 1:1 채팅방의 참여자 쌍 "작은id:큰id" (그룹 채팅방은 None)
+    direct_key = models.CharField(max_length=41, unique=True, null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"ChatRoom {self.id}"
@@ -13,7 +17,17 @@ class Message(models.Model):
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='sent_messages', on_delete=models.CASCADE)
     receiver = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='received_messages', on_delete=models.CASCADE)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # 저장 전에 먼저 전송되므로 시각과 식별자는 생성 시점에 정함 (id 는 일괄 저장 후에 생김)
+    timestamp = models.DateTimeField(default=timezone.now)
+    client_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # 실제로 저장된 시각 (쓰기 버퍼가 늦게 저장해도 커지기만 하므로 동기화 커서로 씀)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['chatroom', 'timestamp', 'id'], name='message_room_timestamp_idx'),
+            models.Index(fields=['chatroom', 'created_at', 'id'], name='message_room_created_idx'),
+        ]
 
     def __str__(self):
         return f"Message {self.id} from {self.sender.username} to {self.receiver.username}"
\ No newline at end of file
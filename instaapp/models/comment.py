@@ -11,5 +11,11 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+            models.Index(fields=['reels', 'created_at', 'id'], name='comment_reels_created_idx'),
+        ]
+
     def __str__(self):
         return f'{self.user.username} commented on {self.post.id if self.post else self.reels.id}'
@@ -0,0 +1,20 @@
+from django.db import models
+from .post import Post
+from .reels import Reels
+
+# 탐색 탭 랭킹 (rank_explore 명령과 좋아요/댓글 발생 시 갱신)
+class ExploreEntry(models.Model):
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, related_name='explore_entry', null=True, blank=True)
+    reels = models.OneToOneField(Reels, on_delete=models.CASCADE, related_name='explore_entry', null=True, blank=True)
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', '-id'], name='explore_score_idx'),
+        ]
+
+    def __str__(self):
+        if self.post_id:
+            return f'Explore post {self.post_id}'
+        return f'Explore reels {self.reels_id}'
@@ -8,6 +8,10 @@ class Follow(models.Model):
     
     class Meta:
         unique_together = ('follower', 'followed')
+        indexes = [
+            models.Index(fields=['follower', '-created_at', '-id'], name='follow_follower_recent_idx'),
+            models.Index(fields=['followed', '-created_at', '-id'], name='follow_followed_recent_idx'),
+        ]
         
     def __str__(self):
         return f"{self.follower.username} follows {self.followed.username}"
\ No newline at end of file
@@ -0,0 +1,24 @@
+from django.db import models
+from .user import CustomUser
+from .chatroom import ChatRoom
+
+# 사용자별 채팅 목록 (메시지 저장/읽음 처리 시 갱신, rebuild_inbox 로 보정)
+class InboxEntry(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='inbox_entries')
+    chatroom = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='inbox_entries')
+    # 1:1 채팅방의 상대방 (목록에 표시)
+    other_user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+    last_message = models.CharField(max_length=100, blank=True, default='')
+    last_sender = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    last_message_at = models.DateTimeField()
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'chatroom')
+        indexes = [
+            models.Index(fields=['user', '-last_message_at', '-id'], name='inbox_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f'ChatRoom {self.chatroom_id} in inbox of {self.user_id}'
@@ -0,0 +1,18 @@
+from django.db import models
+from django.db.models import Q
+
+# 업로드한 미디어의 처리 상태
+class MediaStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    PROCESSING = 'processing', 'Processing'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Failed'
+
+class MediaQuerySet(models.QuerySet):
+    # 처리가 끝나 공개된 게시물만
+    def visible(self):
+        return self.filter(status=MediaStatus.READY)
+
+    # 작성자는 처리 중이거나 실패한 자기 게시물도 조회/수정/삭제할 수 있음
+    def visible_to(self, user):
+        return self.filter(Q(status=MediaStatus.READY) | Q(author=user))
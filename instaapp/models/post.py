@@ -1,8 +1,11 @@
 from django.db import models
+from django.utils import timezone
 from .user import CustomUser
 from django.core.exceptions import ValidationError
 from moviepy.editor import VideoFileClip
 from .tag import Tag
+from .blob import MediaBlob
+from .media import MediaStatus, MediaQuerySet
 from .validators import validate_feed_file_type, validate_feed_video_length
 
 # 피드
@@ -13,6 +16,24 @@ class Post(models.Model):
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True)
     mentions = models.ManyToManyField(CustomUser, related_name='mentioned_posts', blank=True)
     site = models.URLField(blank=True, null=True)
+    # 좋아요, 댓글, 저장 수 (reconcile_engagement_counters 로 보정)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    mark_count = models.PositiveIntegerField(default=0)
+    # 미디어 처리 상태 (처리가 끝나야 공개됨)
+    status = models.CharField(max_length=10, choices=MediaStatus.choices, default=MediaStatus.READY)
+    processing_error = models.CharField(max_length=255, blank=True, default='')
+    # 상태가 마지막으로 바뀐 시각과 처리 시도 횟수 (오래 멈춘 처리를 다시 큐에 넣거나 실패 처리할 때 사용)
+    status_updated_at = models.DateTimeField(default=timezone.now)
+    processing_attempts = models.PositiveSmallIntegerField(default=0)
+
+    objects = MediaQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_recent_idx'),
+            models.Index(fields=['status', 'status_updated_at'], name='post_status_updated_idx'),
+        ]
     
     def __str__(self):
         return self.content[:20] if self.content else "No Content"
@@ -20,7 +41,10 @@ class Post(models.Model):
 # 이미지 혹은 영상
 class Image(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='images')
-    file = models.FileField(upload_to='posts/', validators=[validate_feed_file_type])
+    file = models.FileField(upload_to='posts/', validators=[validate_feed_file_type], db_index=True)
+    # 썸네일/WebP 파생 이미지 {형식: {폭: 저장 경로}}
+    variants = models.JSONField(default=dict, blank=True)
+    blob = models.ForeignKey(MediaBlob, on_delete=models.SET_NULL, related_name='images', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -1,7 +1,10 @@
 from django.db import models
+from django.utils import timezone
 from .user import CustomUser
 from django.core.exceptions import ValidationError
 from .tag import Tag
+from .blob import MediaBlob
+from .media import MediaStatus, MediaQuerySet
 from .validators import validate_reels_file_type, validate_reels_video_length
 
 class Reels(models.Model):
@@ -10,13 +13,34 @@ class Reels(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     tags = models.ManyToManyField(Tag, related_name='reels', blank=True)
     mentions = models.ManyToManyField(CustomUser, related_name='mentioned_reels', blank=True)
+    # 좋아요, 댓글, 저장 수 (reconcile_engagement_counters 로 보정)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    mark_count = models.PositiveIntegerField(default=0)
+    # 미디어 처리 상태 (처리가 끝나야 공개됨)
+    status = models.CharField(max_length=10, choices=MediaStatus.choices, default=MediaStatus.READY)
+    processing_error = models.CharField(max_length=255, blank=True, default='')
+    # 상태가 마지막으로 바뀐 시각과 처리 시도 횟수 (오래 멈춘 처리를 다시 큐에 넣거나 실패 처리할 때 사용)
+    status_updated_at = models.DateTimeField(default=timezone.now)
+    processing_attempts = models.PositiveSmallIntegerField(default=0)
+
+    objects = MediaQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', '-created_at', '-id'], name='reels_author_recent_idx'),
+            models.Index(fields=['status', 'status_updated_at'], name='reels_status_updated_idx'),
+        ]
 
     def __str__(self):
         return self.content[:20] if self.content else "No Content"
 
 class Video(models.Model):
     reels = models.ForeignKey(Reels, on_delete=models.CASCADE, related_name='videos')
-    file = models.FileField(upload_to='reels/', validators=[validate_reels_file_type, validate_reels_video_length])
+    file = models.FileField(upload_to='reels/', validators=[validate_reels_file_type, validate_reels_video_length], db_index=True)
+    # HLS 마스터 플레이리스트 경로 (변환 전에는 비어 있고 원본 MP4 로 재생)
+    hls_playlist = models.CharField(max_length=255, blank=True, default='')
+    blob = models.ForeignKey(MediaBlob, on_delete=models.SET_NULL, related_name='videos', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -0,0 +1,44 @@
+from django.db import models
+from .user import CustomUser
+
+# 사용자 검색 색인 (username/name 의 3-gram 과 bio 단어, 프로필 저장 시 갱신)
+class UserSearchToken(models.Model):
+    token = models.CharField(max_length=32)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='search_tokens')
+    weight = models.FloatField()
+
+    class Meta:
+        unique_together = ('token', 'user')
+
+    def __str__(self):
+        return f'{self.token} -> {self.user_id}'
+
+# 게시물/릴스 본문 검색 색인 (토큰별 문서 목록, 최신순으로 읽음)
+class CaptionSearchPosting(models.Model):
+    kind = models.CharField(max_length=5)
+    object_id = models.PositiveBigIntegerField()
+    token = models.CharField(max_length=32)
+    term_frequency = models.PositiveSmallIntegerField()
+    doc_length = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('kind', 'object_id', 'token')
+        indexes = [
+            models.Index(fields=['kind', 'token', '-created_at'], name='caption_token_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.token} -> {self.kind} {self.object_id}'
+
+# 토큰별 문서 수 (BM25 idf 계산용, token='' 은 전체 문서 수)
+class CaptionSearchTerm(models.Model):
+    kind = models.CharField(max_length=5)
+    token = models.CharField(max_length=32)
+    doc_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kind', 'token')
+
+    def __str__(self):
+        return f'{self.kind} {self.token}: {self.doc_count}'
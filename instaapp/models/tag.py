@@ -1,8 +1,15 @@
 from django.db import models
+from instaapp.search.normalize import NORMALIZED_TAG_MAX_LENGTH, normalize_tag_name
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
     post_count = models.PositiveIntegerField(default=0)
+    # 자동완성용 정규화 이름 (대소문자/유니코드 통일, 한글은 자모 단위)
+    normalized_name = models.CharField(max_length=NORMALIZED_TAG_MAX_LENGTH, db_index=True, editable=False, default='')
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_tag_name(self.name)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -0,0 +1,22 @@
+from django.db import models
+from .tag import Tag
+
+# 태그 사용 횟수 (시간/일 단위 구간, compact_tag_usage 로 오래된 구간 삭제)
+class TagUsageBucket(models.Model):
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [(HOUR, 'Hour'), (DAY, 'Day')]
+
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='usage_buckets')
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('tag', 'granularity', 'bucket_start')
+        indexes = [
+            models.Index(fields=['granularity', 'bucket_start'], name='tag_usage_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.tag_id} {self.granularity} {self.bucket_start}: {self.count}'
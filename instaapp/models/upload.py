@@ -0,0 +1,40 @@
+import uuid
+from django.db import models
+from .user import CustomUser
+
+# 이어받기 가능한 릴스 영상 업로드 (받은 바이트는 UPLOAD_SESSION_DIR 의 파일에 이어 붙임)
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='upload_sessions')
+    file_name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='upload_session_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f'Upload {self.id} ({self.offset}/{self.size})'
+
+# 직접 업로드 (presign 때 만들고, 서명 URL 은 처음 성공한 PUT 한 번만, 토큰은 register 한 번만 쓸 수 있음)
+class DirectUpload(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='direct_uploads')
+    kind = models.CharField(max_length=10)
+    key = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    uploaded_at = models.DateTimeField(null=True, blank=True)
+    registered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='direct_upload_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'Direct upload {self.key}'
@@ -33,10 +33,14 @@ class CustomUser(AbstractUser):
     birth_date = models.DateField(blank=True, null=True)
     # 프로필 사진
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    # 프로필 사진 파생 이미지 {형식: {폭: 저장 경로}}
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
     # 웹 사이트
     website = models.URLField(blank=True, null=True)
     # 활성화 여부
     is_active = models.BooleanField(default=True)
+    # 팔로워 수 (reconcile_follower_counts 로 보정)
+    follower_count = models.PositiveIntegerField(default=0)
     
     groups = models.ManyToManyField(Group, related_name='customuser_set')
     user_permissions = models.ManyToManyField(Permission, related_name='customuser_set')
@@ -1,18 +1,33 @@
 import os
-import magic
 import tempfile
 from django.core.exceptions import ValidationError
 from moviepy.editor import VideoFileClip
+from instaapp.media.inspection import inspect_upload
+
+FEED_MIME_TYPES = ['image/jpeg', 'image/png', 'image/jpg', 'video/mp4', 'video/mpeg']
+FEED_MAX_VIDEO_LENGTH = 60
+REELS_MIME_TYPES = ['video/mp4', 'video/mpeg']
+REELS_MAX_VIDEO_LENGTH = 90
 
 def validate_file_type(value, valid_mime_types):
-    # value가 _io.BytesIO 객체일 경우 파일의 MIME 타입을 추출
-    file_mime_type = magic.from_buffer(value.read(), mime=True)
-    value.seek(0)  # 파일 포인터를 처음으로 되돌립니다.
+    # 파일 전체를 메모리에 올리지 않고 청크 스트림 앞부분으로 MIME 타입을 판별
+    file_mime_type = inspect_upload(value).mime_type
 
     if file_mime_type not in valid_mime_types:
         raise ValidationError(f'Unsupported file type: {file_mime_type}')
+    return file_mime_type
 
 def validate_video_length(value, max_length):
+    # 타입 검사 때 같은 스트림에서 컨테이너 헤더(MP4 moov/mvhd, MPEG pack header)로 읽어둔 길이를 쓰고, 없을 때만 moviepy 사용
+    info = inspect_upload(value)
+    if info.duration is None:
+        info.duration = get_video_duration_with_moviepy(value)
+    duration = info.duration
+
+    if duration > max_length:
+        raise ValidationError(f'Video length exceeds {max_length} seconds.')
+
+def get_video_duration_with_moviepy(value):
     with tempfile.NamedTemporaryFile(delete=False) as tmp:
         for chunk in value.chunks():
             tmp.write(chunk)
@@ -22,8 +37,7 @@ def validate_video_length(value, max_length):
         video = VideoFileClip(tmp_path)
         duration = video.duration
         video.close()  # 비디오 파일을 닫기
-        if duration > max_length:
-            raise ValidationError(f'Video length exceeds {max_length} seconds.')
+        return duration
     except Exception as e:
         raise ValidationError('Unable to process video file.')
     finally:
@@ -34,13 +48,13 @@ def validate_video_length(value, max_length):
                 pass
 
 def validate_feed_file_type(value):
-    validate_file_type(value, ['image/jpeg', 'image/png', 'image/jpg', 'video/mp4', 'video/mpeg'])
+    return validate_file_type(value, FEED_MIME_TYPES)
 
 def validate_feed_video_length(value):
-    validate_video_length(value, 60)
+    validate_video_length(value, FEED_MAX_VIDEO_LENGTH)
 
 def validate_reels_file_type(value):
-    validate_file_type(value, ['video/mp4', 'video/mpeg'])
+    return validate_file_type(value, REELS_MIME_TYPES)
 
 def validate_reels_video_length(value):
-    validate_video_length(value, 90)
+    validate_video_length(value, REELS_MAX_VIDEO_LENGTH)
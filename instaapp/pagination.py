@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+def encode_cursor(position, reverse=False):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in position]
+    payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, ordering=None):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(payload)
+        position, reverse = data['p'], data['r']
+    except (TypeError, ValueError, KeyError):
+        raise NotFound('Invalid cursor')
+    # 조작된 커서: 정렬 키 개수가 다르거나 값이 문자열/숫자가 아니면 거부
+    if not isinstance(position, list) or not isinstance(reverse, (bool, int)):
+        raise NotFound('Invalid cursor')
+    if ordering is not None and len(position) != len(ordering):
+        raise NotFound('Invalid cursor')
+    if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in position):
+        raise NotFound('Invalid cursor')
+    return tuple(position), bool(reverse)
+
+def keyset_filter(ordering, position, reverse=False):
+    # (a, b) 이후의 행: a 가 넘어가거나, a 가 같고 b 가 넘어가는 경우
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, position):
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+# (created_at, id) 같은 정렬 키 기준의 커서 페이지네이션
+class KeysetPagination(BasePagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering=('-created_at', '-id')):
+        self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = queryset.order_by(*self.ordering)
+
+        def fetch(position, reverse, limit):
+            page = queryset
+            if position is not None:
+                page = page.filter(keyset_filter(self.ordering, position, reverse))
+            if reverse:
+                page = page.order_by(*reverse_ordering(self.ordering))
+            return list(page[:limit])
+
+        return self.paginate(fetch, request)
+
+    def paginate(self, fetch, request):
+        # fetch(position, reverse, limit) 는 진행 방향 순서로 결과를 반환
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = None, False
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position, reverse = decode_cursor(cursor, self.ordering)
+
+        try:
+            rows = fetch(position, reverse, self.page_size + 1)
+        except (ValidationError, TypeError, ValueError):
+            # 형식은 맞지만 필드 타입으로 바꿀 수 없는 값 (예: 날짜가 아닌 문자열)
+            raise NotFound('Invalid cursor')
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = self.get_position(rows[-1]) if rows and has_next else None
+        self.previous_position = self.get_position(rows[0]) if rows and has_previous else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_position(self, item):
+        return tuple(getattr(item, field.lstrip('-')) for field in self.ordering)
+
+    def get_link(self, position, reverse):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(position, reverse))
+
+    def get_next_link(self):
+        return self.get_link(self.next_position, False)
+
+    def get_previous_link(self):
+        return self.get_link(self.previous_position, True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -0,0 +1,8 @@
+from django.urls import re_path
+from instaapp.consumers import ChatConsumer, NotificationConsumer
+
+websocket_urlpatterns = [
+    re_path(r'^ws/chat/(?P<chatroom_id>\d+)/$', ChatConsumer.as_asgi()),
+    # 사용자별 소켓: 알림과 구독한 모든 채팅방의 메시지 (ws/chat/<id>/ 는 방 하나만 쓰는 기존 클라이언트용)
+    re_path(r'^ws/notifications/$', NotificationConsumer.as_asgi()),
+]
@@ -0,0 +1,127 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from instaapp.models.tag import Tag
+from instaapp.search.normalize import normalize_tag_name
+
+# 접두사마다 보관하는 태그 수 (요청 최대 개수보다 넉넉히 두어 개수 감소에도 버팀)
+TAG_AUTOCOMPLETE_TOP_K = getattr(settings, 'TAG_AUTOCOMPLETE_TOP_K', 10)
+TAG_AUTOCOMPLETE_CAPACITY = TAG_AUTOCOMPLETE_TOP_K * 2
+# 이보다 긴 접두사는 이 길이의 목록에서 걸러냄 (자모 단위라 한글은 약 7글자)
+TAG_AUTOCOMPLETE_MAX_PREFIX = getattr(settings, 'TAG_AUTOCOMPLETE_MAX_PREFIX', 20)
+# 다른 프로세스의 변경을 놓쳐도 이 시간(초) 뒤에는 DB 기준으로 다시 만듦
+TAG_AUTOCOMPLETE_TIMEOUT = getattr(settings, 'TAG_AUTOCOMPLETE_TIMEOUT', 10 * 60)
+
+# 프로세스 메모리에 접두사 목록을 보관 (LRU, 워커마다 따로 가짐)
+class LocalPrefixStore:
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or getattr(settings, 'TAG_AUTOCOMPLETE_MAX_ENTRIES', 50000)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, prefix):
+        with self.lock:
+            item = self.entries.get(prefix)
+            if item is None:
+                return None
+            expires, suggestions = item
+            if expires < time.monotonic():
+                del self.entries[prefix]
+                return None
+            self.entries.move_to_end(prefix)
+            return suggestions
+
+    def set(self, prefix, suggestions):
+        with self.lock:
+            self.entries[prefix] = (time.monotonic() + TAG_AUTOCOMPLETE_TIMEOUT, suggestions)
+            self.entries.move_to_end(prefix)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, prefix):
+        with self.lock:
+            self.entries.pop(prefix, None)
+
+# Django 캐시(Redis/Memcached 등)에 보관해 모든 워커가 같은 목록을 씀
+class CachePrefixStore:
+    key_prefix = 'tag-ac'
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'TAG_AUTOCOMPLETE_CACHE', 'default')]
+
+    def make_key(self, prefix):
+        return f'{self.key_prefix}:{hashlib.md5(prefix.encode()).hexdigest()}'
+
+    def get(self, prefix):
+        return self.cache.get(self.make_key(prefix))
+
+    def set(self, prefix, suggestions):
+        self.cache.set(self.make_key(prefix), suggestions, TAG_AUTOCOMPLETE_TIMEOUT)
+
+    def delete(self, prefix):
+        self.cache.delete(self.make_key(prefix))
+
+_store = None
+
+def get_prefix_store():
+    global _store
+    if _store is None:
+        backend = getattr(settings, 'TAG_AUTOCOMPLETE_BACKEND', 'instaapp.search.autocomplete.LocalPrefixStore')
+        _store = import_string(backend)()
+    return _store
+
+def sort_key(suggestion):
+    # suggestion: (post_count, name, id)
+    return -suggestion[0], suggestion[1]
+
+def load_prefix(prefix):
+    # 캐시에 없는 접두사는 normalized_name 인덱스 범위 조회로 만듦
+    rows = (
+        Tag.objects.filter(normalized_name__startswith=prefix)
+        .order_by('-post_count', 'name')
+        .values_list('post_count', 'name', 'id')[:TAG_AUTOCOMPLETE_CAPACITY]
+    )
+    suggestions = [tuple(row) for row in rows]
+    get_prefix_store().set(prefix, suggestions)
+    return suggestions
+
+def suggest_tags(query, limit=TAG_AUTOCOMPLETE_TOP_K):
+    normalized = normalize_tag_name(query)
+    if not normalized:
+        return []
+    prefix = normalized[:TAG_AUTOCOMPLETE_MAX_PREFIX]
+    suggestions = get_prefix_store().get(prefix)
+    if suggestions is None:
+        suggestions = load_prefix(prefix)
+    if len(normalized) > len(prefix):
+        suggestions = [s for s in suggestions if normalize_tag_name(s[1]).startswith(normalized)]
+    limit = max(1, min(limit, TAG_AUTOCOMPLETE_TOP_K))
+    return [{'id': tag_id, 'name': name, 'post_count': post_count} for post_count, name, tag_id in suggestions[:limit]]
+
+def update_tag(tag):
+    # 태그가 생기거나 post_count 가 바뀌면 해당 접두사 목록만 고침 (캐시에 없는 접두사는 다음 조회 때 만듦)
+    store = get_prefix_store()
+    suggestion = (tag.post_count, tag.name, tag.id)
+    normalized = tag.normalized_name or normalize_tag_name(tag.name)
+    for end in range(1, min(len(normalized), TAG_AUTOCOMPLETE_MAX_PREFIX) + 1):
+        prefix = normalized[:end]
+        suggestions = store.get(prefix)
+        if suggestions is None:
+            continue
+        previous = [s for s in suggestions if s[2] != tag.id]
+        updated = sorted(previous + [suggestion], key=sort_key)
+        if len(previous) < len(suggestions) and len(suggestions) >= TAG_AUTOCOMPLETE_CAPACITY and updated[-1] == suggestion:
+            # 꽉 찬 목록의 마지막으로 밀려나면 목록 밖 태그가 더 클 수 있으므로 다음 조회 때 다시 만듦
+            store.delete(prefix)
+            continue
+        store.set(prefix, updated[:TAG_AUTOCOMPLETE_CAPACITY])
+
+def remove_tag(tag):
+    store = get_prefix_store()
+    normalized = tag.normalized_name or normalize_tag_name(tag.name)
+    for end in range(1, min(len(normalized), TAG_AUTOCOMPLETE_MAX_PREFIX) + 1):
+        store.delete(normalized[:end])
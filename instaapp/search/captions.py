@@ -0,0 +1,193 @@
+import math
+import re
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from instaapp.models.post import Post
+from instaapp.models.reels import Reels
+from instaapp.models.search import CaptionSearchPosting, CaptionSearchTerm
+from instaapp.search.normalize import fold_text
+
+CAPTION_MODELS = {'post': Post, 'reels': Reels}
+# CaptionSearchTerm 에서 전체 문서 수를 담는 토큰
+TOTAL_TOKEN = ''
+MAX_TOKEN_LENGTH = 30
+MAX_DOC_TOKENS = 200
+MAX_QUERY_TOKENS = 8
+
+# 토큰마다 최신 문서를 이 개수까지만 후보로 읽음 (색인 크기와 관계없이 조회량이 일정)
+CAPTION_SEARCH_CANDIDATES = getattr(settings, 'CAPTION_SEARCH_CANDIDATES', 500)
+# 검색어 토큰 중 이 비율 이상 포함한 문서만
+CAPTION_SEARCH_MIN_MATCH = getattr(settings, 'CAPTION_SEARCH_MIN_MATCH', 0.6)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 점수 = BM25 + 최신성(반감기) + 반응(좋아요/댓글)
+CAPTION_SEARCH_RECENCY_WEIGHT = getattr(settings, 'CAPTION_SEARCH_RECENCY_WEIGHT', 1.0)
+CAPTION_SEARCH_RECENCY_HALF_LIFE = getattr(settings, 'CAPTION_SEARCH_RECENCY_HALF_LIFE', 7 * 24 * 60 * 60)
+CAPTION_SEARCH_ENGAGEMENT_WEIGHT = getattr(settings, 'CAPTION_SEARCH_ENGAGEMENT_WEIGHT', 0.3)
+
+WORD_PATTERN = re.compile(r'\w+')
+SCRIPT_PATTERN = re.compile(r'[가-힣]+|[^가-힣]+')
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+
+def tokenize(text):
+    # 영어 등은 단어 단위, 한글은 조사/어미가 붙어도 맞도록 음절 2-gram (한 글자는 그대로)
+    tokens = []
+    for word in WORD_PATTERN.findall(fold_text(text)):
+        for part in SCRIPT_PATTERN.findall(word):
+            if HANGUL_PATTERN.match(part) and len(part) > 1:
+                tokens.extend(part[i:i + 2] for i in range(len(part) - 1))
+            else:
+                tokens.append(part[:MAX_TOKEN_LENGTH])
+    return tokens
+
+def build_postings(kind, obj):
+    counts = Counter(tokenize(obj.content or ''))
+    length = min(sum(counts.values()), 32767)
+    return [
+        CaptionSearchPosting(
+            kind=kind, object_id=obj.pk, token=token,
+            term_frequency=min(count, 32767), doc_length=length, created_at=obj.created_at,
+        )
+        for token, count in counts.most_common(MAX_DOC_TOKENS)
+    ]
+
+def adjust_doc_counts(kind, tokens, delta):
+    # 문서 수를 F() 로 증감 (없는 토큰은 먼저 만듦)
+    if delta > 0:
+        CaptionSearchTerm.objects.bulk_create([CaptionSearchTerm(kind=kind, token=token) for token in tokens], ignore_conflicts=True)
+        CaptionSearchTerm.objects.filter(kind=kind, token__in=tokens).update(doc_count=F('doc_count') + delta)
+    else:
+        CaptionSearchTerm.objects.filter(kind=kind, token__in=tokens, doc_count__gte=-delta).update(doc_count=F('doc_count') + delta)
+
+def index_document(kind, obj):
+    with transaction.atomic():
+        unindex_document(kind, obj.pk)
+        postings = build_postings(kind, obj)
+        if not postings:
+            return
+        # DB 콜레이션에 따라 다른 토큰이 같은 값으로 취급될 수 있어(예: MySQL 의 café, cafe) 충돌은 무시하고
+        # 문서 수는 실제로 저장된 토큰 기준으로 증가 (unindex_document 가 지울 때와 같은 목록)
+        CaptionSearchPosting.objects.bulk_create(postings, ignore_conflicts=True)
+        tokens = list(CaptionSearchPosting.objects.filter(kind=kind, object_id=obj.pk).values_list('token', flat=True))
+        adjust_doc_counts(kind, tokens + [TOTAL_TOKEN], 1)
+
+def unindex_document(kind, object_id):
+    with transaction.atomic():
+        postings = CaptionSearchPosting.objects.filter(kind=kind, object_id=object_id)
+        tokens = list(postings.values_list('token', flat=True))
+        if not tokens:
+            return
+        postings.delete()
+        adjust_doc_counts(kind, tokens + [TOTAL_TOKEN], -1)
+
+def search_captions(kind, query, limit, position=None, reverse=False):
+    # position 은 (기준 시각, 점수, id) 커서, 같은 기준 시각으로 다시 계산해 다음 페이지를 자름
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not tokens or (position is not None and len(position) != 3):
+        return []
+    as_of = parse_datetime(str(position[0])) if position is not None else timezone.now()
+    if as_of is None:
+        return []
+
+    # 1. 토큰별 최신 문서 후보 (kind, token, -created_at 인덱스 범위 조회)
+    candidates = set()
+    for token in tokens:
+        candidates.update(
+            CaptionSearchPosting.objects.filter(kind=kind, token=token, created_at__lte=as_of)
+            .order_by('-created_at')
+            .values_list('object_id', flat=True)[:CAPTION_SEARCH_CANDIDATES]
+        )
+    if not candidates:
+        return []
+
+    # 2. 후보 문서의 검색어 토큰 빈도와 문서 길이
+    frequencies = {}
+    lengths = {}
+    for object_id, token, term_frequency, doc_length in CaptionSearchPosting.objects.filter(
+        kind=kind, object_id__in=candidates, token__in=tokens
+    ).values_list('object_id', 'token', 'term_frequency', 'doc_length'):
+        frequencies.setdefault(object_id, {})[token] = term_frequency
+        lengths[object_id] = doc_length
+    min_match = max(1, math.ceil(len(tokens) * CAPTION_SEARCH_MIN_MATCH))
+    matched = [object_id for object_id, found in frequencies.items() if len(found) >= min_match]
+    if not matched:
+        return []
+
+    # 3. BM25 + 최신성 + 반응 점수 (공개된 문서만)
+    doc_counts = dict(CaptionSearchTerm.objects.filter(kind=kind, token__in=tokens + [TOTAL_TOKEN]).values_list('token', 'doc_count'))
+    total = max(doc_counts.get(TOTAL_TOKEN, 0), 1)
+    idf = {token: math.log(1 + (total - doc_counts.get(token, 0) + 0.5) / (doc_counts.get(token, 0) + 0.5)) for token in tokens}
+    average_length = sum(lengths.values()) / len(lengths) or 1
+
+    objects = CAPTION_MODELS[kind].objects.visible().in_bulk(matched)
+    ranked = []
+    for object_id, obj in objects.items():
+        relevance = 0
+        for token, term_frequency in frequencies[object_id].items():
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[object_id] / average_length)
+            relevance += idf[token] * term_frequency * (BM25_K1 + 1) / (term_frequency + norm)
+        age = max((as_of - obj.created_at).total_seconds(), 0)
+        recency = 2 ** (-age / CAPTION_SEARCH_RECENCY_HALF_LIFE)
+        engagement = math.log1p(obj.like_count + 2 * obj.comment_count)
+        obj.search_as_of = as_of
+        obj.search_score = round(
+            relevance + CAPTION_SEARCH_RECENCY_WEIGHT * recency + CAPTION_SEARCH_ENGAGEMENT_WEIGHT * engagement, 6
+        )
+        ranked.append(obj)
+    ranked.sort(key=lambda obj: (obj.search_score, obj.pk), reverse=True)
+
+    if position is not None:
+        key = (float(position[1]), int(position[2]))
+        if reverse:
+            ranked = [obj for obj in reversed(ranked) if (obj.search_score, obj.pk) > key]
+        else:
+            ranked = [obj for obj in ranked if (obj.search_score, obj.pk) < key]
+    return ranked[:limit]
+
+def rebuild_caption_index(kind, chunk_size=1000, missing_only=False):
+    # 오프라인 일괄 재색인: 게시물을 청크로 읽어 토큰을 쌓고 마지막에 문서 수를 한 번에 계산
+    model = CAPTION_MODELS[kind]
+    documents = model.objects.exclude(content__isnull=True).exclude(content='').only('id', 'content', 'created_at')
+    if missing_only:
+        indexed_ids = CaptionSearchPosting.objects.filter(kind=kind).values('object_id')
+        documents = documents.exclude(pk__in=indexed_ids)
+    else:
+        CaptionSearchPosting.objects.filter(kind=kind).delete()
+        CaptionSearchTerm.objects.filter(kind=kind).delete()
+
+    doc_counts = Counter()
+    indexed = 0
+    last_pk = 0
+    while True:
+        chunk = list(documents.filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        postings = []
+        for obj in chunk:
+            built = build_postings(kind, obj)
+            if built:
+                postings.extend(built)
+                doc_counts[TOTAL_TOKEN] += 1
+                indexed += 1
+        CaptionSearchPosting.objects.bulk_create(postings, batch_size=5000, ignore_conflicts=True)
+        # index_document 와 같이 충돌로 빠진 토큰은 세지 않도록 저장된 것을 다시 읽음
+        doc_counts.update(
+            CaptionSearchPosting.objects.filter(kind=kind, object_id__in=[obj.pk for obj in chunk]).values_list('token', flat=True)
+        )
+
+    # 같은 증가량끼리 묶어서 갱신 (대부분의 토큰은 문서 수가 작아 묶음 수가 적음)
+    CaptionSearchTerm.objects.bulk_create(
+        [CaptionSearchTerm(kind=kind, token=token) for token in doc_counts], batch_size=5000, ignore_conflicts=True
+    )
+    tokens_by_count = defaultdict(list)
+    for token, count in doc_counts.items():
+        tokens_by_count[count].append(token)
+    for count, tokens in tokens_by_count.items():
+        for start in range(0, len(tokens), 1000):
+            CaptionSearchTerm.objects.filter(kind=kind, token__in=tokens[start:start + 1000]).update(doc_count=F('doc_count') + count)
+    return indexed
@@ -0,0 +1,28 @@
+import unicodedata
+
+# Tag.normalized_name 길이
+NORMALIZED_TAG_MAX_LENGTH = 150
+
+# 받침(종성) 자모를 초성 자모로 바꾸기 위한 표
+# 입력 중인 "한" 이 "하나" 의 앞부분과 맞도록 받침과 다음 글자의 초성을 같게 취급
+JONGSEONG = 'ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+COMPOUND_JONGSEONG = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+}
+JONGSEONG_TO_CHOSEONG = {
+    0x11A8 + i: unicodedata.normalize('NFKC', COMPOUND_JONGSEONG.get(letter, letter))
+    for i, letter in enumerate(JONGSEONG)
+}
+
+def fold_text(text):
+    # 전각/호환 문자 정리(NFKC), 대소문자 통일(casefold)
+    return unicodedata.normalize('NFKC', text or '').casefold()
+
+def normalize_text(text):
+    # fold_text 후 한글 음절을 자모로 분해(NFD)
+    return unicodedata.normalize('NFD', fold_text(text)).translate(JONGSEONG_TO_CHOSEONG)
+
+def normalize_tag_name(name):
+    # NFKC/자모 분해로 이름(50자)보다 길어질 수 있으므로 컬럼 길이에서 자름 (자동완성은 앞부분만 비교)
+    return normalize_text(name.strip().lstrip('#'))[:NORMALIZED_TAG_MAX_LENGTH]
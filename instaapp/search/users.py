@@ -0,0 +1,95 @@
+import math
+import re
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Max, Q, Sum
+from django.db.models.functions import Cast, Ln
+from instaapp.models.search import UserSearchToken
+from instaapp.search.normalize import normalize_text
+
+# 필드별 가중치 (username 3-gram > name 3-gram > bio 단어)
+USERNAME_WEIGHT = 3.0
+NAME_WEIGHT = 2.0
+BIO_WEIGHT = 1.0
+BIO_MAX_TOKENS = 50
+BIO_TOKEN_PREFIX = 'w:'
+# username 과 검색어가 정확히 같으면 더하는 토큰
+EXACT_TOKEN_PREFIX = 'u:'
+# 검색어 3-gram 중 이 비율 이상 맞아야 결과에 포함
+USER_SEARCH_MIN_MATCH = getattr(settings, 'USER_SEARCH_MIN_MATCH', 0.5)
+# 팔로워 수 가산점: ln(follower_count + 1) * 이 값
+USER_SEARCH_FOLLOWER_BOOST = getattr(settings, 'USER_SEARCH_FOLLOWER_BOOST', 0.5)
+# 정렬해서 돌려주는 최대 결과 수 (이 안에서 페이지를 나눔)
+USER_SEARCH_MAX_RESULTS = getattr(settings, 'USER_SEARCH_MAX_RESULTS', 100)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def trigrams(text, prefix=False):
+    # 앞을 공백 두 칸, 뒤를 한 칸 채워서 짧은 이름과 시작 부분도 맞도록 (prefix=True 면 뒤는 채우지 않음)
+    text = normalize_text(text).strip()
+    if not text:
+        return set()
+    padded = '  ' + text + ('' if prefix else ' ')
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def bio_tokens(bio):
+    words = WORD_PATTERN.findall(normalize_text(bio))
+    return {BIO_TOKEN_PREFIX + word[:30] for word in words[:BIO_MAX_TOKENS]}
+
+def exact_token(text):
+    return EXACT_TOKEN_PREFIX + normalize_text(text).strip()[:30]
+
+def build_tokens(user):
+    # 같은 토큰이 여러 필드에서 나오면 높은 가중치를 사용
+    weights = {exact_token(user.username or ''): USERNAME_WEIGHT}
+    for tokens, weight in (
+        (bio_tokens(user.bio or ''), BIO_WEIGHT),
+        (trigrams(user.name or ''), NAME_WEIGHT),
+        (trigrams(user.username or ''), USERNAME_WEIGHT),
+    ):
+        for token in tokens:
+            weights[token] = max(weights.get(token, 0), weight)
+    return weights
+
+def index_user(user):
+    with transaction.atomic():
+        UserSearchToken.objects.filter(user=user).delete()
+        UserSearchToken.objects.bulk_create([
+            UserSearchToken(token=token, user=user, weight=weight)
+            for token, weight in build_tokens(user).items()
+        ])
+
+def search_users(query, offset=0, limit=20):
+    # 검색어의 3-gram 과 단어로 후보를 찾고, 맞은 가중치 합 + 팔로워 가산점 순으로 정렬
+    query_trigrams = trigrams(query, prefix=True)
+    query_words = bio_tokens(query)
+    if not query_trigrams:
+        return [], False
+    # 공백을 채우지 않은 3-gram(중간 일치용) 기준으로 일치 비율을 봄, 3글자 미만이면 시작 부분 일치만
+    inner_trigrams = {token for token in query_trigrams if ' ' not in token}
+    if inner_trigrams:
+        trigram_filter = Q(token__in=inner_trigrams)
+        min_match = max(1, math.ceil(len(inner_trigrams) * USER_SEARCH_MIN_MATCH))
+    else:
+        trigram_filter = Q(token__in=query_trigrams)
+        min_match = 1
+
+    end = min(offset + limit, USER_SEARCH_MAX_RESULTS)
+    if offset >= end:
+        return [], False
+    rows = list(
+        UserSearchToken.objects.filter(token__in=query_trigrams | query_words | {exact_token(query)}, user__is_active=True)
+        .values('user')
+        .annotate(
+            trigram_matched=Count('id', filter=trigram_filter),
+            word_matched=Count('id', filter=Q(token__startswith=BIO_TOKEN_PREFIX)),
+            match_score=Sum('weight'),
+            followers=Max('user__follower_count'),
+        )
+        .filter(Q(trigram_matched__gte=min_match) | Q(word_matched__gt=0))
+        .annotate(score=F('match_score') + Ln(Cast('followers', FloatField()) + 1) * USER_SEARCH_FOLLOWER_BOOST)
+        .order_by('-score', 'user')
+        .values_list('user', flat=True)[offset:end + 1]
+    )
+    has_more = len(rows) > end - offset and end < USER_SEARCH_MAX_RESULTS
+    return rows[:end - offset], has_more
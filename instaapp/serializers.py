@@ -1,13 +1,18 @@
+from django.core.files.storage import default_storage
+from django.db import models
 from rest_framework import serializers
 from .models import CustomUser, Post, Image, Follow, Like, Mark, Comment, Tag, Reels, ChatRoom, Message
 from .models.reels import Video
+from .services.batch_loader import get_batch_loader
+from .media.images import build_srcset
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
+    profile_picture_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = CustomUser
-        fields = ['id', 'username', 'name', 'email', 'password', 'bio', 'birth_date', 'profile_picture', 'website']
+        fields = ['id', 'username', 'name', 'email', 'password', 'bio', 'birth_date', 'profile_picture', 'profile_picture_srcset', 'website']
         extra_kwargs = {
             'profile_picture': {'required': False},
             'bio': {'required': True},
@@ -20,11 +25,30 @@ class UserSerializer(serializers.ModelSerializer):
         if password:
             instance.set_password(password)
         return super().update(instance, validated_data)
+
+    def get_profile_picture_srcset(self, obj):
+        return build_srcset(obj.profile_picture_variants, self.context.get('request'))
     
+# 검색 결과 등 목록용 요약 (이메일 등 개인 정보 제외)
+class UserSummarySerializer(serializers.ModelSerializer):
+    profile_picture_srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'username', 'name', 'profile_picture', 'profile_picture_srcset', 'follower_count']
+
+    def get_profile_picture_srcset(self, obj):
+        return build_srcset(obj.profile_picture_variants, self.context.get('request'))
+
 class ImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Image
-        fields = ['id', 'file', 'created_at']
+        fields = ['id', 'file', 'srcset', 'created_at']
+
+    def get_srcset(self, obj):
+        return build_srcset(obj.variants, self.context.get('request'))
         
 class TagSerializer(serializers.ModelSerializer):
     post_count = serializers.IntegerField()
@@ -33,47 +57,52 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name', 'post_count']
 
-class PostSerializer(serializers.ModelSerializer):
+# 목록 직렬화 시 좋아요/저장 여부, 작성자, 미디어를 묶음 쿼리로 미리 불러옴
+class BatchLoadedListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.batch_loader = get_batch_loader(self.context.get('request'), self.child.Meta.model)
+        self.child.batch_loader.load(items)
+        return super().to_representation(items)
+
+class BatchLoadedSerializerMixin:
+    def get_batch_loader(self, obj):
+        loader = getattr(self, 'batch_loader', None)
+        if loader is None:
+            loader = get_batch_loader(self.context.get('request'), self.Meta.model)
+            self.batch_loader = loader
+        loader.load([obj])
+        return loader
+
+class PostSerializer(BatchLoadedSerializerMixin, serializers.ModelSerializer):
     images = ImageSerializer(many=True, read_only=True)
-    like_count = serializers.SerializerMethodField()
-    mark_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
     author = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
     mentions = UserSerializer(many=True, read_only=True)
 
     class Meta:
         model = Post
-        fields = ['id', 'author', 'content', 'images', 'created_at', 'like_count', 'mark_count', 'is_liked', 'is_saved', 'comment_count', 'tags', 'mentions', 'site']
-        read_only_fields = ['author', 'created_at', 'like_count', 'mark_count', 'comment_count']
-
-    def get_like_count(self, obj):
-        return obj.likes.count()
-
-    def get_mark_count(self, obj):
-        return obj.marks.count()
+        fields = ['id', 'author', 'content', 'images', 'created_at', 'like_count', 'mark_count', 'is_liked', 'is_saved', 'comment_count', 'tags', 'mentions', 'site', 'status']
+        read_only_fields = ['author', 'created_at', 'like_count', 'mark_count', 'comment_count', 'status']
+        list_serializer_class = BatchLoadedListSerializer
 
     def get_is_liked(self, obj):
-        user = self.context.get('request').user
-        return Like.objects.filter(user=user, post=obj).exists()
+        return self.get_batch_loader(obj).is_liked(obj)
 
     def get_is_saved(self, obj):
-        user = self.context.get('request').user
-        return Mark.objects.filter(user=user, post=obj).exists()
+        return self.get_batch_loader(obj).is_saved(obj)
 
     def get_author(self, obj):
         author = obj.author
         return {
             'id': author.id,
             'username': author.username,
-            'profile_picture': author.profile_picture.url if author.profile_picture else None
+            'profile_picture': author.profile_picture.url if author.profile_picture else None,
+            'profile_picture_srcset': build_srcset(author.profile_picture_variants, self.context.get('request')),
         }
 
-    def get_comment_count(self, obj):
-        return obj.comments.count()
-
 class FollowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follow
@@ -96,50 +125,47 @@ class CommentSerializer(serializers.ModelSerializer):
         return []
 
 class VideoSerializer(serializers.ModelSerializer):
+    hls_url = serializers.SerializerMethodField()
+
     class Meta:
         model = Video
-        fields = ['id', 'file', 'created_at']
+        fields = ['id', 'file', 'hls_url', 'created_at']
 
-class ReelsSerializer(serializers.ModelSerializer):
+    def get_hls_url(self, obj):
+        if not obj.hls_playlist:
+            return None
+        url = default_storage.url(obj.hls_playlist)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+class ReelsSerializer(BatchLoadedSerializerMixin, serializers.ModelSerializer):
     videos = VideoSerializer(many=True, read_only=True)
-    like_count = serializers.SerializerMethodField()
-    mark_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
     author = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
     mentions = UserSerializer(many=True, read_only=True)
 
     class Meta:
         model = Reels
-        fields = ['id', 'author', 'content', 'videos', 'created_at', 'like_count', 'mark_count', 'is_liked', 'is_saved', 'comment_count', 'tags', 'mentions']
-        read_only_fields = ['author', 'created_at', 'like_count', 'mark_count', 'comment_count']
-
-    def get_like_count(self, obj):
-        return obj.likes.count()
-
-    def get_mark_count(self, obj):
-        return obj.marks.count()
+        fields = ['id', 'author', 'content', 'videos', 'created_at', 'like_count', 'mark_count', 'is_liked', 'is_saved', 'comment_count', 'tags', 'mentions', 'status']
+        read_only_fields = ['author', 'created_at', 'like_count', 'mark_count', 'comment_count', 'status']
+        list_serializer_class = BatchLoadedListSerializer
 
     def get_is_liked(self, obj):
-        user = self.context.get('request').user
-        return Like.objects.filter(user=user, reels=obj).exists()
+        return self.get_batch_loader(obj).is_liked(obj)
 
     def get_is_saved(self, obj):
-        user = self.context.get('request').user
-        return Mark.objects.filter(user=user, reels=obj).exists()
+        return self.get_batch_loader(obj).is_saved(obj)
 
     def get_author(self, obj):
         author = obj.author
         return {
             'id': author.id,
             'username': author.username,
-            'profile_picture': author.profile_picture.url if author.profile_picture else None
+            'profile_picture': author.profile_picture.url if author.profile_picture else None,
+            'profile_picture_srcset': build_srcset(author.profile_picture_variants, self.context.get('request')),
         }
-
-    def get_comment_count(self, obj):
-        return obj.comments.count()
     
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
@@ -147,7 +173,7 @@ class MessageSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Message
-        fields = ['id', 'chatroom', 'sender', 'receiver', 'content', 'timestamp']
+        fields = ['id', 'client_id', 'chatroom', 'sender', 'receiver', 'content', 'timestamp']
 
 class ChatRoomSerializer(serializers.ModelSerializer):
     participants = UserSerializer(many=True, read_only=True)
@@ -0,0 +1,53 @@
+from django.db.models import prefetch_related_objects
+from instaapp.models.post import Post
+from instaapp.models.reels import Reels
+from instaapp.models.like import Like
+from instaapp.models.mark import Mark
+
+# 모델별로 한 번에 불러올 관계 (FK 필드 이름, prefetch 대상)
+LOADER_CONFIG = {
+    Post: ('post', ('author', 'images', 'tags', 'mentions')),
+    Reels: ('reels', ('author', 'videos', 'tags', 'mentions')),
+}
+
+class EngagementBatchLoader:
+    def __init__(self, model, user=None):
+        self.field_name, self.prefetch_lookups = LOADER_CONFIG[model]
+        self.user = user if user is not None and user.is_authenticated else None
+        self.loaded_ids = set()
+        self.liked_ids = set()
+        self.saved_ids = set()
+
+    def load(self, objs):
+        objs = [obj for obj in objs if obj is not None]
+        pending_ids = {obj.pk for obj in objs} - self.loaded_ids
+        if pending_ids:
+            if self.user is not None:
+                self.liked_ids.update(self._viewer_object_ids(Like, pending_ids))
+                self.saved_ids.update(self._viewer_object_ids(Mark, pending_ids))
+            self.loaded_ids |= pending_ids
+        # 이미 prefetch 된 인스턴스는 Django 가 건너뜀
+        prefetch_related_objects(objs, *self.prefetch_lookups)
+
+    def _viewer_object_ids(self, model, ids):
+        return model.objects.filter(
+            user=self.user, **{f'{self.field_name}__in': ids}
+        ).values_list(f'{self.field_name}_id', flat=True)
+
+    def is_liked(self, obj):
+        return obj.pk in self.liked_ids
+
+    def is_saved(self, obj):
+        return obj.pk in self.saved_ids
+
+def get_batch_loader(request, model):
+    # 같은 요청 안에서는 모델별로 하나의 로더를 공유 (profile 처럼 여러 목록을 그리는 경우)
+    if request is None:
+        return EngagementBatchLoader(model)
+    loaders = getattr(request, '_batch_loaders', None)
+    if loaders is None:
+        loaders = {}
+        request._batch_loaders = loaders
+    if model not in loaders:
+        loaders[model] = EngagementBatchLoader(model, getattr(request, 'user', None))
+    return loaders[model]
@@ -0,0 +1,71 @@
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from instaapp.media.hls import delete_hls
+from instaapp.media.images import delete_image_variants
+from instaapp.models.blob import MediaBlob
+
+def resolve_upload(uploaded_file):
+    # 이미 저장된 내용이면 새로 저장하지 않고 기존 파일을 공유
+    sha256 = getattr(uploaded_file, 'sha256', None)
+    blob = acquire_blob(sha256) if sha256 else None
+    if blob is None:
+        return {'file': uploaded_file}
+    return {'file': blob.file.name, 'blob': blob}
+
+def acquire_blob(sha256):
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(sha256=sha256, ref_count__gt=0).first()
+        if blob is not None:
+            blob.ref_count += 1
+            blob.save(update_fields=['ref_count'])
+    return blob
+
+def release_blob(blob_id):
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+        if blob.ref_count > 1:
+            blob.ref_count -= 1
+            blob.save(update_fields=['ref_count'])
+            return
+        blob.delete()
+    transaction.on_commit(lambda: delete_blob_files(blob))
+
+def delete_blob_files(blob):
+    default_storage.delete(blob.file.name)
+    delete_image_variants(blob.variants)
+    delete_hls(blob.hls_playlist)
+
+def register_blob(item, info, **derivatives):
+    # 처리가 끝난 파일을 blob 으로 등록, 그 사이 같은 내용이 먼저 등록됐으면 그쪽을 공유하고 자기 파일은 지움
+    with transaction.atomic():
+        blob, created = MediaBlob.objects.get_or_create(sha256=info.sha256, defaults={
+            'file': item.file.name,
+            'mime_type': info.mime_type,
+            'size': info.size,
+            'duration': info.duration,
+            'ref_count': 1,
+            **derivatives,
+        })
+        if not created:
+            blob = MediaBlob.objects.select_for_update().get(pk=blob.pk)
+            blob.ref_count += 1
+            blob.save(update_fields=['ref_count'])
+        item.blob = blob
+        update_fields = ['blob']
+        if not created and item.file.name != blob.file.name:
+            duplicate = item.file.name
+            transaction.on_commit(lambda: default_storage.delete(duplicate))
+            item.file = blob.file.name
+            update_fields.append('file')
+        item.save(update_fields=update_fields)
+    return blob, created
+
+def check_blob(blob, valid_mime_types, max_length=None):
+    # 이미 검증된 내용이라 파일을 다시 읽지 않고 저장된 메타데이터로만 규칙 확인
+    if blob.mime_type not in valid_mime_types:
+        raise ValidationError(f'Unsupported file type: {blob.mime_type}')
+    if max_length is not None and blob.duration is not None and blob.duration > max_length:
+        raise ValidationError(f'Video length exceeds {max_length} seconds.')
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from asgiref.sync import async_to_sync
+from datetime import timedelta
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from instaapp.models.chatroom import ChatRoom, Message
+from instaapp.models.inbox import InboxEntry
+from instaapp.pagination import keyset_filter
+from instaapp.services.inbox_services import create_inbox_entries
+
+logger = logging.getLogger(__name__)
+
+# 동기화 커서는 저장 시각(created_at) 기준, 저장 시각을 정한 뒤 커밋되기까지의 간격을 덮도록 이 시간(초)이 지난 메시지만 동기화
+CHAT_SYNC_SETTLE_SECONDS = getattr(settings, 'CHAT_SYNC_SETTLE_SECONDS', 2)
+SYNC_ORDERING = ('created_at', 'id')
+
+_timestamp_field = serializers.DateTimeField()
+
+def compact_message(message):
+    # 웹소켓/동기화용 메시지 표현 (사용자 정보는 id 만)
+    return {
+        'id': message.id,
+        'client_id': str(message.client_id),
+        'chatroom': message.chatroom_id,
+        'sender': message.sender_id,
+        'receiver': message.receiver_id,
+        'content': message.content,
+        'timestamp': _timestamp_field.to_representation(message.timestamp),
+    }
+
+def get_participant_ids(chatroom_id, user):
+    # user 가 참여 중인 채팅방이면 참여자 id 집합, 아니면 None
+    participant_ids = set(ChatRoom.participants.through.objects.filter(chatroom_id=chatroom_id).values_list('customuser_id', flat=True))
+    if user.id not in participant_ids:
+        return None
+    return participant_ids
+
+def resolve_receiver_id(participant_ids, sender_id, receiver_id):
+    # 지정한 수신자가 참여자가 아니면 None, 지정하지 않으면 1:1 채팅방의 상대방
+    if receiver_id is not None:
+        try:
+            receiver_id = int(receiver_id)
+        except (TypeError, ValueError):
+            return None
+        return receiver_id if receiver_id in participant_ids else None
+    others = participant_ids - {sender_id}
+    return next(iter(others)) if len(others) == 1 else None
+
+async def broadcast_message(channel_layer, message, participant_ids):
+    # 채팅방 단위 소켓(chat_{id})과 참여자별 사용자 단위 소켓(user_{id})에 모두 전송
+    event = {'type': 'chat_message', 'message': message}
+    groups = [f'chat_{message["chatroom"]}'] + [f'user_{user_id}' for user_id in participant_ids]
+    await asyncio.gather(*[channel_layer.group_send(group, event) for group in groups])
+
+def publish_message(message, participant_ids):
+    # REST 로 저장한 메시지를 소켓으로 전달
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(broadcast_message)(channel_layer, compact_message(message), participant_ids)
+    except Exception:
+        logger.exception(f"Publishing chat message {message.pk} failed")
+
+def make_direct_key(user_id, other_user_id):
+    # 순서와 관계없이 같은 두 사용자는 같은 키
+    low, high = sorted((int(user_id), int(other_user_id)))
+    return f'{low}:{high}'
+
+def get_or_create_direct_chatroom(user, other_user):
+    # 유니크 인덱스 한 번 조회로 찾고, 동시에 만들어지면 먼저 만든 채팅방을 사용
+    direct_key = make_direct_key(user.id, other_user.id)
+    chatroom = ChatRoom.objects.filter(direct_key=direct_key).first()
+    if chatroom is not None:
+        return chatroom, False
+    try:
+        with transaction.atomic():
+            chatroom = ChatRoom.objects.create(direct_key=direct_key)
+            chatroom.participants.add(user, other_user)
+            create_inbox_entries(chatroom, {user.id, other_user.id})
+    except IntegrityError:
+        return ChatRoom.objects.get(direct_key=direct_key), False
+    return chatroom, True
+
+def sync_messages(user, position, limit, chatroom_id=None):
+    # position((created_at, id)) 이후 저장된 메시지를 저장 순으로 limit 개까지 (chatroom_id 가 없으면 참여 중인 모든 채팅방)
+    # timestamp 는 전송 시각이라 늦게 저장된 메시지가 이미 지나간 커서 뒤에 놓일 수 있으므로 쓰지 않음
+    entries = InboxEntry.objects.filter(user=user)
+    if chatroom_id is not None:
+        entries = entries.filter(chatroom_id=chatroom_id)
+    chatroom_ids = list(entries.values_list('chatroom_id', flat=True))
+    if not chatroom_ids:
+        return [], False
+
+    messages = Message.objects.filter(
+        chatroom_id__in=chatroom_ids,
+        created_at__lte=timezone.now() - timedelta(seconds=CHAT_SYNC_SETTLE_SECONDS),
+    )
+    if position is not None:
+        messages = messages.filter(keyset_filter(SYNC_ORDERING, position))
+    messages = list(messages.order_by(*SYNC_ORDERING)[:limit + 1])
+    return messages[:limit], len(messages) > limit
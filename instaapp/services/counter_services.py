@@ -0,0 +1,9 @@
+from django.db.models import F
+
+def adjust_counter(obj, field_name, delta):
+    # 읽고-쓰기 대신 F() 로 DB 에서 원자적으로 증감
+    queryset = type(obj).objects.filter(pk=obj.pk)
+    if delta < 0:
+        # 음수로 내려가지 않도록 (어긋난 값은 reconcile 명령으로 보정)
+        queryset = queryset.filter(**{f'{field_name}__gte': -delta})
+    return queryset.update(**{field_name: F(field_name) + delta})
@@ -0,0 +1,94 @@
+import heapq
+import math
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from instaapp.models.explore import ExploreEntry
+from instaapp.models.post import Post
+from instaapp.models.reels import Reels
+
+# 탐색 인덱스에 유지할 최대 항목 수
+EXPLORE_INDEX_SIZE = getattr(settings, 'EXPLORE_INDEX_SIZE', 5000)
+# 재계산 대상 기간
+EXPLORE_WINDOW_DAYS = getattr(settings, 'EXPLORE_WINDOW_DAYS', 30)
+# 이 시간만큼 최신이면 참여도 10배와 같은 점수
+EXPLORE_DECAY_SECONDS = getattr(settings, 'EXPLORE_DECAY_SECONDS', 12 * 60 * 60)
+EXPLORE_BATCH_SIZE = 2000
+# 새 항목이 들어올 때 이 간격(초)마다 한 번씩 기간/개수 제한을 넘는 항목 정리
+EXPLORE_TRIM_INTERVAL = getattr(settings, 'EXPLORE_TRIM_INTERVAL', 10 * 60)
+EXPLORE_TRIM_CACHE_KEY = 'explore:trimmed'
+
+def explore_score(like_count, comment_count, mark_count, created_at):
+    # log(참여도) + 작성 시각: 시간이 지나도 항목 간 순서가 바뀌지 않아 저장해 둔 점수를 그대로 비교할 수 있음
+    engagement = like_count + 2 * comment_count + 2 * mark_count
+    return math.log10(max(engagement, 1)) + created_at.timestamp() / EXPLORE_DECAY_SECONDS
+
+def refresh_explore_entry(obj):
+    field_name = 'post' if isinstance(obj, Post) else 'reels'
+    counters = type(obj).objects.filter(pk=obj.pk).values('like_count', 'comment_count', 'mark_count', 'created_at').first()
+    if counters is None:
+        return None
+    score = explore_score(**counters)
+
+    # 대부분은 이미 있는 항목의 점수 갱신 (UPDATE 한 번), 없으면 insert-ignore 후 다시 갱신해 동시 생성에도 안전
+    entries = ExploreEntry.objects.filter(**{field_name: obj.pk})
+    if entries.update(score=score):
+        return score
+
+    # 기간이 지났거나 가득 찬 인덱스의 최하위 점수보다 낮으면 어차피 잘려 나가므로 넣지 않음
+    if counters['created_at'] < timezone.now() - timedelta(days=EXPLORE_WINDOW_DAYS):
+        return None
+    lowest = ExploreEntry.objects.order_by('-score', '-id').values_list('score', flat=True)[EXPLORE_INDEX_SIZE - 1:EXPLORE_INDEX_SIZE]
+    lowest = list(lowest)
+    if lowest and score <= lowest[0]:
+        return None
+
+    ExploreEntry.objects.bulk_create([ExploreEntry(score=score, **{f'{field_name}_id': obj.pk})], ignore_conflicts=True)
+    entries.update(score=score)
+    if cache.add(EXPLORE_TRIM_CACHE_KEY, True, EXPLORE_TRIM_INTERVAL):
+        trim_explore_index()
+    return score
+
+def trim_explore_index():
+    # 기간이 지난 항목과 최대 항목 수를 넘는 하위 항목을 지움 (새 항목이 들어올 때 가끔, rank_explore --trim-only 로도 실행)
+    since = timezone.now() - timedelta(days=EXPLORE_WINDOW_DAYS)
+    removed = ExploreEntry.objects.filter(Q(post__created_at__lt=since) | Q(reels__created_at__lt=since)).delete()[0]
+    boundary = list(
+        ExploreEntry.objects.order_by('-score', '-id').values_list('score', 'id')[EXPLORE_INDEX_SIZE:EXPLORE_INDEX_SIZE + 1]
+    )
+    if not boundary:
+        return removed
+    score, entry_id = boundary[0]
+    return removed + ExploreEntry.objects.filter(Q(score__lt=score) | Q(score=score, id__lte=entry_id)).delete()[0]
+
+def _iter_scored(model, field_name, since):
+    last_pk = 0
+    while True:
+        rows = list(
+            model.objects.visible().filter(pk__gt=last_pk, created_at__gte=since)
+            .order_by('pk')
+            .values_list('pk', 'like_count', 'comment_count', 'mark_count', 'created_at')[:EXPLORE_BATCH_SIZE]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        for pk, like_count, comment_count, mark_count, created_at in rows:
+            yield explore_score(like_count, comment_count, mark_count, created_at), field_name, pk
+
+def rebuild_explore_index():
+    since = timezone.now() - timedelta(days=EXPLORE_WINDOW_DAYS)
+    scored = heapq.nlargest(
+        EXPLORE_INDEX_SIZE,
+        (item for model, field_name in ((Post, 'post'), (Reels, 'reels')) for item in _iter_scored(model, field_name, since)),
+    )
+
+    with transaction.atomic():
+        ExploreEntry.objects.all().delete()
+        ExploreEntry.objects.bulk_create(
+            [ExploreEntry(score=score, **{f'{field_name}_id': pk}) for score, field_name, pk in scored],
+            batch_size=EXPLORE_BATCH_SIZE,
+        )
+    return len(scored)
@@ -0,0 +1,59 @@
+from collections import defaultdict
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from instaapp.models.chatroom import ChatRoom, Message
+from instaapp.models.inbox import InboxEntry
+
+INBOX_PREVIEW_LENGTH = 100
+
+def create_inbox_entries(chatroom, participant_ids):
+    participant_ids = list(participant_ids)
+    entries = []
+    for user_id in participant_ids:
+        others = [other_id for other_id in participant_ids if other_id != user_id]
+        entries.append(InboxEntry(
+            user_id=user_id,
+            chatroom=chatroom,
+            other_user_id=others[0] if len(others) == 1 else None,
+            last_message_at=chatroom.created_at,
+        ))
+    InboxEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+def record_messages(messages):
+    # 새 메시지를 받은 방마다 마지막 메시지와 받는 사람의 안 읽은 수를 갱신 (방마다 UPDATE 두 번)
+    by_room = defaultdict(list)
+    for message in messages:
+        by_room[message.chatroom_id].append(message)
+
+    for chatroom_id, room_messages in by_room.items():
+        last = max(room_messages, key=lambda message: message.timestamp)
+        InboxEntry.objects.filter(chatroom_id=chatroom_id, last_message_at__lte=last.timestamp).update(
+            last_message=last.content[:INBOX_PREVIEW_LENGTH],
+            last_sender_id=last.sender_id,
+            last_message_at=last.timestamp,
+        )
+
+        # 자기가 보낸 메시지는 안 읽은 수에 넣지 않음
+        sent = defaultdict(int)
+        for message in room_messages:
+            sent[message.sender_id] += 1
+        received = Case(
+            *[When(user_id=sender_id, then=Value(len(room_messages) - count)) for sender_id, count in sent.items()],
+            default=Value(len(room_messages)),
+            output_field=IntegerField(),
+        )
+        InboxEntry.objects.filter(chatroom_id=chatroom_id).update(unread_count=F('unread_count') + received)
+
+def mark_read(user, chatroom_id):
+    return InboxEntry.objects.filter(user=user, chatroom_id=chatroom_id).update(unread_count=0, last_read_at=timezone.now())
+
+def rebuild_inbox_entry(entry):
+    last = Message.objects.filter(chatroom_id=entry.chatroom_id).order_by('-timestamp', '-id').first()
+    unread = Message.objects.filter(chatroom_id=entry.chatroom_id).exclude(sender_id=entry.user_id)
+    if entry.last_read_at is not None:
+        unread = unread.filter(timestamp__gt=entry.last_read_at)
+    entry.last_message = last.content[:INBOX_PREVIEW_LENGTH] if last else ''
+    entry.last_sender_id = last.sender_id if last else None
+    entry.last_message_at = last.timestamp if last else ChatRoom.objects.get(pk=entry.chatroom_id).created_at
+    entry.unread_count = unread.count()
+    entry.save(update_fields=['last_message', 'last_sender', 'last_message_at', 'unread_count'])
@@ -0,0 +1,31 @@
+from django.db import transaction
+from instaapp.models.media import MediaStatus
+from instaapp.models.user import CustomUser
+from instaapp.media.queue import enqueue
+from instaapp.services.blob_services import resolve_upload
+from instaapp.services.tag_services import set_tags
+
+def create_with_uploads(model, item_model, author, tags_data, mentions_data, uploads, files, process, publish, **fields):
+    # 게시물/릴스와 첨부 Image/Video 를 함께 생성
+    # uploads: item 생성 인자 목록 (이미 저장된 경로 등), files: 요청으로 받은 파일 (여기서 resolve_upload)
+    # 기존 파일 공유(ref_count 증가)와 생성을 한 트랜잭션으로 묶어 중간에 실패하면 함께 되돌림
+    # 파일 검증과 처리(process), 파일이 없을 때의 공개(publish)는 커밋 후 워커에서 진행
+    with transaction.atomic():
+        uploads = list(uploads) + [resolve_upload(file) for file in files]
+        obj = model.objects.create(author=author, status=MediaStatus.PENDING if uploads else MediaStatus.READY, **fields)
+
+        for upload in uploads:
+            item_model.objects.create(**{model._meta.model_name: obj}, **upload)
+
+        set_tags(obj, tags_data)
+
+        for username in mentions_data:
+            try:
+                user = CustomUser.objects.get(username=username)
+                obj.mentions.add(user)
+            except CustomUser.DoesNotExist:
+                pass
+
+        job = process if uploads else publish
+        transaction.on_commit(lambda: enqueue(job, obj.id))
+    return obj
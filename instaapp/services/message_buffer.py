@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from instaapp.media.pipeline import run_media_sweeper
+from instaapp.models.chatroom import Message
+from instaapp.services.inbox_services import record_messages
+
+logger = logging.getLogger(__name__)
+
+# 이 개수가 모이거나 이 시간(초)이 지나면 한 번에 저장
+CHAT_WRITE_BATCH_SIZE = getattr(settings, 'CHAT_WRITE_BATCH_SIZE', 200)
+CHAT_WRITE_FLUSH_INTERVAL = getattr(settings, 'CHAT_WRITE_FLUSH_INTERVAL', 0.005)
+# 저장 대기 메시지 상한 (가득 차면 보내는 쪽이 기다림)
+CHAT_WRITE_QUEUE_SIZE = getattr(settings, 'CHAT_WRITE_QUEUE_SIZE', 5000)
+CHAT_WRITE_RETRIES = 3
+
+@database_sync_to_async
+def save_messages(messages):
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        record_messages(messages)
+
+# 채팅 메시지를 먼저 전송하고 ASGI 프로세스 안에서 모아서 bulk_create 로 저장 (write-behind)
+class MessageWriteBuffer:
+    def __init__(self, batch_size=None, flush_interval=None, max_size=None):
+        self.batch_size = batch_size or CHAT_WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or CHAT_WRITE_FLUSH_INTERVAL
+        self.max_size = max_size or CHAT_WRITE_QUEUE_SIZE
+        self.loop = None
+        self.queue = None
+        self.worker = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.worker is None or self.worker.done():
+            self.loop = loop
+            self.queue = asyncio.Queue(maxsize=self.max_size)
+            self.worker = loop.create_task(self.run())
+
+    async def add(self, chatroom_id, sender_id, receiver_id, content):
+        # 저장 전 메시지를 돌려줌 (client_id 와 timestamp 는 확정, id 는 아직 없음)
+        self.start()
+        message = Message(chatroom_id=chatroom_id, sender_id=sender_id, receiver_id=receiver_id, content=content)
+        await self.queue.put(message)
+        return message
+
+    async def run(self):
+        stopping = False
+        while not stopping:
+            message = await self.queue.get()
+            if message is None:
+                return
+            batch = [message]
+            deadline = self.loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if message is None:
+                    stopping = True
+                    break
+                batch.append(message)
+            await self.flush(batch)
+
+    async def flush(self, batch):
+        for attempt in range(1, CHAT_WRITE_RETRIES + 1):
+            try:
+                await save_messages(batch)
+                return
+            except Exception:
+                if attempt == CHAT_WRITE_RETRIES:
+                    break
+                await asyncio.sleep(self.flush_interval * 10 * attempt)
+
+        # 일괄 저장이 계속 실패하면 문제가 있는 메시지만 버리도록 하나씩 저장
+        for message in batch:
+            try:
+                await save_messages([message])
+            except Exception:
+                logger.exception(f"Dropping chat message {message.client_id}")
+
+    async def drain(self):
+        # 종료 시 남은 메시지를 모두 저장하고 작업을 멈춤 (None 은 종료 신호)
+        if self.worker is None or self.worker.done():
+            return
+        await self.queue.put(None)
+        await self.worker
+
+message_buffer = MessageWriteBuffer()
+
+async def lifespan(scope, receive, send):
+    # ASGI lifespan: 시작 시 멈춘 미디어 처리를 주기적으로 다시 넣는 작업을 띄우고, 종료 시 버퍼를 비움
+    sweeper = None
+    while True:
+        event = await receive()
+        if event['type'] == 'lifespan.startup':
+            sweeper = asyncio.get_running_loop().create_task(run_media_sweeper())
+            await send({'type': 'lifespan.startup.complete'})
+        elif event['type'] == 'lifespan.shutdown':
+            if sweeper is not None:
+                sweeper.cancel()
+            await message_buffer.drain()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
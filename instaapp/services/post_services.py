@@ -1,12 +1,12 @@
-from instaapp.models.post import Post
-from django.core.exceptions import ObjectDoesNotExist
+from instaapp.models.post import Post, Image
+from instaapp.media.pipeline import process_post_media, publish_new_post
+from instaapp.services.media_services import create_with_uploads
 
-def create_post(data, user):
-    content = data.get('content', None)
-    image = data.get('image', '')
-    
-    post = Post.objects.create(author=user, content=content, image=image)
-    return post
+def create_post(author, content, site, tags_data, mentions_data, uploads=(), files=()):
+    return create_with_uploads(
+        Post, Image, author, tags_data, mentions_data, uploads, files,
+        process_post_media, publish_new_post, content=content, site=site,
+    )
 
 def get_posts_by_user(user):
     return Post.objects.filter(author=user).order_by('-created_at')
@@ -0,0 +1,9 @@
+from instaapp.models.reels import Reels, Video
+from instaapp.media.pipeline import process_reels_media, publish_new_reels
+from instaapp.services.media_services import create_with_uploads
+
+def create_reels(author, content, tags_data, mentions_data, uploads=(), files=()):
+    return create_with_uploads(
+        Reels, Video, author, tags_data, mentions_data, uploads, files,
+        process_reels_media, publish_new_reels, content=content,
+    )
@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models import F
+from instaapp.models.media import MediaStatus
+from instaapp.models.tag import Tag
+from instaapp.search.autocomplete import update_tag
+from instaapp.search.normalize import normalize_tag_name
+from instaapp.services.trending_services import record_tag_usage
+
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+def clean_tag_names(tag_names):
+    # 앞뒤 공백 제거, 빈 이름/너무 긴 이름 제외, 순서를 유지하며 중복 제거
+    names = []
+    for tag_name in tag_names:
+        if not isinstance(tag_name, str):
+            continue
+        tag_name = tag_name.strip()
+        if tag_name and len(tag_name) <= TAG_NAME_MAX_LENGTH:
+            names.append(tag_name)
+    return list(dict.fromkeys(names))
+
+def resolve_tags(tag_names):
+    # 없는 태그는 한 번에 insert-ignore 로 만들고, 한 번의 조회로 id 를 가져옴
+    names = clean_tag_names(tag_names)
+    if not names:
+        return []
+    Tag.objects.bulk_create(
+        [Tag(name=name, normalized_name=normalize_tag_name(name)) for name in names], ignore_conflicts=True
+    )
+    return list(Tag.objects.filter(name__in=names))
+
+def adjust_tag_counts(tag_ids, delta):
+    # 읽고-쓰기 대신 F() 로 원자적으로 증감하고, 커밋 후 자동완성 목록에 반영
+    tag_ids = list(tag_ids)
+    if not tag_ids or not delta:
+        return
+    queryset = Tag.objects.filter(pk__in=tag_ids)
+    if delta < 0:
+        # 음수로 내려가지 않도록 (어긋난 값은 reconcile_tag_counts 로 보정)
+        queryset = queryset.filter(post_count__gte=-delta)
+    queryset.update(post_count=F('post_count') + delta)
+    transaction.on_commit(lambda: refresh_tag_indexes(tag_ids))
+
+def refresh_tag_indexes(tag_ids):
+    for tag in Tag.objects.filter(pk__in=tag_ids):
+        update_tag(tag)
+
+def set_tags(obj, tag_names):
+    # 게시물/릴스의 태그를 tag_names 로 맞추고 바뀐 태그의 post_count 만 증감
+    through = type(obj).tags.through
+    source_field = f'{type(obj)._meta.model_name}_id'
+    with transaction.atomic():
+        tag_ids = [tag.id for tag in resolve_tags(tag_names)]
+        current_ids = set(through.objects.filter(**{source_field: obj.pk}).values_list('tag_id', flat=True))
+        added = [tag_id for tag_id in tag_ids if tag_id not in current_ids]
+        removed = current_ids - set(tag_ids)
+
+        through.objects.bulk_create(
+            [through(**{source_field: obj.pk, 'tag_id': tag_id}) for tag_id in added], ignore_conflicts=True
+        )
+        if removed:
+            through.objects.filter(**{source_field: obj.pk, 'tag_id__in': removed}).delete()
+        adjust_tag_counts(added, 1)
+        adjust_tag_counts(removed, -1)
+        # 처리 중인 게시물은 공개될 때(record_published_tags) 집계해 실패한 업로드가 트렌딩에 잡히지 않도록
+        if obj.status == MediaStatus.READY:
+            record_tag_usage(added)
+
+def record_published_tags(obj):
+    # 미디어 처리가 끝나 공개된 게시물/릴스의 태그 사용량 기록
+    through = type(obj).tags.through
+    source_field = f'{type(obj)._meta.model_name}_id'
+    record_tag_usage(through.objects.filter(**{source_field: obj.pk}).values_list('tag_id', flat=True))
+
+def release_tags(obj):
+    # 삭제 전에 호출 (M2M 행은 cascade 로 지워짐)
+    through = type(obj).tags.through
+    source_field = f'{type(obj)._meta.model_name}_id'
+    adjust_tag_counts(through.objects.filter(**{source_field: obj.pk}).values_list('tag_id', flat=True), -1)
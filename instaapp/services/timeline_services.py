@@ -0,0 +1,154 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from instaapp.models.follow import Follow
+from instaapp.models.post import Post
+from instaapp.models.timeline import TimelineEntry
+from instaapp.pagination import keyset_filter, reverse_ordering
+
+# 사용자별 타임라인 최대 길이
+TIMELINE_MAX_LENGTH = getattr(settings, 'TIMELINE_MAX_LENGTH', 800)
+# 팔로워가 이보다 많은 계정은 fan-out 하지 않고 피드를 읽을 때 병합
+TIMELINE_FANOUT_FOLLOWER_LIMIT = getattr(settings, 'TIMELINE_FANOUT_FOLLOWER_LIMIT', 10000)
+# 새로 팔로우했을 때 타임라인에 채워 넣을 게시물 수
+TIMELINE_BACKFILL_SIZE = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 100)
+# 팔로우와 관계없이 피드에 섞는 인기 게시물 (최근 이 기간 좋아요 상위 개수)
+FEED_POPULAR_DAYS = getattr(settings, 'FEED_POPULAR_DAYS', 30)
+FEED_POPULAR_SIZE = getattr(settings, 'FEED_POPULAR_SIZE', 50)
+FEED_POPULAR_CACHE_KEY = 'feed:popular-post-ids'
+FEED_POPULAR_CACHE_TIMEOUT = getattr(settings, 'FEED_POPULAR_CACHE_TIMEOUT', 5 * 60)
+TIMELINE_BATCH_SIZE = 1000
+TIMELINE_ORDERING = ('-created_at', '-post_id')
+POST_ORDERING = ('-created_at', '-id')
+
+def is_fanout_author(user):
+    return user.follower_count < TIMELINE_FANOUT_FOLLOWER_LIMIT
+
+def fan_out_post(post):
+    author = post.author
+    if not is_fanout_author(author):
+        return 0
+
+    follower_ids = Follow.objects.filter(followed=author).values_list('follower_id', flat=True)
+    batch = []
+    pushed = 0
+    for follower_id in follower_ids.iterator(chunk_size=TIMELINE_BATCH_SIZE):
+        batch.append(follower_id)
+        if len(batch) >= TIMELINE_BATCH_SIZE:
+            pushed += _push_to_timelines(post, batch)
+            batch = []
+    if batch:
+        pushed += _push_to_timelines(post, batch)
+    return pushed
+
+def _push_to_timelines(post, user_ids):
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user_id, post_id=post.id, author_id=post.author_id, created_at=post.created_at)
+        for user_id in user_ids
+    ], ignore_conflicts=True)
+
+    # 길이 제한을 넘긴 타임라인만 잘라냄
+    over_limit = (
+        TimelineEntry.objects.filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(total=Count('id'))
+        .filter(total__gt=TIMELINE_MAX_LENGTH)
+        .values_list('user_id', flat=True)
+    )
+    for user_id in over_limit:
+        trim_timeline(user_id)
+    return len(user_ids)
+
+def backfill_timeline(user, followed):
+    if not is_fanout_author(followed):
+        return 0
+
+    posts = Post.objects.visible().filter(author=followed).order_by('-created_at').values_list('id', 'created_at')[:TIMELINE_BACKFILL_SIZE]
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user.id, post_id=post_id, author_id=followed.id, created_at=created_at)
+        for post_id, created_at in posts
+    ], ignore_conflicts=True)
+    trim_timeline(user.id)
+    return len(posts)
+
+def rebuild_timeline(user_id):
+    # 팔로우 중인 fan-out 대상 계정의 최신 게시물로 타임라인을 한 번에 채움 (기존 항목은 유지)
+    followed = Follow.objects.filter(
+        follower_id=user_id, followed__follower_count__lt=TIMELINE_FANOUT_FOLLOWER_LIMIT
+    ).values('followed')
+    posts = (
+        Post.objects.visible().filter(author__in=followed)
+        .order_by(*POST_ORDERING)
+        .values_list('id', 'author_id', 'created_at')[:TIMELINE_MAX_LENGTH]
+    )
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user_id, post_id=post_id, author_id=author_id, created_at=created_at)
+        for post_id, author_id, created_at in posts
+    ], ignore_conflicts=True)
+    trim_timeline(user_id)
+    return len(posts)
+
+def remove_author_from_timeline(user, author):
+    return TimelineEntry.objects.filter(user=user, author=author).delete()[0]
+
+def trim_timeline(user_id):
+    boundary = (
+        TimelineEntry.objects.filter(user_id=user_id)
+        .order_by('-created_at', '-post_id')
+        .values_list('created_at', 'post_id')[TIMELINE_MAX_LENGTH:TIMELINE_MAX_LENGTH + 1]
+    )
+    boundary = list(boundary)
+    if not boundary:
+        return 0
+    created_at, post_id = boundary[0]
+    return TimelineEntry.objects.filter(user_id=user_id).filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lte=post_id)
+    ).delete()[0]
+
+def get_timeline_posts(user, limit=TIMELINE_MAX_LENGTH, position=None, reverse=False):
+    # position 은 (created_at, post_id) 커서, reverse 이면 그 이전(더 최신) 방향으로 읽음
+    ordering = TIMELINE_ORDERING if not reverse else reverse_ordering(TIMELINE_ORDERING)
+    entries = TimelineEntry.objects.filter(user=user)
+    if position is not None:
+        entries = entries.filter(keyset_filter(TIMELINE_ORDERING, position, reverse))
+    entries = list(entries.order_by(*ordering).values_list('created_at', 'post_id')[:limit])
+
+    # fan-out 대상이 아닌 대형 계정의 게시물, 자기 게시물, 인기 게시물은 읽을 때 병합
+    large_authors = Follow.objects.filter(
+        follower=user, followed__follower_count__gte=TIMELINE_FANOUT_FOLLOWER_LIMIT
+    ).values('followed')
+    merged = Post.objects.visible().filter(
+        Q(author__in=large_authors) | Q(author=user) | Q(id__in=get_popular_post_ids())
+    )
+    if position is not None:
+        merged = merged.filter(keyset_filter(POST_ORDERING, position, reverse))
+    if len(entries) >= limit:
+        bound = 'created_at__lte' if reverse else 'created_at__gte'
+        merged = merged.filter(**{bound: entries[-1][0]})
+    entries += merged.order_by(*reverse_ordering(POST_ORDERING) if reverse else POST_ORDERING).values_list('created_at', 'id')[:limit]
+
+    post_ids = []
+    seen = set()
+    for created_at, post_id in sorted(entries, reverse=not reverse):
+        if post_id not in seen:
+            seen.add(post_id)
+            post_ids.append(post_id)
+    post_ids = post_ids[:limit]
+
+    posts = Post.objects.in_bulk(post_ids)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+def get_popular_post_ids():
+    # 최근 FEED_POPULAR_DAYS 일 동안 좋아요가 많은 게시물 (모든 사용자가 같으므로 캐시)
+    post_ids = cache.get(FEED_POPULAR_CACHE_KEY)
+    if post_ids is None:
+        since = timezone.now() - timedelta(days=FEED_POPULAR_DAYS)
+        post_ids = list(
+            Post.objects.visible().filter(created_at__gte=since)
+            .order_by('-like_count', '-created_at')
+            .values_list('id', flat=True)[:FEED_POPULAR_SIZE]
+        )
+        cache.set(FEED_POPULAR_CACHE_KEY, post_ids, FEED_POPULAR_CACHE_TIMEOUT)
+    return post_ids
@@ -0,0 +1,97 @@
+import math
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+from instaapp.models.tag import Tag
+from instaapp.models.trending import TagUsageBucket
+
+# 최근 이 시간 동안의 사용량을 기준선(이전 며칠의 시간당 평균)과 비교
+TRENDING_WINDOW_HOURS = getattr(settings, 'TRENDING_WINDOW_HOURS', 6)
+TRENDING_BASELINE_DAYS = getattr(settings, 'TRENDING_BASELINE_DAYS', 7)
+# 최근 사용량이 이보다 적으면 제외 (한두 번 쓰인 새 태그가 튀지 않도록)
+TRENDING_MIN_COUNT = getattr(settings, 'TRENDING_MIN_COUNT', 3)
+TRENDING_LIMIT = getattr(settings, 'TRENDING_LIMIT', 20)
+TRENDING_CACHE_TIMEOUT = getattr(settings, 'TRENDING_CACHE_TIMEOUT', 5 * 60)
+TRENDING_CACHE_KEY = 'trending-tags'
+# 구간 보관 기간 (이보다 오래된 구간은 삭제)
+TRENDING_HOURLY_RETENTION = timedelta(hours=getattr(settings, 'TRENDING_HOURLY_RETENTION_HOURS', 48))
+TRENDING_DAILY_RETENTION = timedelta(days=getattr(settings, 'TRENDING_DAILY_RETENTION_DAYS', 30))
+TRENDING_COMPACT_INTERVAL = 60 * 60
+
+def bucket_starts(when):
+    hour = when.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    return {TagUsageBucket.HOUR: hour, TagUsageBucket.DAY: day}
+
+def record_tag_usage(tag_ids, when=None):
+    # 태그가 붙을 때마다 시간/일 구간의 사용 횟수를 F() 로 증가
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return
+    for granularity, bucket_start in bucket_starts(when or timezone.now()).items():
+        TagUsageBucket.objects.bulk_create(
+            [TagUsageBucket(tag_id=tag_id, granularity=granularity, bucket_start=bucket_start) for tag_id in tag_ids],
+            ignore_conflicts=True,
+        )
+        TagUsageBucket.objects.filter(
+            tag_id__in=tag_ids, granularity=granularity, bucket_start=bucket_start
+        ).update(count=F('count') + 1)
+
+def compute_trending(now=None, limit=TRENDING_LIMIT):
+    # 점수 = (최근 사용량 - 기대 사용량) / sqrt(기대 사용량 + 1), 기대 사용량은 기준선 시간당 평균 × 창 길이
+    now = now or timezone.now()
+    starts = bucket_starts(now)
+    window_start = starts[TagUsageBucket.HOUR] - timedelta(hours=TRENDING_WINDOW_HOURS - 1)
+    recent_buckets = TagUsageBucket.objects.filter(granularity=TagUsageBucket.HOUR, bucket_start__gte=window_start)
+    recent = dict(recent_buckets.values('tag_id').annotate(total=Sum('count')).values_list('tag_id', 'total'))
+    candidates = [tag_id for tag_id, count in recent.items() if count >= TRENDING_MIN_COUNT]
+    if not candidates:
+        return []
+
+    today = starts[TagUsageBucket.DAY]
+    baseline_buckets = TagUsageBucket.objects.filter(
+        tag_id__in=candidates, granularity=TagUsageBucket.DAY,
+        bucket_start__gte=today - timedelta(days=TRENDING_BASELINE_DAYS), bucket_start__lt=today,
+    )
+    baseline = dict(baseline_buckets.values('tag_id').annotate(total=Sum('count')).values_list('tag_id', 'total'))
+
+    scored = []
+    for tag_id in candidates:
+        expected = baseline.get(tag_id, 0) / (TRENDING_BASELINE_DAYS * 24) * TRENDING_WINDOW_HOURS
+        score = (recent[tag_id] - expected) / math.sqrt(expected + 1)
+        if score > 0:
+            scored.append((score, tag_id))
+    scored.sort(reverse=True)
+    scored = scored[:limit]
+
+    tags = Tag.objects.in_bulk([tag_id for _, tag_id in scored])
+    return [
+        {
+            'id': tag_id,
+            'name': tags[tag_id].name,
+            'post_count': tags[tag_id].post_count,
+            'recent_count': recent[tag_id],
+            'baseline_count': baseline.get(tag_id, 0),
+            'score': round(score, 3),
+        }
+        for score, tag_id in scored if tag_id in tags
+    ]
+
+def get_trending_tags():
+    # 계산 결과는 캐시에 두고 다시 계산할 때 가끔 오래된 구간도 정리
+    trending = cache.get(TRENDING_CACHE_KEY)
+    if trending is None:
+        trending = compute_trending()
+        cache.set(TRENDING_CACHE_KEY, trending, TRENDING_CACHE_TIMEOUT)
+        if cache.add(f'{TRENDING_CACHE_KEY}:compacted', True, TRENDING_COMPACT_INTERVAL):
+            compact_tag_usage()
+    return trending
+
+def compact_tag_usage(now=None):
+    # 기준선 계산에는 일 단위 구간만 쓰므로 시간 단위 구간은 짧게 보관
+    now = now or timezone.now()
+    hourly, _ = TagUsageBucket.objects.filter(granularity=TagUsageBucket.HOUR, bucket_start__lt=now - TRENDING_HOURLY_RETENTION).delete()
+    daily, _ = TagUsageBucket.objects.filter(granularity=TagUsageBucket.DAY, bucket_start__lt=now - TRENDING_DAILY_RETENTION).delete()
+    return hourly, daily
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from instaapp.models.upload import DirectUpload, UploadSession
+from instaapp.services.blob_services import acquire_blob
+from instaapp.services.reels_services import create_reels
+
+UPLOAD_SESSION_DIR = getattr(settings, 'UPLOAD_SESSION_DIR', os.path.join(tempfile.gettempdir(), 'reels-uploads'))
+UPLOAD_MAX_SIZE = getattr(settings, 'UPLOAD_MAX_SIZE', 1024 * 1024 * 1024)
+UPLOAD_SESSION_TTL = getattr(settings, 'UPLOAD_SESSION_TTL', timedelta(days=1))
+# 직접 업로드를 발급한 뒤 등록할 수 있는 기간 (초)
+DIRECT_UPLOAD_REGISTER_TTL = getattr(settings, 'DIRECT_UPLOAD_REGISTER_TTL', 24 * 60 * 60)
+# 요청 본문을 읽는 단위 (워커가 한 번에 메모리에 두는 최대 크기)
+UPLOAD_READ_SIZE = 256 * 1024
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, offset):
+        super().__init__(f'Expected upload offset {offset}.')
+        self.offset = offset
+
+def get_session_path(session):
+    return os.path.join(UPLOAD_SESSION_DIR, f'{session.id}.part')
+
+def create_upload_session(user, file_name, size):
+    session = UploadSession.objects.create(user=user, file_name=os.path.basename(file_name)[:255], size=size)
+    os.makedirs(UPLOAD_SESSION_DIR, exist_ok=True)
+    open(get_session_path(session), 'wb').close()
+    return session
+
+def append_chunk(session_id, user, start, stream, length):
+    # 네트워크에서 받는 동안에는 잠그지 않고 임시 파일에 받은 뒤, 이어 붙일 때만 잠금
+    session = UploadSession.objects.get(pk=session_id, user=user)
+    if start != session.offset:
+        raise UploadOffsetMismatch(session.offset)
+    length = min(length, session.size - start)
+
+    with tempfile.TemporaryFile(dir=UPLOAD_SESSION_DIR) as chunk_file:
+        received = 0
+        try:
+            while received < length:
+                chunk = stream.read(min(UPLOAD_READ_SIZE, length - received))
+                if not chunk:
+                    break
+                chunk_file.write(chunk)
+                received += len(chunk)
+        finally:
+            # 연결이 끊겨도 받은 만큼은 붙여 두고 그 지점부터 이어받음
+            session = commit_chunk(session_id, user, start, chunk_file, received)
+    return session
+
+def commit_chunk(session_id, user, start, chunk_file, size):
+    # 같은 구간을 동시에 보낸 요청은 먼저 붙인 쪽만 반영되고 나머지는 offset 불일치
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id, user=user)
+        if start != session.offset:
+            raise UploadOffsetMismatch(session.offset)
+        if size:
+            chunk_file.seek(0)
+            with open(get_session_path(session), 'r+b') as fp:
+                fp.seek(start)
+                shutil.copyfileobj(chunk_file, fp, UPLOAD_READ_SIZE)
+                fp.truncate()
+            session.offset += size
+            session.save(update_fields=['offset', 'updated_at'])
+    return session
+
+def finalize_upload(session_id, user, content, tags_data, mentions_data):
+    # 다 받은 파일로 릴스를 만듦 (같은 내용이 이미 있으면 기존 파일 공유)
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id, user=user)
+        if session.offset < session.size:
+            raise UploadOffsetMismatch(session.offset)
+
+        path = get_session_path(session)
+        with open(path, 'rb') as fp:
+            hasher = hashlib.sha256()
+            for chunk in iter(lambda: fp.read(UPLOAD_READ_SIZE), b''):
+                hasher.update(chunk)
+            blob = acquire_blob(hasher.hexdigest())
+            if blob is not None:
+                upload = {'file': blob.file.name, 'blob': blob}
+            else:
+                fp.seek(0)
+                upload = {'file': File(fp, name=session.file_name)}
+            reels = create_reels(user, content, tags_data, mentions_data, [upload])
+        session.delete()
+    os.remove(path)
+    return reels
+
+def discard_upload_session(session):
+    session.delete()
+    try:
+        os.remove(get_session_path(session))
+    except FileNotFoundError:
+        pass
+
+def purge_expired_upload_sessions():
+    expired = UploadSession.objects.filter(updated_at__lt=timezone.now() - UPLOAD_SESSION_TTL)
+    count = 0
+    for session in expired.iterator():
+        discard_upload_session(session)
+        count += 1
+    return count
+
+def purge_expired_direct_uploads():
+    # 등록 기간이 지난 직접 업로드 기록을 지우고, 등록되지 않은 객체는 저장소에서도 지움
+    expired = DirectUpload.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=DIRECT_UPLOAD_REGISTER_TTL))
+    for key in expired.filter(registered_at__isnull=True).values_list('key', flat=True).iterator():
+        default_storage.delete(key)
+    return expired.delete()[0]
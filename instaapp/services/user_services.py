@@ -1,5 +1,5 @@
 import logging
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 from django.contrib.auth.hashers import check_password
 from django.contrib.auth import get_user_model, authenticate
@@ -7,6 +7,8 @@ from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from datetime import timedelta
 from django.core.exceptions import ObjectDoesNotExist
 from instaapp.models.user import CustomUser
+from instaapp.media.pipeline import process_profile_picture
+from instaapp.media.queue import enqueue
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,9 @@ def create_user(user_data):
         user.website = website
         user.profile_picture = profile_picture
         user.save()
+
+        if profile_picture:
+            transaction.on_commit(lambda: enqueue(process_profile_picture, user.id))
         
         return user
     except IntegrityError:
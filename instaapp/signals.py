@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from instaapp.models.post import Image, Post
+from instaapp.models.reels import Reels, Video
+from instaapp.models.tag import Tag
+from instaapp.models.user import CustomUser
+from instaapp.search.autocomplete import remove_tag, update_tag
+from instaapp.search.captions import index_document, unindex_document
+from instaapp.search.users import index_user
+from instaapp.services.blob_services import release_blob
+from instaapp.services.tag_services import release_tags
+
+# 공유 중인 blob 참조 수 감소 (마지막 참조가 사라지면 파일도 삭제)
+@receiver(post_delete, sender=Image)
+@receiver(post_delete, sender=Video)
+def release_media_blob(sender, instance, **kwargs):
+    if instance.blob_id is not None:
+        release_blob(instance.blob_id)
+
+# 태그 자동완성 접두사 목록 갱신
+@receiver(post_save, sender=Tag)
+def update_tag_autocomplete(sender, instance, **kwargs):
+    if isinstance(instance.post_count, int):
+        update_tag(instance)
+
+@receiver(post_delete, sender=Tag)
+def remove_tag_autocomplete(sender, instance, **kwargs):
+    remove_tag(instance)
+
+# 사용자 검색 색인 갱신 (로그인 시각 등 검색과 무관한 필드만 저장하면 건너뜀)
+USER_SEARCH_FIELDS = {'username', 'name', 'bio'}
+
+@receiver(post_save, sender=CustomUser)
+def index_user_search(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not USER_SEARCH_FIELDS & set(update_fields)):
+        return
+    index_user(instance)
+
+# 본문 검색 색인 갱신 (상태/카운터만 저장하면 건너뜀)
+CAPTION_KINDS = {Post: 'post', Reels: 'reels'}
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Reels)
+def index_caption(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    index_document(CAPTION_KINDS[sender], instance)
+
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Reels)
+def unindex_caption(sender, instance, **kwargs):
+    unindex_document(CAPTION_KINDS[sender], instance.pk)
+
+# 삭제되는 게시물/릴스의 태그 post_count 감소
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Reels)
+def release_post_tags(sender, instance, **kwargs):
+    release_tags(instance)
@@ -1,3 +1,425 @@
+import hashlib
+import struct
+from unittest import mock
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from instaapp.media.inspection import inspect_upload
+from instaapp.media.pipeline import MEDIA_PROCESSING_MAX_ATTEMPTS, MEDIA_PROCESSING_TIMEOUT, process_post_media, sweep_stale_media
+from instaapp.media.probe import MPEG_PACK_START, MPEG_TAIL_SIZE, probe_duration
+from instaapp.models import CustomUser, ExploreEntry, Follow, Message, Post, TimelineEntry
+from instaapp.models.media import MediaStatus
+from instaapp.models.search import CaptionSearchPosting, CaptionSearchTerm
+from instaapp.models.trending import TagUsageBucket
+from instaapp.pagination import KeysetPagination, encode_cursor
+from instaapp.search import captions
+from instaapp.services import explore_services, timeline_services
+from instaapp.services.chat_services import CHAT_SYNC_SETTLE_SECONDS, get_or_create_direct_chatroom, sync_messages
+from instaapp.services.explore_services import refresh_explore_entry
+from instaapp.services.post_services import create_post
+from instaapp.services.timeline_services import backfill_timeline, fan_out_post, get_timeline_posts, rebuild_timeline
 
 # Create your tests here.
+def make_user(username, **extra_fields):
+    return CustomUser.objects.create_user(username=username, email=f'{username}@example.com', password='password', name=username, **extra_fields)
+
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        self.reader = make_user('reader')
+        self.other = make_user('other')
+        cache.delete(timeline_services.FEED_POPULAR_CACHE_KEY)
+
+    def follow(self, follower, followed):
+        Follow.objects.create(follower=follower, followed=followed)
+        CustomUser.objects.filter(pk=followed.pk).update(follower_count=followed.followers.count())
+        followed.refresh_from_db()
+
+    def test_fan_out_post_pushes_to_followers_only(self):
+        self.follow(self.reader, self.author)
+        post = Post.objects.create(author=self.author, content='hello')
+
+        self.assertEqual(fan_out_post(post), 1)
+        self.assertTrue(TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertFalse(TimelineEntry.objects.filter(user=self.other).exists())
+        self.assertEqual(get_timeline_posts(self.reader), [post])
+
+    def test_fan_out_skips_large_accounts_and_merges_on_read(self):
+        self.follow(self.reader, self.author)
+        post = Post.objects.create(author=self.author, content='hello')
+
+        original = timeline_services.TIMELINE_FANOUT_FOLLOWER_LIMIT
+        timeline_services.TIMELINE_FANOUT_FOLLOWER_LIMIT = 1
+        try:
+            self.assertEqual(fan_out_post(post), 0)
+            self.assertFalse(TimelineEntry.objects.exists())
+            self.assertEqual(get_timeline_posts(self.reader), [post])
+        finally:
+            timeline_services.TIMELINE_FANOUT_FOLLOWER_LIMIT = original
+
+    def test_backfill_timeline_adds_recent_posts_of_new_followee(self):
+        posts = [Post.objects.create(author=self.author, content=f'post {i}') for i in range(3)]
+        self.follow(self.reader, self.author)
+
+        self.assertEqual(backfill_timeline(self.reader, self.author), 3)
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=self.reader).values_list('post_id', flat=True)),
+            {post.id for post in posts},
+        )
+
+    def test_timeline_is_trimmed_to_max_length(self):
+        for i in range(5):
+            Post.objects.create(author=self.author, content=f'post {i}')
+        self.follow(self.reader, self.author)
+
+        original = timeline_services.TIMELINE_MAX_LENGTH
+        timeline_services.TIMELINE_MAX_LENGTH = 3
+        try:
+            backfill_timeline(self.reader, self.author)
+        finally:
+            timeline_services.TIMELINE_MAX_LENGTH = original
+        newest = Post.objects.order_by('-created_at', '-id').values_list('id', flat=True)[:3]
+        self.assertEqual(set(TimelineEntry.objects.filter(user=self.reader).values_list('post_id', flat=True)), set(newest))
+
+    def test_rebuild_timeline_fills_existing_follows(self):
+        # 배포 전부터 있던 팔로우/게시물 (fan-out, backfill 이 돌지 않은 상태)
+        self.follow(self.reader, self.author)
+        self.follow(self.reader, self.other)
+        posts = [Post.objects.create(author=author, content='old') for author in (self.author, self.other, self.author)]
+        Post.objects.create(author=self.reader, content='own post')
+
+        self.assertEqual(rebuild_timeline(self.reader.id), 3)
+        self.assertEqual(
+            list(TimelineEntry.objects.filter(user=self.reader).order_by('-created_at', '-post_id').values_list('post_id', flat=True)),
+            [post.id for post in reversed(posts)],
+        )
+        # 다시 돌려도 중복되지 않음
+        rebuild_timeline(self.reader.id)
+        self.assertEqual(TimelineEntry.objects.filter(user=self.reader).count(), 3)
+
+    def test_feed_merges_own_and_popular_posts_without_follows(self):
+        popular = Post.objects.create(author=self.author, content='popular', like_count=10)
+        Post.objects.create(author=self.other, content='quiet')
+        own = Post.objects.create(author=self.reader, content='own post')
+
+        original = timeline_services.FEED_POPULAR_SIZE
+        timeline_services.FEED_POPULAR_SIZE = 1
+        try:
+            self.assertEqual(get_timeline_posts(self.reader), [own, popular])
+        finally:
+            timeline_services.FEED_POPULAR_SIZE = original
+
+class PostAccessTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        self.other = make_user('other')
+        self.client = APIClient()
+
+    def test_author_can_delete_failed_post(self):
+        post = Post.objects.create(author=self.author, content='broken', status=MediaStatus.FAILED)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(f'/api/posts/{post.id}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/posts/').json(), [])
+
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.client.get(f'/api/posts/{post.id}/').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/posts/{post.id}/').status_code, 204)
+        self.assertFalse(Post.objects.filter(pk=post.pk).exists())
+
+class CreatePostTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        self.friend = make_user('friend')
+
+    def test_post_with_uploads_waits_for_processing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = create_post(self.author, 'hello', None, [], ['friend', 'nobody'], [{'file': 'posts/a.jpg'}])
+
+        self.assertEqual(post.status, MediaStatus.PENDING)
+        self.assertEqual(list(post.images.values_list('file', flat=True)), ['posts/a.jpg'])
+        self.assertEqual(list(post.mentions.all()), [self.friend])
+        self.assertEqual(len(callbacks), 1)
+
+    def tag_usage(self):
+        return dict(TagUsageBucket.objects.filter(granularity=TagUsageBucket.HOUR).values_list('tag__name', 'count'))
+
+    def test_tag_usage_is_recorded_when_post_is_published(self):
+        failed = create_post(self.author, 'broken', None, ['sunset'], [], [{'file': 'posts/missing.jpg'}])
+        with mock.patch('instaapp.media.pipeline.process_image', side_effect=ValidationError('Unsupported file type')):
+            process_post_media(failed.id)
+        self.assertEqual(self.tag_usage(), {})
+
+        post = create_post(self.author, 'hello', None, ['sunset'], [], [{'file': 'posts/a.jpg'}])
+        self.assertEqual(self.tag_usage(), {})
+        with mock.patch('instaapp.media.pipeline.process_image'):
+            process_post_media(post.id)
+        self.assertEqual(self.tag_usage(), {'sunset': 1})
+
+        create_post(self.author, 'text only', None, ['sunset'], [])
+        self.assertEqual(self.tag_usage(), {'sunset': 2})
+
+    def test_text_post_is_ready(self):
+        post = create_post(self.author, 'hello', None, [], [])
+        self.assertEqual(post.status, MediaStatus.READY)
+        self.assertFalse(post.images.exists())
+
+class StaleMediaSweepTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        self.stale_at = timezone.now() - MEDIA_PROCESSING_TIMEOUT - timedelta(minutes=1)
+
+    def make_post(self, status, status_updated_at, processing_attempts=1):
+        post = Post.objects.create(author=self.author, content='upload', status=status)
+        Post.objects.filter(pk=post.pk).update(status_updated_at=status_updated_at, processing_attempts=processing_attempts)
+        return post
+
+    def test_requeues_stale_rows_and_fails_exhausted_ones(self):
+        stuck = self.make_post(MediaStatus.PROCESSING, self.stale_at)
+        lost = self.make_post(MediaStatus.PENDING, self.stale_at, processing_attempts=0)
+        running = self.make_post(MediaStatus.PROCESSING, timezone.now())
+        exhausted = self.make_post(MediaStatus.PROCESSING, self.stale_at, processing_attempts=MEDIA_PROCESSING_MAX_ATTEMPTS)
+
+        dispatched = []
+        swept = sweep_stale_media(dispatch=lambda process, pk: dispatched.append((process, pk)))
+
+        self.assertEqual(swept['Post'], (2, 1))
+        self.assertEqual(sorted(dispatched), sorted([(process_post_media, stuck.id), (process_post_media, lost.id)]))
+        statuses = dict(Post.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[stuck.id], MediaStatus.PENDING)
+        self.assertEqual(statuses[running.id], MediaStatus.PROCESSING)
+        self.assertEqual(statuses[exhausted.id], MediaStatus.FAILED)
+        # 바로 다시 돌려도 같은 항목을 두 번 넣지 않음
+        self.assertEqual(sweep_stale_media(dispatch=lambda process, pk: dispatched.append((process, pk)))['Post'], (0, 0))
+
+    def test_finished_rows_are_not_processed_again(self):
+        post = Post.objects.create(author=self.author, content='done')
+        process_post_media(post.id)
+        post.refresh_from_db()
+        self.assertEqual(post.processing_attempts, 0)
+
+class ExploreIndexTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        cache.delete(explore_services.EXPLORE_TRIM_CACHE_KEY)
+
+    def test_refresh_skips_posts_outside_window(self):
+        post = Post.objects.create(author=self.author, content='old', like_count=100)
+        Post.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(days=explore_services.EXPLORE_WINDOW_DAYS + 1))
+
+        self.assertIsNone(refresh_explore_entry(post))
+        self.assertFalse(ExploreEntry.objects.exists())
+
+    def test_refresh_skips_scores_below_full_index(self):
+        strong = [Post.objects.create(author=self.author, content='strong', like_count=100) for _ in range(2)]
+        weak = Post.objects.create(author=self.author, content='weak')
+        Post.objects.filter(pk=weak.pk).update(created_at=timezone.now() - timedelta(days=1))
+
+        original = explore_services.EXPLORE_INDEX_SIZE
+        explore_services.EXPLORE_INDEX_SIZE = 2
+        try:
+            for post in strong:
+                refresh_explore_entry(post)
+            self.assertIsNone(refresh_explore_entry(weak))
+        finally:
+            explore_services.EXPLORE_INDEX_SIZE = original
+        self.assertEqual(set(ExploreEntry.objects.values_list('post_id', flat=True)), {post.id for post in strong})
+
+class CaptionIndexTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+
+    def doc_counts(self):
+        return dict(CaptionSearchTerm.objects.filter(kind='post', doc_count__gt=0).values_list('token', 'doc_count'))
+
+    def test_colliding_tokens_are_counted_once(self):
+        # MySQL 의 악센트 무시 콜레이션에서 café 와 cafe 가 같은 값으로 충돌하는 경우
+        post = Post.objects.create(author=self.author, content='café cafe')
+        build_postings = captions.build_postings
+
+        def colliding_postings(kind, obj):
+            postings = build_postings(kind, obj)
+            for posting in postings:
+                posting.token = 'cafe'
+            return postings
+
+        with mock.patch.object(captions, 'build_postings', colliding_postings):
+            captions.index_document('post', post)
+        self.assertEqual(list(CaptionSearchPosting.objects.values_list('token', flat=True)), ['cafe'])
+        self.assertEqual(self.doc_counts(), {'cafe': 1, captions.TOTAL_TOKEN: 1})
+
+        captions.unindex_document('post', post.pk)
+        self.assertEqual(self.doc_counts(), {})
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.author = make_user('author')
+        self.posts = [Post.objects.create(author=self.author, content=f'post {i}') for i in range(3)]
+
+    def paginate(self, cursor):
+        request = Request(APIRequestFactory().get('/api/posts/', {'cursor': cursor, 'page_size': 2}))
+        return KeysetPagination().paginate_queryset(Post.objects.all(), request)
+
+    def test_valid_cursor_pages_forward(self):
+        newest = self.posts[-1]
+        self.assertEqual(self.paginate(encode_cursor((newest.created_at, newest.id))), self.posts[1::-1])
+
+    def test_tampered_cursor_is_not_found(self):
+        cursors = [
+            'not-base64-json',
+            encode_cursor(('yesterday', 1)),
+            encode_cursor(({'a': 1}, 1)),
+            encode_cursor(([1, 2], 1)),
+            encode_cursor((self.posts[0].created_at,)),
+            encode_cursor((self.posts[0].created_at, 'abc')),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    self.paginate(cursor)
+
+def mp4_box(box_type, body=b'', large=False):
+    if large:
+        return struct.pack('>I4sQ', 1, box_type, len(body) + 16) + body
+    return struct.pack('>I4s', len(body) + 8, box_type) + body
+
+def mvhd_v0(timescale, duration):
+    return mp4_box(b'mvhd', b'\x00\x00\x00\x00' + struct.pack('>IIII', 0, 0, timescale, duration) + b'\x00' * 80)
+
+def mvhd_v1(timescale, duration):
+    return mp4_box(b'mvhd', b'\x01\x00\x00\x00' + struct.pack('>QQIQ', 0, 0, timescale, duration) + b'\x00' * 80)
+
+def mpeg2_pack(scr):
+    # '01' + SCR[32..30] + 1 + SCR[29..15] + 1 + SCR[14..0] + 1 + 확장 9비트 + 1
+    bits = (0b01 << 46) | ((scr >> 30) & 0x7) << 43 | 1 << 42 | ((scr >> 15) & 0x7FFF) << 27 | 1 << 26 | (scr & 0x7FFF) << 11 | 1 << 10 | 1
+    return MPEG_PACK_START + bits.to_bytes(6, 'big') + b'\x00\x00\x03\xf8'
+
+def mpeg1_pack(scr):
+    # '0010' + SCR[32..30] + 1 + SCR[29..15] + 1 + SCR[14..0] + 1
+    bits = (0b0010 << 36) | ((scr >> 30) & 0x7) << 33 | 1 << 32 | ((scr >> 15) & 0x7FFF) << 17 | 1 << 16 | (scr & 0x7FFF) << 1 | 1
+    return MPEG_PACK_START + bits.to_bytes(5, 'big') + b'\x80\x00\x01'
+
+def split_chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class VideoProbeTests(TestCase):
+    def test_mp4_moov_after_mdat(self):
+        data = mp4_box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2mp41') + mp4_box(b'mdat', b'\x00' * 5000) + mp4_box(b'moov', mvhd_v0(1000, 12500))
+        self.assertEqual(probe_duration(split_chunks(data, 7)), 12.5)
+
+    def test_mp4_version1_mvhd_and_large_box(self):
+        data = mp4_box(b'ftyp', b'isom') + mp4_box(b'mdat', b'\x00' * 100, large=True) + mp4_box(b'moov', mvhd_v1(90000, 90000 * 61))
+        self.assertEqual(probe_duration([data]), 61)
+
+    def test_fragmented_mp4_reads_mehd(self):
+        mvex = mp4_box(b'mvex', mp4_box(b'mehd', b'\x00\x00\x00\x00' + struct.pack('>I', 3000)))
+        data = mp4_box(b'ftyp', b'iso6') + mp4_box(b'moov', mvhd_v0(600, 0) + mvex)
+        self.assertEqual(probe_duration(split_chunks(data, 16)), 5)
+
+    def test_mp4_unknown_or_truncated_returns_none(self):
+        self.assertIsNone(probe_duration([mp4_box(b'ftyp', b'isom') + mp4_box(b'moov', mvhd_v0(1000, 0xFFFFFFFF))]))
+        self.assertIsNone(probe_duration([mp4_box(b'ftyp', b'isom') + mp4_box(b'moov', mvhd_v0(1000, 5000))[:-10]]))
+        self.assertIsNone(probe_duration([mp4_box(b'ftyp', b'isom') + mp4_box(b'mdat', b'\x00' * 10)]))
+        self.assertIsNone(probe_duration([b'not a video container']))
+
+    def test_mpeg2_program_stream(self):
+        data = mpeg2_pack(900) + b'\x00' * 3000 + mpeg2_pack(45000) + b'\x00' * 3000 + mpeg2_pack(900 + 90000 * 42)
+        self.assertEqual(probe_duration(split_chunks(data, 1000)), 42)
+
+    def test_mpeg1_program_stream(self):
+        data = mpeg1_pack(0) + b'\xff' * 100 + mpeg1_pack(90000 * 3)
+        self.assertEqual(probe_duration(split_chunks(data, 5)), 3)
+
+    def test_mpeg_ps_last_pack_kept_across_tail_window(self):
+        data = mpeg2_pack(0) + b'\x00' * (MPEG_TAIL_SIZE * 2) + mpeg2_pack(90000 * 10)
+        self.assertEqual(probe_duration(split_chunks(data, 64 * 1024)), 10)
+
+    def test_inspect_upload_hashes_whole_file_in_one_pass(self):
+        data = mp4_box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2avc1mp41') + mp4_box(b'mdat', b'\x01' * 300000) + mp4_box(b'moov', mvhd_v0(1000, 7000))
+        upload = SimpleUploadedFile('clip.mp4', data, content_type='video/mp4')
+
+        info = inspect_upload(upload)
+        self.assertEqual(info.mime_type, 'video/mp4')
+        self.assertEqual(info.size, len(data))
+        self.assertEqual(info.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(info.duration, 7)
+        self.assertIs(inspect_upload(upload), info)
+        self.assertEqual(upload.read(), data)
+
+class ChatSyncTests(TestCase):
+    def setUp(self):
+        self.user = make_user('alice')
+        self.friend = make_user('bob')
+        self.stranger = make_user('carol')
+        self.chatroom = get_or_create_direct_chatroom(self.user, self.friend)[0]
+        self.other_chatroom = get_or_create_direct_chatroom(self.friend, self.stranger)[0]
+
+    def send(self, chatroom, content, sent_ago, persisted_ago):
+        # sent_ago: 보낸 시각(timestamp), persisted_ago: 저장 시각(created_at) 이 지금보다 몇 초 전인지
+        now = timezone.now()
+        message = Message.objects.create(chatroom=chatroom, sender=self.friend, receiver=self.user, content=content, timestamp=now - timedelta(seconds=sent_ago))
+        Message.objects.filter(pk=message.pk).update(created_at=now - timedelta(seconds=persisted_ago))
+        return message
+
+    def sync_all(self, position=None, limit=2):
+        contents = []
+        while True:
+            messages, has_more = sync_messages(self.user, position, limit)
+            contents += [message.content for message in messages]
+            if messages:
+                position = (messages[-1].created_at, messages[-1].id)
+            if not has_more:
+                return contents, position
+
+    def test_pages_in_persist_order_without_gaps(self):
+        for i in range(5):
+            self.send(self.chatroom, f'm{i}', sent_ago=60 - i, persisted_ago=60 - i)
+        self.send(self.other_chatroom, 'not mine', sent_ago=30, persisted_ago=30)
+
+        contents, _ = self.sync_all()
+        self.assertEqual(contents, ['m0', 'm1', 'm2', 'm3', 'm4'])
+
+    def test_late_persisted_message_is_not_skipped(self):
+        self.send(self.chatroom, 'early', sent_ago=60, persisted_ago=60)
+        self.send(self.chatroom, 'later', sent_ago=40, persisted_ago=40)
+        contents, position = self.sync_all()
+        self.assertEqual(contents, ['early', 'later'])
+
+        # 버퍼 재시도로 커서보다 늦게 저장됐지만 보낸 시각은 커서보다 앞선 메시지
+        self.send(self.chatroom, 'retried', sent_ago=50, persisted_ago=10)
+        contents, _ = self.sync_all(position)
+        self.assertEqual(contents, ['retried'])
+
+    def test_recently_persisted_messages_wait_for_settle(self):
+        self.send(self.chatroom, 'settled', sent_ago=30, persisted_ago=30)
+        self.send(self.chatroom, 'in flight', sent_ago=0, persisted_ago=0)
+
+        contents, position = self.sync_all()
+        self.assertEqual(contents, ['settled'])
+        Message.objects.filter(content='in flight').update(created_at=timezone.now() - timedelta(seconds=CHAT_SYNC_SETTLE_SECONDS + 1))
+        self.assertEqual(self.sync_all(position)[0], ['in flight'])
+
+    def test_single_chatroom_filter(self):
+        self.send(self.chatroom, 'mine', sent_ago=30, persisted_ago=30)
+        messages, has_more = sync_messages(self.stranger, None, 10, self.chatroom.id)
+        self.assertEqual((messages, has_more), ([], False))
+        messages, _ = sync_messages(self.user, None, 10, self.chatroom.id)
+        self.assertEqual([message.content for message in messages], ['mine'])
+
+    def test_sync_view_rejects_tampered_cursor(self):
+        message = self.send(self.chatroom, 'mine', sent_ago=30, persisted_ago=30)
+        message.refresh_from_db()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get('/api/chatrooms/sync/', {'cursor': encode_cursor((message.created_at - timedelta(seconds=1), 0))})
+        self.assertEqual([item['content'] for item in response.json()['messages']], ['mine'])
+        for cursor in ['garbage', encode_cursor(('not a date', 1)), encode_cursor((message.created_at, 'x')), encode_cursor((message.created_at,))]:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(client.get('/api/chatrooms/sync/', {'cursor': cursor}).status_code, 404)
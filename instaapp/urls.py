@@ -1,6 +1,4 @@
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from instaapp.views.user_views import UserViewSet
 from instaapp.views.post_views import PostViewSet
@@ -9,6 +7,9 @@ from instaapp.views.reels_views import ReelsViewSet
 from instaapp.views.explore_views import ExploreViewSet
 from instaapp.views.comment_views import CommentViewSet
 from instaapp.views.chat_views import ChatRoomViewSet
+from instaapp.views.upload_views import UploadSessionViewSet, DirectUploadViewSet
+from instaapp.views.media_views import SignedMediaView
+from instaapp.views.tag_views import TagViewSet
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -18,6 +19,9 @@ router.register(r'reels', ReelsViewSet, basename='reels')
 router.register(r'explore', ExploreViewSet, basename='explore')
 router.register(r'comments', CommentViewSet, basename='comments')
 router.register(r'chatrooms', ChatRoomViewSet, basename='chatroom')
+router.register(r'uploads', UploadSessionViewSet, basename='uploads')
+router.register(r'direct-uploads', DirectUploadViewSet, basename='direct-uploads')
+router.register(r'tags', TagViewSet, basename='tags')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -41,6 +45,7 @@ urlpatterns = [
     path('users/profile/', UserViewSet.as_view({'get': 'profile'}), name='user-profile'),
     path('users/profile/<int:pk>/', UserViewSet.as_view({'get': 'profile'}), name='user-profile-specific'),
     path('search/tags/', PostViewSet.as_view({'get': 'search_tags'}), name='search-tags'),
+    path('search/trending/', TagViewSet.as_view({'get': 'trending'}), name='search-trending'),
     path('search/tagged/', PostViewSet.as_view({'get': 'tagged'}), name='search-tagged'),
     path('search/usernames/', UserViewSet.as_view({'get': 'search_usernames'}), name='search-usernames'),
     path('reels/<int:pk>/like/', ReelsViewSet.as_view({'post': 'like'}), name='reels-like'),
@@ -50,7 +55,5 @@ urlpatterns = [
     path('reels/<int:pk>/comment/', ReelsViewSet.as_view({'post': 'comment'}), name='reels-comment'),
     path('reels/user/<int:user_id>/', ReelsViewSet.as_view({'get': 'user_reels'}), name='user-reels-specific'),
     path('reels/top_reels/', ReelsViewSet.as_view({'get': 'top_reels'}), name='top-reels'),
+    path('signed-media/<path:name>', SignedMediaView.as_view(), name='signed-media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
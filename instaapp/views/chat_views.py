@@ -1,10 +1,22 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
 from instaapp.models.chatroom import ChatRoom, Message
+from instaapp.models.inbox import InboxEntry
 from instaapp.models.user import CustomUser
 from instaapp.serializers import ChatRoomSerializer, MessageSerializer, UserSerializer
+from instaapp.pagination import KeysetPagination, decode_cursor, encode_cursor
+from instaapp.services.chat_services import (
+    SYNC_ORDERING, compact_message, get_or_create_direct_chatroom, get_participant_ids, publish_message, sync_messages,
+)
+from instaapp.services.inbox_services import mark_read, record_messages
+
+CHAT_SYNC_PAGE_SIZE = 200
+CHAT_SYNC_MAX_PAGE_SIZE = 500
 
 class ChatRoomViewSet(viewsets.ModelViewSet):
     queryset = ChatRoom.objects.all()
@@ -25,23 +37,17 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         except CustomUser.DoesNotExist:
             return Response({'error': 'User not found'}, status=404)
 
-        # Check if chat room already exists
-        chatroom = ChatRoom.objects.filter(participants=request.user).filter(participants=other_user).first()
-        if chatroom:
-            return Response({'chatroom_id': chatroom.id}, status=200)
-
-        # Create new chat room
-        chatroom = ChatRoom.objects.create()
-        chatroom.participants.add(request.user, other_user)
-        chatroom.save()
-        return Response({'chatroom_id': chatroom.id}, status=201)
+        chatroom, created = get_or_create_direct_chatroom(request.user, other_user)
+        return Response({'chatroom_id': chatroom.id}, status=201 if created else 200)
 
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def messages(self, request, pk=None):
         chatroom = self.get_object()
-        messages = chatroom.messages.order_by('timestamp')
+        # 최신 메시지부터 페이지 단위로 반환
+        paginator = KeysetPagination(ordering=('-timestamp', '-id'))
+        messages = paginator.paginate_queryset(chatroom.messages.all(), request, view=self)
         serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def send_message(self, request, pk=None):
@@ -54,21 +60,75 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Receiver not found'}, status=404)
 
         if content:
-            message = Message.objects.create(chatroom=chatroom, sender=request.user, receiver=receiver, content=content)
+            participant_ids = get_participant_ids(chatroom.id, request.user)
+            with transaction.atomic():
+                message = Message.objects.create(chatroom=chatroom, sender=request.user, receiver=receiver, content=content)
+                record_messages([message])
+                transaction.on_commit(lambda: publish_message(message, participant_ids))
             serializer = MessageSerializer(message)
             return Response(serializer.data)
         return Response({'error': 'Message content is required'}, status=400)
     
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def read(self, request, pk=None):
+        if not mark_read(request.user, pk):
+            return Response({'error': 'Chatroom not found'}, status=404)
+        return Response({'chatroom_id': int(pk), 'unread_count': 0})
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_chatrooms(self, request):
-        user = request.user
-        chatrooms = ChatRoom.objects.filter(participants=user)
+        # 채팅 목록은 InboxEntry 에서 최근 메시지 순으로 한 번에 읽음
+        paginator = KeysetPagination(ordering=('-last_message_at', '-id'))
+        entries = paginator.paginate_queryset(
+            InboxEntry.objects.filter(user=request.user).select_related('other_user'), request, view=self
+        )
         data = []
-        for chatroom in chatrooms:
-            other_users = chatroom.participants.exclude(id=user.id)
-            for other_user in other_users:
-                data.append({
-                    'chatroom_id': chatroom.id,
-                    'user': UserSerializer(other_user).data,
-                })
-        return Response(data)
+        for entry in entries:
+            data.append({
+                'chatroom_id': entry.chatroom_id,
+                'user': UserSerializer(entry.other_user, context={'request': request}).data if entry.other_user else None,
+                'last_message': entry.last_message,
+                'last_sender': entry.last_sender_id,
+                'last_message_at': entry.last_message_at,
+                'unread_count': entry.unread_count,
+            })
+        return paginator.get_paginated_response(data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def sync(self, request):
+        # 재접속한 클라이언트가 받은 마지막 메시지(cursor) 이후만 받아감 (chatroom_id 를 주면 그 채팅방만)
+        position = None
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            # 쿼리 전에 (created_at, id) 로 바꿔 봄, 조작된 값은 404
+            created_at, message_id = decode_cursor(cursor, SYNC_ORDERING)[0]
+            try:
+                position = (parse_datetime(created_at), int(message_id))
+            except (TypeError, ValueError):
+                raise NotFound('Invalid cursor')
+            if position[0] is None:
+                raise NotFound('Invalid cursor')
+
+        chatroom_id = request.query_params.get('chatroom_id')
+        if chatroom_id is not None:
+            try:
+                chatroom_id = int(chatroom_id)
+            except ValueError:
+                return Response({'error': 'Invalid chatroom_id'}, status=400)
+            if not InboxEntry.objects.filter(user=request.user, chatroom_id=chatroom_id).exists():
+                return Response({'error': 'Chatroom not found'}, status=404)
+
+        try:
+            page_size = int(request.query_params.get('page_size', CHAT_SYNC_PAGE_SIZE))
+        except ValueError:
+            page_size = CHAT_SYNC_PAGE_SIZE
+        page_size = max(1, min(page_size, CHAT_SYNC_MAX_PAGE_SIZE))
+
+        messages, has_more = sync_messages(request.user, position, page_size, chatroom_id)
+        if messages:
+            cursor = encode_cursor((messages[-1].created_at, messages[-1].id))
+        return Response({
+            'messages': [compact_message(message) for message in messages],
+            'cursor': cursor,
+            'has_more': has_more,
+        })
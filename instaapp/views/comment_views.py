@@ -2,14 +2,26 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.db import transaction
 from instaapp.models.comment import Comment
 from instaapp.serializers import CommentSerializer
+from instaapp.services.counter_services import adjust_counter
+from instaapp.services.explore_services import refresh_explore_entry
 
 class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.filter(parent__isnull=True)
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
 
+    def perform_destroy(self, instance):
+        target = instance.post or instance.reels
+        with transaction.atomic():
+            # 답글도 함께 삭제되므로 실제 삭제된 댓글 수만큼 차감
+            _, deleted = instance.delete()
+            if target is not None:
+                adjust_counter(target, 'comment_count', -deleted.get(Comment._meta.label, 0))
+                transaction.on_commit(lambda: refresh_explore_entry(target))
+
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def replies(self, request, pk=None):
         comment = self.get_object()
@@ -1,39 +1,32 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from django.db.models import Count
+from instaapp.models.explore import ExploreEntry
 from instaapp.models.post import Post
 from instaapp.models.reels import Reels
+from instaapp.pagination import KeysetPagination
 from instaapp.serializers import PostSerializer, ReelsSerializer
 
 class ExploreViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def list(self, request):
-        user = request.user
+        # rank_explore 로 미리 계산해둔 인덱스를 점수 순으로 읽음 (피드와 릴스가 섞여 있음)
+        paginator = KeysetPagination(ordering=('-score', '-id'))
+        entries = paginator.paginate_queryset(ExploreEntry.objects.all(), request, view=self)
 
-        # 피드 정렬 (예시: 좋아요 수와 댓글 수 기준으로 정렬)
-        feeds = Post.objects.annotate(
-            engagement=Count('likes') + Count('comments')
-        ).order_by('-engagement')
-
-        # 릴스 정렬 (예시: 좋아요 수와 댓글 수 기준으로 정렬)
-        reels = Reels.objects.annotate(
-            engagement=Count('likes') + Count('comments')
-        ).order_by('-engagement')
-
-        # 피드와 릴스를 결합하여 하나의 리스트로 반환
-        combined_results = list(feeds) + list(reels)
-
-        # 예시: 피드와 릴스를 번갈아가며 섞는 로직
-        combined_results_sorted = sorted(combined_results, key=lambda x: x.engagement, reverse=True)
+        posts = Post.objects.in_bulk([entry.post_id for entry in entries if entry.post_id])
+        reels = Reels.objects.in_bulk([entry.reels_id for entry in entries if entry.reels_id])
 
         # 시리얼라이저로 데이터 변환
-        feed_serializer = PostSerializer(feeds, many=True, context={'request': request})
-        reels_serializer = ReelsSerializer(reels, many=True, context={'request': request})
-
-        # 결합된 결과 반환
-        return Response({
-            'feeds': feed_serializer.data,
-            'reels': reels_serializer.data
-        })
+        context = {'request': request}
+        post_data = dict(zip(posts, PostSerializer(list(posts.values()), many=True, context=context).data))
+        reels_data = dict(zip(reels, ReelsSerializer(list(reels.values()), many=True, context=context).data))
+
+        results = []
+        for entry in entries:
+            if entry.post_id in post_data:
+                results.append({'type': 'post', 'item': post_data[entry.post_id]})
+            elif entry.reels_id in reels_data:
+                results.append({'type': 'reels', 'item': reels_data[entry.reels_id]})
+
+        return paginator.get_paginated_response(results)
@@ -2,8 +2,11 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.db import transaction
 from instaapp.models import Follow, CustomUser
 from instaapp.serializers import FollowSerializer
+from instaapp.services.counter_services import adjust_counter
+from instaapp.services.timeline_services import backfill_timeline, remove_author_from_timeline
 
 class FollowViewSet(viewsets.ModelViewSet):
     queryset = Follow.objects.all()
@@ -21,7 +24,10 @@ class FollowViewSet(viewsets.ModelViewSet):
         if Follow.objects.filter(follower=follower, followed=followed).exists():
             return Response({'error': 'You are already following this user.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        follow = Follow.objects.create(follower=follower, followed=followed)
+        with transaction.atomic():
+            follow = Follow.objects.create(follower=follower, followed=followed)
+            adjust_counter(followed, 'follower_count', 1)
+        backfill_timeline(follower, followed)
         return Response(FollowSerializer(follow).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
@@ -34,7 +40,10 @@ class FollowViewSet(viewsets.ModelViewSet):
         
         try:
             follow = Follow.objects.get(follower=follower, followed=followed)
-            follow.delete()
+            with transaction.atomic():
+                follow.delete()
+                adjust_counter(followed, 'follower_count', -1)
+            remove_author_from_timeline(follower, followed)
             return Response({'status': 'Unfollowed successfully'}, status=status.HTTP_200_OK)
         except Follow.DoesNotExist:
             return Response({'error': 'No Follow matches the given query.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,115 @@
+import posixpath
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from instaapp.media.delivery import serve_media
+from instaapp.media.storage import LocalSignedURLBackend, get_signed_url_backend
+from instaapp.models.media import MediaStatus
+from instaapp.models.post import Image
+from instaapp.models.reels import Video
+from instaapp.models.upload import DirectUpload
+
+# 업로드 원본은 공개 전(처리 중/실패)이면 작성자만 볼 수 있음
+PROTECTED_MEDIA_PREFIXES = ('posts/', 'reels/', 'blobs/')
+# 같은 내용의 파일은 blob 으로 종류와 관계없이 공유되므로 (Image 가 reels/ 파일을, Video 가 posts/ 파일을 가리킬 수 있음) 양쪽 참조를 모두 확인
+MEDIA_OWNERS = ((Image, 'post'), (Video, 'reels'))
+# 검증을 통과한 뒤에만 만들어지는 파생 파일과 프로필 사진은 공개
+PUBLIC_MEDIA_PREFIXES = ('variants/', 'hls/', 'profile_pics/')
+
+class BoundedBody:
+    # 요청 본문을 읽으면서 서명에 담긴 최대 크기를 넘으면 중단
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.size = 0
+
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.size += len(chunk)
+        if self.size > self.limit:
+            raise ValueError('Upload exceeds the signed size limit.')
+        return chunk
+
+# LocalSignedURLBackend 가 발급한 서명 URL 을 처리하는 로컬 객체 스토리지 대용 (인증 대신 서명으로 확인)
+class SignedMediaView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get_backend(self):
+        backend = get_signed_url_backend()
+        return backend if isinstance(backend, LocalSignedURLBackend) else None
+
+    def put(self, request, name):
+        backend = self.get_backend()
+        params = request.query_params
+        if backend is None or not backend.verify('PUT', name, params.get('expires'), params.get('signature'), params.get('max_size', '')):
+            return Response({'error': 'Invalid or expired signature'}, status=status.HTTP_403_FORBIDDEN)
+
+        max_size = int(params['max_size'])
+        try:
+            content_length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length <= 0 or request.stream is None:
+            return Response({'error': 'Empty upload'}, status=status.HTTP_400_BAD_REQUEST)
+        if content_length > max_size:
+            return Response({'error': 'Upload exceeds the signed size limit'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        # 서명 URL 은 한 번만 쓸 수 있음: 받기 전에 먼저 차지하고, 실패하면 다시 올릴 수 있도록 되돌림
+        direct_uploads = DirectUpload.objects.filter(key=name, registered_at__isnull=True)
+        if not direct_uploads.filter(uploaded_at__isnull=True).update(uploaded_at=timezone.now()):
+            return Response({'error': 'Upload URL has already been used'}, status=status.HTTP_409_CONFLICT)
+        if default_storage.exists(name):
+            return Response({'error': 'Object already exists'}, status=status.HTTP_409_CONFLICT)
+
+        body = BoundedBody(request.stream, max_size)
+        try:
+            saved_name = default_storage.save(name, File(body, name=name))
+        except ValueError as e:
+            default_storage.delete(name)
+            direct_uploads.update(uploaded_at=None)
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except Exception:
+            direct_uploads.update(uploaded_at=None)
+            raise
+        return Response({'key': saved_name, 'size': body.size}, status=status.HTTP_201_CREATED)
+
+    def get(self, request, name):
+        backend = self.get_backend()
+        params = request.query_params
+        if backend is None or not backend.verify('GET', name, params.get('expires'), params.get('signature')):
+            return Response({'error': 'Invalid or expired signature'}, status=status.HTTP_403_FORBIDDEN)
+        return serve_media(request, name, private=True)
+
+# MEDIA_URL 아래 파일 제공: 권한만 확인하고 전송은 프록시(X-Accel-Redirect/X-Sendfile) 또는 Range 지원 스트리밍으로 처리
+class MediaView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, name):
+        name = posixpath.normpath(name)
+        if name.startswith(('/', '..')):
+            raise Http404('Media not found')
+
+        private = False
+        if name.startswith(PROTECTED_MEDIA_PREFIXES):
+            owners = get_media_owners(name)
+            if not owners:
+                raise Http404('Media not found')
+            if not any(owner_status == MediaStatus.READY for owner_status, _ in owners):
+                if not request.user.is_authenticated or not any(author_id == request.user.id for _, author_id in owners):
+                    raise Http404('Media not found')
+                private = True
+        elif not name.startswith(PUBLIC_MEDIA_PREFIXES):
+            raise Http404('Media not found')
+        return serve_media(request, name, private)
+
+def get_media_owners(name):
+    # 파일을 가리키는 모든 게시물/릴스의 (상태, 작성자) (blob 을 공유하는 항목은 blob 의 파일 경로를 그대로 씀)
+    owners = []
+    for model, parent in MEDIA_OWNERS:
+        owners += model.objects.filter(file=name).values_list(f'{parent}__status', f'{parent}__author_id')
+    return owners
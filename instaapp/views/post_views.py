@@ -2,24 +2,35 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.utils import timezone
-from datetime import timedelta
 from instaapp.models.post import Post, Image
 from instaapp.models.comment import Comment
 from instaapp.models.like import Like
 from instaapp.models.mark import Mark
 from instaapp.models.tag import Tag
-from instaapp.models.follow import Follow
 from instaapp.models.user import CustomUser
-from instaapp.serializers import PostSerializer, ImageSerializer, CommentSerializer, TagSerializer
-from instaapp.models.validators import validate_feed_file_type, validate_feed_video_length, validate_file_type, validate_video_length
-from django.db.models import Count
+from instaapp.serializers import PostSerializer, ImageSerializer, CommentSerializer
+from instaapp.pagination import KeysetPagination
+from instaapp.search.autocomplete import TAG_AUTOCOMPLETE_TOP_K, suggest_tags
+from instaapp.search.captions import search_captions
+from instaapp.services.counter_services import adjust_counter
+from instaapp.services.explore_services import refresh_explore_entry
+from instaapp.services.timeline_services import get_timeline_posts
+from instaapp.services.tag_services import set_tags
+from instaapp.services.post_services import create_post
+from django.db import transaction
 import json
 
 class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all().order_by('-created_at')
+    queryset = Post.objects.visible().order_by('-created_at')
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
+    # 작성자 본인이 상태와 관계없이 다룰 수 있는 동작 (목록과 좋아요/댓글 등은 공개된 것만)
+    owner_actions = ('retrieve', 'update', 'partial_update', 'destroy')
+
+    def get_queryset(self):
+        if self.action in self.owner_actions:
+            return Post.objects.visible_to(self.request.user).order_by('-created_at')
+        return super().get_queryset()
 
     def create(self, request, *args, **kwargs):
         data = request.data
@@ -37,28 +48,7 @@ class PostViewSet(viewsets.ModelViewSet):
         except json.JSONDecodeError:
             mentions_data = []
 
-        post = Post.objects.create(author=request.user, content=content, site=site)
-
-        for file in files:
-            validate_feed_file_type(file)  # 파일 타입 검증
-            if 'video' in file.content_type:
-                validate_feed_video_length(file)  # 비디오 길이 검증
-            Image.objects.create(post=post, file=file)
-
-        for tag_name in tags_data:
-            tag_name = tag_name.strip()
-            if tag_name:
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                tag.post_count += 1
-                tag.save()
-                post.tags.add(tag)
-
-        for username in mentions_data:
-            try:
-                user = CustomUser.objects.get(username=username)
-                post.mentions.add(user)
-            except CustomUser.DoesNotExist:
-                pass
+        post = create_post(request.user, content, site, tags_data, mentions_data, files=files)
 
         serializer = self.get_serializer(post)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -73,12 +63,7 @@ class PostViewSet(viewsets.ModelViewSet):
         tags_data = json.loads(data.get('tags', '[]'))
         mentions_data = json.loads(data.get('mentions', '[]'))
         
-        instance.tags.clear()
-        for tag_name in tags_data:
-            tag_name = tag_name.strip()  # 태그 이름의 앞뒤 공백 제거
-            if tag_name:  # 빈 태그는 추가하지 않음
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                instance.tags.add(tag)
+        set_tags(instance, tags_data)
 
         instance.mentions.clear()
         for username in mentions_data:
@@ -93,13 +78,24 @@ class PostViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def processing_status(self, request, pk=None):
+        # 처리 중인 게시물은 작성자만 조회 가능
+        post = Post.objects.filter(pk=pk, author=request.user).values('id', 'status', 'processing_error').first()
+        if post is None:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(post)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def like(self, request, pk=None):
         post = self.get_object()
         user = request.user
         if Like.objects.filter(user=user, post=post).exists():
             return Response({'error': 'You already liked this post'}, status=status.HTTP_400_BAD_REQUEST)
-        Like.objects.create(user=user, post=post)
+        with transaction.atomic():
+            Like.objects.create(user=user, post=post)
+            adjust_counter(post, 'like_count', 1)
+            transaction.on_commit(lambda: refresh_explore_entry(post))
         return Response({'status': 'post_liked'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -108,7 +104,10 @@ class PostViewSet(viewsets.ModelViewSet):
         user = request.user
         try:
             like = Like.objects.get(user=user, post=post)
-            like.delete()
+            with transaction.atomic():
+                like.delete()
+                adjust_counter(post, 'like_count', -1)
+                transaction.on_commit(lambda: refresh_explore_entry(post))
             return Response({'status': 'post unliked'}, status=status.HTTP_200_OK)
         except Like.DoesNotExist:
             return Response({'error': 'You have not liked this post'}, status=status.HTTP_400_BAD_REQUEST)
@@ -119,7 +118,10 @@ class PostViewSet(viewsets.ModelViewSet):
         user = request.user
         if Mark.objects.filter(user=user, post=post).exists():
             return Response({'error': 'You already saved this post'}, status=status.HTTP_400_BAD_REQUEST)
-        Mark.objects.create(user=user, post=post)
+        with transaction.atomic():
+            Mark.objects.create(user=user, post=post)
+            adjust_counter(post, 'mark_count', 1)
+            transaction.on_commit(lambda: refresh_explore_entry(post))
         return Response({'status': 'post saved'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -128,44 +130,32 @@ class PostViewSet(viewsets.ModelViewSet):
         user = request.user
         try:
             mark = Mark.objects.get(user=user, post=post)
-            mark.delete()
+            with transaction.atomic():
+                mark.delete()
+                adjust_counter(post, 'mark_count', -1)
+                transaction.on_commit(lambda: refresh_explore_entry(post))
             return Response({'status': 'post unsaved'}, status=status.HTTP_200_OK)
         except Mark.DoesNotExist:
             return Response({'error': 'You have not saved this post'}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def feed(self, request):
-        user = request.user
-        followed_users = Follow.objects.filter(follower=user).values_list('followed', flat=True)
-        
-        # 팔로우 중인 사용자들의 최근 7일간의 피드
-        seven_days_ago = timezone.now() - timedelta(days=7)
-        followed_posts = Post.objects.filter(
-            author__in=followed_users,
-            created_at__gte=seven_days_ago
-        ).annotate(like_count=Count('likes'))
-        
-        # 전체 피드에서 좋아요가 많은 최근 30일간의 피드 (상위 50개)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        popular_posts = Post.objects.filter(
-            created_at__gte=thirty_days_ago
-        ).annotate(like_count=Count('likes'))
-        
-        # 두 쿼리셋 결합
-        combined_posts = followed_posts.union(popular_posts)
-        
-        # 결과 정렬 (좋아요 수 내림차순, 생성 날짜 내림차순)
-        final_posts = combined_posts.order_by('-like_count', '-created_at')
-        
-        serializer = self.get_serializer(final_posts, many=True)
-        return Response(serializer.data)
+        # 미리 쌓아둔 타임라인에서 최신순으로 읽음
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        posts = paginator.paginate(
+            lambda position, reverse, limit: get_timeline_posts(request.user, limit, position, reverse),
+            request
+        )
+        serializer = self.get_serializer(posts, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def comments(self, request, pk=None):
         post = self.get_object()
-        comments = Comment.objects.filter(post=post).order_by('created_at')
+        paginator = KeysetPagination(ordering=('created_at', 'id'))
+        comments = paginator.paginate_queryset(Comment.objects.filter(post=post), request, view=self)
         serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def comment(self, request, pk=None):
@@ -184,7 +174,10 @@ class PostViewSet(viewsets.ModelViewSet):
             except Comment.DoesNotExist:
                 return Response({'error': 'Parent comment does not exist'}, status=status.HTTP_400_BAD_REQUEST)
 
-        comment = Comment.objects.create(user=user, post=post, text=content, parent=parent)
+        with transaction.atomic():
+            comment = Comment.objects.create(user=user, post=post, text=content, parent=parent)
+            adjust_counter(post, 'comment_count', 1)
+            transaction.on_commit(lambda: refresh_explore_entry(post))
         serializer = CommentSerializer(comment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
@@ -194,10 +187,28 @@ class PostViewSet(viewsets.ModelViewSet):
         if not search_term:
             return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        tags = Tag.objects.filter(name__icontains=search_term).order_by('-post_count')
-        serializer = TagSerializer(tags, many=True)
-        return Response(serializer.data)
+        # 정규화한 접두사로 post_count 상위 태그만 반환
+        try:
+            limit = int(request.query_params.get('limit', TAG_AUTOCOMPLETE_TOP_K))
+        except ValueError:
+            limit = TAG_AUTOCOMPLETE_TOP_K
+        return Response(suggest_tags(search_term, limit))
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def search(self, request):
+        search_term = request.query_params.get('q', '').strip()
+        if not search_term:
+            return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 본문 검색 색인에서 관련도 + 최신성 + 반응 점수 순으로 읽음
+        paginator = KeysetPagination(ordering=('-search_as_of', '-search_score', '-id'))
+        posts = paginator.paginate(
+            lambda position, reverse, limit: search_captions('post', search_term, limit, position, reverse),
+            request
+        )
+        serializer = self.get_serializer(posts, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def tagged(self, request):
         tag_name = request.query_params.get('tag', '').strip()
@@ -206,7 +217,7 @@ class PostViewSet(viewsets.ModelViewSet):
     
         try:
             tag = Tag.objects.get(name=tag_name)
-            posts = tag.posts.annotate(like_count=Count('likes')).order_by('-like_count')
+            posts = tag.posts.visible().order_by('-like_count')
             serializer = self.get_serializer(posts, many=True)
             return Response(serializer.data)
         except Tag.DoesNotExist:
@@ -215,6 +226,7 @@ class PostViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def user_posts(self, request, user_id=None):
         user = CustomUser.objects.get(pk=user_id)
-        posts = Post.objects.filter(author=user).order_by('-created_at')
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        posts = paginator.paginate_queryset(Post.objects.visible().filter(author=user), request, view=self)
         serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
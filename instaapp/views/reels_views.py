@@ -10,17 +10,33 @@ from instaapp.models.comment import Comment
 from instaapp.models.tag import Tag
 from instaapp.models.follow import Follow
 from instaapp.models.user import CustomUser
-from instaapp.serializers import ReelsSerializer, VideoSerializer, CommentSerializer, TagSerializer
-from django.db.models import Count
-from instaapp.models.validators import validate_reels_file_type, validate_reels_video_length
+from instaapp.serializers import ReelsSerializer, VideoSerializer, CommentSerializer
+from django.db import transaction
+from django.db.models import F
+from instaapp.services.counter_services import adjust_counter
+from instaapp.services.explore_services import refresh_explore_entry
+from instaapp.pagination import KeysetPagination
+from instaapp.search.autocomplete import TAG_AUTOCOMPLETE_TOP_K, suggest_tags
+from instaapp.search.captions import search_captions
+from instaapp.services.tag_services import set_tags
+from instaapp.services.reels_services import create_reels
 import json
 
 class ReelsViewSet(viewsets.ModelViewSet):
-    queryset = Reels.objects.all().annotate(
-        total_engagement=Count('likes') + Count('comments')
+    queryset = Reels.objects.visible().annotate(
+        total_engagement=F('like_count') + F('comment_count')
     ).order_by('-total_engagement', '-created_at')
     serializer_class = ReelsSerializer
     permission_classes = [IsAuthenticated]
+    # PostViewSet 과 같이 작성자는 처리 중/실패한 자기 릴스도 다룰 수 있음
+    owner_actions = ('retrieve', 'update', 'partial_update', 'destroy')
+
+    def get_queryset(self):
+        if self.action in self.owner_actions:
+            return Reels.objects.visible_to(self.request.user).annotate(
+                total_engagement=F('like_count') + F('comment_count')
+            ).order_by('-total_engagement', '-created_at')
+        return super().get_queryset()
 
     def create(self, request, *args, **kwargs):
         data = request.data
@@ -37,27 +53,7 @@ class ReelsViewSet(viewsets.ModelViewSet):
         except json.JSONDecodeError:
             mentions_data = []
 
-        reels = Reels.objects.create(author=request.user, content=content)
-
-        for file in files:
-            validate_reels_file_type(file)
-            validate_reels_video_length(file)  # 수정된 부분: 일시적으로 파일 저장 및 검증
-            Video.objects.create(reels=reels, file=file)
-
-        for tag_name in tags_data:
-            tag_name = tag_name.strip()
-            if tag_name:
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                tag.post_count += 1
-                tag.save()
-                reels.tags.add(tag)
-
-        for username in mentions_data:
-            try:
-                user = CustomUser.objects.get(username=username)
-                reels.mentions.add(user)
-            except CustomUser.DoesNotExist:
-                pass
+        reels = create_reels(request.user, content, tags_data, mentions_data, files=files)
 
         serializer = self.get_serializer(reels)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -72,12 +68,7 @@ class ReelsViewSet(viewsets.ModelViewSet):
         tags_data = json.loads(data.get('tags', '[]'))
         mentions_data = json.loads(data.get('mentions', '[]'))
 
-        instance.tags.clear()
-        for tag_name in tags_data:
-            tag_name = tag_name.strip()
-            if tag_name:
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                instance.tags.add(tag)
+        set_tags(instance, tags_data)
 
         instance.mentions.clear()
         for username in mentions_data:
@@ -92,13 +83,24 @@ class ReelsViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def processing_status(self, request, pk=None):
+        # 처리 중인 릴스는 작성자만 조회 가능
+        reels = Reels.objects.filter(pk=pk, author=request.user).values('id', 'status', 'processing_error').first()
+        if reels is None:
+            return Response({'error': 'Reels not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(reels)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def like(self, request, pk=None):
         reels = self.get_object()
         user = request.user
         if Like.objects.filter(user=user, reels=reels).exists():
             return Response({'error': 'You already liked this reels'}, status=status.HTTP_400_BAD_REQUEST)
-        Like.objects.create(user=user, reels=reels)
+        with transaction.atomic():
+            Like.objects.create(user=user, reels=reels)
+            adjust_counter(reels, 'like_count', 1)
+            transaction.on_commit(lambda: refresh_explore_entry(reels))
         return Response({'status': 'reels_liked'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -107,7 +109,10 @@ class ReelsViewSet(viewsets.ModelViewSet):
         user = request.user
         try:
             like = Like.objects.get(user=user, reels=reels)
-            like.delete()
+            with transaction.atomic():
+                like.delete()
+                adjust_counter(reels, 'like_count', -1)
+                transaction.on_commit(lambda: refresh_explore_entry(reels))
             return Response({'status': 'reels_unliked'}, status=status.HTTP_200_OK)
         except Like.DoesNotExist:
             return Response({'error': 'You have not liked this reels'}, status=status.HTTP_400_BAD_REQUEST)
@@ -118,7 +123,10 @@ class ReelsViewSet(viewsets.ModelViewSet):
         user = request.user
         if Mark.objects.filter(user=user, reels=reels).exists():
             return Response({'error': 'You already saved this reels'}, status=status.HTTP_400_BAD_REQUEST)
-        Mark.objects.create(user=user, reels=reels)
+        with transaction.atomic():
+            Mark.objects.create(user=user, reels=reels)
+            adjust_counter(reels, 'mark_count', 1)
+            transaction.on_commit(lambda: refresh_explore_entry(reels))
         return Response({'status': 'reels_saved'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -127,7 +135,10 @@ class ReelsViewSet(viewsets.ModelViewSet):
         user = request.user
         try:
             mark = Mark.objects.get(user=user, reels=reels)
-            mark.delete()
+            with transaction.atomic():
+                mark.delete()
+                adjust_counter(reels, 'mark_count', -1)
+                transaction.on_commit(lambda: refresh_explore_entry(reels))
             return Response({'status': 'reels_unsaved'}, status=status.HTTP_200_OK)
         except Mark.DoesNotExist:
             return Response({'error': 'You have not saved this reels'}, status=status.HTTP_400_BAD_REQUEST)
@@ -136,16 +147,18 @@ class ReelsViewSet(viewsets.ModelViewSet):
     def feed(self, request):
         user = request.user
         followed_users = Follow.objects.filter(follower=user).values_list('followed', flat=True)
-        reelss = Reels.objects.filter(author__in=followed_users).order_by('-created_at')
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        reelss = paginator.paginate_queryset(Reels.objects.visible().filter(author__in=followed_users), request, view=self)
         serializer = self.get_serializer(reelss, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def comments(self, request, pk=None):
         reels = self.get_object()
-        comments = Comment.objects.filter(reels=reels).order_by('created_at')
+        paginator = KeysetPagination(ordering=('created_at', 'id'))
+        comments = paginator.paginate_queryset(Comment.objects.filter(reels=reels), request, view=self)
         serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def comment(self, request, pk=None):
@@ -154,7 +167,10 @@ class ReelsViewSet(viewsets.ModelViewSet):
         content = request.data.get('text')
         if not content:
             return Response({'error': 'Comment content cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
-        comment = Comment.objects.create(user=user, reels=reels, text=content)
+        with transaction.atomic():
+            comment = Comment.objects.create(user=user, reels=reels, text=content)
+            adjust_counter(reels, 'comment_count', 1)
+            transaction.on_commit(lambda: refresh_explore_entry(reels))
         serializer = CommentSerializer(comment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -164,9 +180,27 @@ class ReelsViewSet(viewsets.ModelViewSet):
         if not search_term:
             return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        tags = Tag.objects.filter(name__icontains=search_term).order_by('-post_count')
-        serializer = TagSerializer(tags, many=True)
-        return Response(serializer.data)
+        # 정규화한 접두사로 post_count 상위 태그만 반환
+        try:
+            limit = int(request.query_params.get('limit', TAG_AUTOCOMPLETE_TOP_K))
+        except ValueError:
+            limit = TAG_AUTOCOMPLETE_TOP_K
+        return Response(suggest_tags(search_term, limit))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def search(self, request):
+        search_term = request.query_params.get('q', '').strip()
+        if not search_term:
+            return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 본문 검색 색인에서 관련도 + 최신성 + 반응 점수 순으로 읽음
+        paginator = KeysetPagination(ordering=('-search_as_of', '-search_score', '-id'))
+        reelss = paginator.paginate(
+            lambda position, reverse, limit: search_captions('reels', search_term, limit, position, reverse),
+            request
+        )
+        serializer = self.get_serializer(reelss, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def tagged(self, request):
@@ -176,7 +210,7 @@ class ReelsViewSet(viewsets.ModelViewSet):
 
         try:
             tag = Tag.objects.get(name=tag_name)
-            reelss = tag.reels.annotate(like_count=Count('likes')).order_by('-like_count')
+            reelss = tag.reels.visible().order_by('-like_count')
             serializer = self.get_serializer(reelss, many=True)
             return Response(serializer.data)
         except Tag.DoesNotExist:
@@ -185,20 +219,17 @@ class ReelsViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def user_reels(self, request, user_id=None):
         user = CustomUser.objects.get(pk=user_id)
-        reels = Reels.objects.filter(author=user).order_by('-created_at')
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        reels = paginator.paginate_queryset(Reels.objects.visible().filter(author=user), request, view=self)
         serializer = self.get_serializer(reels, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def top_reels(self, request):
-        reels = Reels.objects.annotate(
-            total_engagement=Count('likes') + Count('comments')
-        ).order_by('-total_engagement', '-created_at')
-        
-        page = self.paginate_queryset(reels)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
+        reels = Reels.objects.visible().annotate(
+            total_engagement=F('like_count') + F('comment_count')
+        )
+        paginator = KeysetPagination(ordering=('-total_engagement', '-created_at', '-id'))
+        reels = paginator.paginate_queryset(reels, request, view=self)
         serializer = self.get_serializer(reels, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,13 @@
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from instaapp.services.trending_services import get_trending_tags
+
+class TagViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def trending(self, request):
+        # 최근 몇 시간 사용량이 평소보다 크게 늘어난 태그 (몇 분 단위로 캐시)
+        return Response(get_trending_tags())
@@ -0,0 +1,178 @@
+import json
+import re
+import uuid
+from django.core import signing
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from instaapp.models.upload import DirectUpload, UploadSession
+from instaapp.media.storage import MEDIA_DIRECT_UPLOAD_MAX_SIZE, UPLOAD_PREFIXES, get_signed_url_backend, make_upload_key
+from instaapp.serializers import PostSerializer, ReelsSerializer
+from instaapp.services.post_services import create_post
+from instaapp.services.reels_services import create_reels
+from instaapp.services.upload_services import (
+    DIRECT_UPLOAD_REGISTER_TTL, UPLOAD_MAX_SIZE, UploadOffsetMismatch, append_chunk, create_upload_session,
+    discard_upload_session, finalize_upload,
+)
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+DIRECT_UPLOAD_SALT = 'instaapp.direct-upload'
+
+def load_json_list(data, key):
+    # multipart 로 오면 JSON 문자열, JSON 본문으로 오면 리스트
+    value = data.get(key, '[]')
+    if isinstance(value, list):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, json.JSONDecodeError):
+        return []
+
+# 이어받기 업로드: 세션 생성 -> PUT 으로 바이트 구간 전송 (GET 으로 현재 offset 확인) -> finalize
+class UploadSessionViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request):
+        file_name = request.data.get('file_name')
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            size = 0
+        if not file_name or size <= 0:
+            return Response({'error': 'file_name and size are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if size > UPLOAD_MAX_SIZE:
+            return Response({'error': f'File is larger than {UPLOAD_MAX_SIZE} bytes'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        session = create_upload_session(request.user, file_name, size)
+        return Response(self.session_data(session), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        session = UploadSession.objects.filter(pk=pk, user=request.user).first()
+        if session is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.session_data(session))
+
+    def update(self, request, pk=None):
+        # 본문은 request.data 로 파싱하지 않고 스트림에서 나눠 읽어 파일에 바로 씀
+        match = CONTENT_RANGE_PATTERN.match(request.headers.get('Content-Range', ''))
+        if match is None:
+            return Response({'error': 'Content-Range header is required'}, status=status.HTTP_400_BAD_REQUEST)
+        start, end, total = (int(value) for value in match.groups())
+        if end < start:
+            return Response({'error': 'Invalid Content-Range'}, status=status.HTTP_400_BAD_REQUEST)
+
+        session = UploadSession.objects.filter(pk=pk, user=request.user).first()
+        if session is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        if total != session.size or end >= session.size:
+            return Response({'error': 'Content-Range does not match the upload size'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.stream is None:
+            return Response({'error': 'Request body is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            session = append_chunk(pk, request.user, start, request.stream, end - start + 1)
+        except UploadSession.DoesNotExist:
+            # 받는 동안 세션이 취소/만료된 경우
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        except UploadOffsetMismatch as e:
+            return Response({'error': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+        return Response(self.session_data(session))
+
+    def destroy(self, request, pk=None):
+        session = UploadSession.objects.filter(pk=pk, user=request.user).first()
+        if session is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        discard_upload_session(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        data = request.data
+        try:
+            reels = finalize_upload(pk, request.user, data.get('content'), load_json_list(data, 'tags'), load_json_list(data, 'mentions'))
+        except UploadSession.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        except UploadOffsetMismatch as e:
+            return Response({'error': 'Upload is not complete', 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+
+        serializer = ReelsSerializer(reels, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def session_data(self, session):
+        return {'id': session.id, 'offset': session.offset, 'size': session.size}
+
+# 직접 업로드: presign 으로 받은 URL 에 클라이언트가 바로 올리고, register 로 게시물/릴스에 연결
+class DirectUploadViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'])
+    def presign(self, request):
+        kind = request.data.get('kind')
+        content_type = request.data.get('content_type') or 'application/octet-stream'
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            size = 0
+        if kind not in UPLOAD_PREFIXES or size <= 0:
+            return Response({'error': 'kind (post or reels) and size are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if size > MEDIA_DIRECT_UPLOAD_MAX_SIZE:
+            return Response({'error': f'File is larger than {MEDIA_DIRECT_UPLOAD_MAX_SIZE} bytes'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        key = make_upload_key(kind, request.data.get('file_name'))
+        direct_upload = DirectUpload.objects.create(user=request.user, kind=kind, key=key, size=size)
+        upload = get_signed_url_backend().presign_upload(key, content_type, size, request)
+        # register 때 다른 사용자가 발급받은 업로드를 쓰지 못하도록 사용자와 함께 서명
+        token = signing.dumps({'upload': str(direct_upload.id), 'user': request.user.id}, salt=DIRECT_UPLOAD_SALT)
+        return Response({'key': key, 'token': token, 'upload': upload}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def register(self, request):
+        data = request.data
+        kind = data.get('kind')
+        tokens = data.get('tokens')
+        if kind not in UPLOAD_PREFIXES or not isinstance(tokens, list) or not tokens:
+            return Response({'error': 'kind and tokens are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        upload_ids = []
+        for token in tokens:
+            try:
+                payload = signing.loads(token, salt=DIRECT_UPLOAD_SALT, max_age=DIRECT_UPLOAD_REGISTER_TTL)
+            except signing.BadSignature:
+                return Response({'error': 'Invalid or expired upload token'}, status=status.HTTP_400_BAD_REQUEST)
+            if not isinstance(payload, dict) or payload.get('user') != request.user.id or 'upload' not in payload:
+                return Response({'error': 'Invalid or expired upload token'}, status=status.HTTP_400_BAD_REQUEST)
+            upload_ids.append(payload['upload'])
+        if len(set(upload_ids)) != len(upload_ids):
+            return Response({'error': 'Duplicate upload token'}, status=status.HTTP_400_BAD_REQUEST)
+
+        tags_data = load_json_list(data, 'tags')
+        mentions_data = load_json_list(data, 'mentions')
+        backend = get_signed_url_backend()
+        with transaction.atomic():
+            # 토큰은 한 번만 등록할 수 있음 (같은 파일을 여러 게시물에 붙이지 못하도록 행을 잠그고 표시)
+            direct_uploads = DirectUpload.objects.select_for_update().filter(
+                pk__in=upload_ids, user=request.user, kind=kind, registered_at__isnull=True
+            ).in_bulk()
+            uploads = []
+            for upload_id in upload_ids:
+                direct_upload = direct_uploads.get(uuid.UUID(upload_id))
+                if direct_upload is None:
+                    return Response({'error': 'Invalid or already registered upload token'}, status=status.HTTP_400_BAD_REQUEST)
+                size = backend.stat(direct_upload.key)
+                if size is None:
+                    return Response({'error': f'{direct_upload.key} has not been uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+                if size > direct_upload.size:
+                    return Response({'error': f'{direct_upload.key} is larger than declared'}, status=status.HTTP_400_BAD_REQUEST)
+                uploads.append({'file': direct_upload.key})
+            DirectUpload.objects.filter(pk__in=direct_uploads).update(registered_at=timezone.now())
+            if kind == 'post':
+                created = create_post(request.user, data.get('content'), data.get('site'), tags_data, mentions_data, uploads)
+            else:
+                created = create_reels(request.user, data.get('content'), tags_data, mentions_data, uploads)
+
+        serializer_class = PostSerializer if kind == 'post' else ReelsSerializer
+        return Response(serializer_class(created, context={'request': request}).data, status=status.HTTP_201_CREATED)
@@ -3,17 +3,25 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django.core.exceptions import ValidationError
-from django.db.models import Q, Count, Case, When, IntegerField, Value
+from django.db import transaction
+from django.db.models import Q
 from instaapp.models.user import CustomUser
 from instaapp.models.follow import Follow
 from instaapp.models.post import Post
 from instaapp.models.mark import Mark
 from instaapp.models.reels import Reels
-from instaapp.serializers import UserSerializer, PostSerializer, ReelsSerializer
+from instaapp.serializers import UserSerializer, UserSummarySerializer, PostSerializer, ReelsSerializer
 from instaapp.services.user_services import create_user, login_user, reactivate_user, delete_user
+from instaapp.services.counter_services import adjust_counter
+from instaapp.services.timeline_services import remove_author_from_timeline
 from instaapp.authentication import TempTokenAuthentication
+from instaapp.pagination import KeysetPagination
+from instaapp.search.users import search_users
+from instaapp.media.pipeline import process_profile_picture
+from instaapp.media.queue import enqueue
 
 logger = logging.getLogger(__name__)
 
@@ -71,25 +79,30 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def following(self, request, pk=None):
         user = self.get_object() if pk else request.user
-        follows = Follow.objects.filter(follower=user).select_related('followed')
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        follows = paginator.paginate_queryset(Follow.objects.filter(follower=user).select_related('followed'), request, view=self)
         followed_users = [follow.followed for follow in follows]
         serializer = UserSerializer(followed_users, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def followers(self, request, pk=None):
         user = self.get_object() if pk else request.user
-        followers = Follow.objects.filter(followed=user).select_related('follower')
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        followers = paginator.paginate_queryset(Follow.objects.filter(followed=user).select_related('follower'), request, view=self)
         follower_users = [follow.follower for follow in followers]
         serializer = UserSerializer(follower_users, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def unfollow(self, request, pk=None):
         try:
             user_to_unfollow = CustomUser.objects.get(pk=pk)
             follow_instance = Follow.objects.get(follower=user_to_unfollow, followed=request.user)
-            follow_instance.delete()
+            with transaction.atomic():
+                follow_instance.delete()
+                adjust_counter(request.user, 'follower_count', -1)
+            remove_author_from_timeline(user_to_unfollow, request.user)
             return Response({'status': 'unfollowed'}, status=status.HTTP_200_OK)
         except CustomUser.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -99,12 +112,12 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def profile(self, request, pk=None):
         user = self.get_object() if pk else request.user
-        posts = Post.objects.filter(author=user).order_by('-created_at')
-        reels = Reels.objects.filter(author=user).order_by('created_at')
+        posts = Post.objects.visible().filter(author=user).order_by('-created_at')
+        reels = Reels.objects.visible().filter(author=user).order_by('created_at')
         saved_post_ids = Mark.objects.filter(user=user, post__isnull=False).values_list('post_id', flat=True)
-        saved_posts = Post.objects.filter(id__in=saved_post_ids).order_by('-created_at')
+        saved_posts = Post.objects.visible().filter(id__in=saved_post_ids).order_by('-created_at')
         saved_reel_ids = Mark.objects.filter(user=user, reels__isnull=False).values_list('reels_id', flat=True)
-        saved_reels = Reels.objects.filter(id__in=saved_reel_ids).order_by('created_at')
+        saved_reels = Reels.objects.visible().filter(id__in=saved_reel_ids).order_by('created_at')
         
         followers_count = Follow.objects.filter(followed=user).count()
         following_count = Follow.objects.filter(follower=user).count()
@@ -136,21 +149,20 @@ class UserViewSet(viewsets.ModelViewSet):
         if not search_term:
             return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        users = CustomUser.objects.annotate(
-            follower_count=Count('followers'),
-            match_score=Case(
-                When(username__istartswith=search_term, then=Value(3)),  # username이 검색어로 시작하면 높은 점수
-                When(username__icontains=search_term, then=Value(2)),    # username에 검색어가 포함되면 중간 점수
-                When(bio__icontains=search_term, then=Value(1)),         # bio에 검색어가 포함되면 낮은 점수
-                default=Value(0),
-                output_field=IntegerField()
-            )
-        ).filter(
-            Q(username__icontains=search_term) | Q(bio__icontains=search_term)
-        ).order_by('-match_score', '-follower_count')
+        try:
+            offset = max(0, int(request.query_params.get('offset', 0)))
+            page_size = max(1, min(int(request.query_params.get('page_size', 20)), 50))
+        except ValueError:
+            return Response({"error": "Invalid offset or page_size."}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        # 사용자 검색 색인에서 상위 결과의 id 만 구하고 요약 정보로 반환
+        user_ids, has_more = search_users(search_term, offset, page_size)
+        users = CustomUser.objects.in_bulk(user_ids)
+        serializer = UserSummarySerializer([users[user_id] for user_id in user_ids if user_id in users], many=True, context={'request': request})
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(request.build_absolute_uri(), 'offset', offset + len(user_ids))
+        return Response({'next': next_url, 'results': serializer.data})
 
     # 사용자 정보 수정 메서드 추가
     def update(self, request, *args, **kwargs):
@@ -163,6 +175,8 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        if 'profile_picture' in request.FILES:
+            transaction.on_commit(lambda: enqueue(process_profile_picture, instance.id))
         return Response(serializer.data)
     
     # 계정 비활성화
@@ -0,0 +1,28 @@
+"""
+ASGI config for instaproject project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instaproject.settings')
+
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack
+from channels.routing import ProtocolTypeRouter, URLRouter
+from instaapp.authentication import JWTAuthMiddleware
+from instaapp.routing import websocket_urlpatterns
+from instaapp.services.message_buffer import lifespan
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'lifespan': lifespan,
+    'websocket': AuthMiddlewareStack(JWTAuthMiddleware(URLRouter(websocket_urlpatterns))),
+})
@@ -56,6 +56,40 @@ SIMPLE_JWT = {
 
 ASGI_APPLICATION = 'instaproject.asgi.application'
 
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [(os.environ.get('REDIS_HOST', '127.0.0.1'), int(os.environ.get('REDIS_PORT', '6379')))],
+        },
+    },
+}
+
+# 트렌딩 태그, 인기 게시물 같은 계산 결과와 주기 작업 간격 표시를 모든 프로세스가 함께 쓰도록 Redis 캐시 사용
+# (기본값인 로컬 메모리 캐시는 프로세스마다 따로라 결과가 어긋나고 계산도 프로세스 수만큼 반복됨)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"redis://{os.environ.get('REDIS_HOST', '127.0.0.1')}:{os.environ.get('REDIS_PORT', '6379')}/1",
+    },
+}
+
+# 업로드 미디어 처리 워커 (로컬 스레드 풀)
+MEDIA_QUEUE_BACKEND = 'instaapp.media.queue.LocalQueueBackend'
+MEDIA_QUEUE_WORKERS = 2
+
+# 직접 업로드/다운로드용 서명 URL 발급 백엔드 (로컬 파일시스템 대용 서버)
+MEDIA_SIGNED_URL_BACKEND = 'instaapp.media.storage.LocalSignedURLBackend'
+
+# 미디어 전송을 프런트 프록시에 넘김 (nginx internal location 접두사, 예: /protected-media/)
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+
+# 업로드 중 sha256 을 계산해 같은 내용의 파일은 다시 저장/처리하지 않음
+FILE_UPLOAD_HANDLERS = [
+    'instaapp.media.uploads.HashingMemoryFileUploadHandler',
+    'instaapp.media.uploads.HashingTemporaryFileUploadHandler',
+]
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -1,12 +1,12 @@
+import re
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from instaapp.views.media_views import MediaView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('instaapp.urls')),
-]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # 미디어는 DEBUG 여부와 관계없이 권한 확인 후 제공
+    re_path(r'^%s(?P<name>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), MediaView.as_view(), name='media'),
+]
\ No newline at end of file
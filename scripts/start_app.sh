@@ -7,3 +7,14 @@ docker run -d --name origram -p 8000:8000 \
   my-django-app
 
 docker exec origram python manage.py migrate
+docker exec origram python manage.py reconcile_engagement_counters
+docker exec origram python manage.py reconcile_follower_counts
+docker exec origram python manage.py reconcile_tag_counts
+docker exec origram python manage.py rank_explore
+docker exec origram python manage.py process_pending_media
+docker exec origram python manage.py backfill_image_variants
+docker exec origram python manage.py purge_upload_sessions
+docker exec origram python manage.py rebuild_timelines --missing-only
+docker exec origram python manage.py rebuild_inbox --missing-only
+docker exec origram python manage.py rebuild_user_search_index --missing-only
+docker exec origram python manage.py compact_tag_usage